@@ -1,15 +1,34 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Body, Query, status
 from typing import List, Optional
 from datetime import datetime
+import asyncio
 
-from supabase_client import get_supabase_client
+from supabase_client import get_async_supabase_client, get_storage_client, get_storage_pool_stats
 from auth import get_admin_user
+from profile_cache import invalidate_profile
+from request_reads import RequestReads, get_request_reads
+from admin_stats import get_admin_stats_cached
+from ranking_index import ranking_index
+from cfo_batch_scoring import load_applications, rescore_applications
+from cutoff_simulator import get_cutoff_snapshot
+from answer_similarity import backfill_competition
+from shortlisting import SHORTLIST_STATUSES, shortlist_competition
+from application_finalization import OPEN_STATUSES, FinalizationError, finalize_competition
+from judging import NORMALIZATION_METHODS, get_judging_board, set_judge_weight
+from judge_workload import DEFAULT_JUDGES_PER_APPLICATION, assign_competition, rebalance_after_removal
+from quota_shortlist import QuotaError, quota_shortlist_competition
+from text_features import FEATURE_NAMES, cohort_features, feature_summary
+from scoring_simulator import get_cohort_snapshot, candidate_rubric, simulate
+from scoring_rubric import (
+    RubricError, compile_rubric, activate_rubric, get_active_rubric, get_active_rubric_source
+)
+from cfo_rankings import DEFAULT_PAGE_SIZE, list_ranked_applications, get_ranking_counts, parse_status_filter
 from models import (
     User, UserRole, UserUpdate, AdminUserResponse,
     CompetitionCreate, CompetitionUpdate, CompetitionResponse, CompetitionStatus,
-    CFOApplicationResponse, CFOApplicationReview, CFOApplicationStatus,
+    CFOApplicationResponse, CFOApplicationReview, CFOApplicationStatus, ScoringWhatIf, ShortlistQuotas,
     TaskCreate, TaskResponse,
-    JudgeAssignment, JudgeAssignmentResponse
+    JudgeAssignment, JudgeAssignmentResponse, JudgingEntityType
 )
 
 router = APIRouter(prefix="/api/admin", tags=["Admin"])
@@ -44,8 +63,8 @@ def calculate_auto_score(app_data: dict) -> float:
 
 @router.get("/users", response_model=List[AdminUserResponse])
 async def get_all_users(current_user: User = Depends(get_admin_user)):
-    supabase = get_supabase_client()
-    response = supabase.table('user_profiles').select('*').order('created_at', desc=True).execute()
+    supabase = await get_async_supabase_client()
+    response = await supabase.table('user_profiles').select('*').order('created_at', desc=True).execute()
     
     users = []
     for u in response.data or []:
@@ -62,24 +81,25 @@ async def get_all_users(current_user: User = Depends(get_admin_user)):
 
 @router.patch("/users/{user_id}")
 async def update_user(user_id: str, updates: UserUpdate, current_user: User = Depends(get_admin_user)):
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
     update_data = {k: v.value if hasattr(v, 'value') else v for k, v in updates.model_dump(exclude_none=True).items()}
     update_data['updated_at'] = datetime.utcnow().isoformat()
     
-    response = supabase.table('user_profiles').update(update_data).eq('id', user_id).execute()
+    response = await supabase.table('user_profiles').update(update_data).eq('id', user_id).execute()
+    invalidate_profile(user_id)
     if not response.data:
         raise HTTPException(status_code=404, detail="User not found")
     return {"message": "User updated", "user": response.data[0]}
 
 @router.get("/competitions")
 async def get_all_competitions(current_user: User = Depends(get_admin_user)):
-    supabase = get_supabase_client()
-    response = supabase.table('competitions').select('*').order('created_at', desc=True).execute()
+    supabase = await get_async_supabase_client()
+    response = await supabase.table('competitions').select('*').order('created_at', desc=True).execute()
     return response.data or []
 
 @router.post("/competitions")
 async def create_competition(comp: CompetitionCreate, current_user: User = Depends(get_admin_user)):
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
     import logging
     logger = logging.getLogger(__name__)
     
@@ -95,7 +115,7 @@ async def create_competition(comp: CompetitionCreate, current_user: User = Depen
     }
     
     try:
-        response = supabase.table('competitions').insert(comp_data).execute()
+        response = await supabase.table('competitions').insert(comp_data).execute()
         if not response.data:
             raise HTTPException(status_code=500, detail="Failed to create competition")
         return response.data[0]
@@ -105,7 +125,7 @@ async def create_competition(comp: CompetitionCreate, current_user: User = Depen
 
 @router.patch("/competitions/{comp_id}")
 async def update_competition(comp_id: str, updates: CompetitionUpdate, current_user: User = Depends(get_admin_user)):
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
     update_data = {}
     for k, v in updates.model_dump(exclude_none=True).items():
         if hasattr(v, 'value'):
@@ -114,60 +134,70 @@ async def update_competition(comp_id: str, updates: CompetitionUpdate, current_u
             update_data[k] = v.isoformat()
         else:
             update_data[k] = v
+    if update_data.get('status') in OPEN_STATUSES:
+        # Reopened: final statuses are written again when applications close
+        update_data['applications_finalized_at'] = None
     update_data['updated_at'] = datetime.utcnow().isoformat()
     
-    response = supabase.table('competitions').update(update_data).eq('id', comp_id).execute()
+    response = await supabase.table('competitions').update(update_data).eq('id', comp_id).execute()
     if not response.data:
         raise HTTPException(status_code=404, detail="Competition not found")
     return {"message": "Competition updated", "competition": response.data[0]}
 
 @router.delete("/competitions/{comp_id}")
 async def delete_competition(comp_id: str, current_user: User = Depends(get_admin_user)):
-    supabase = get_supabase_client()
-    response = supabase.table('competitions').delete().eq('id', comp_id).execute()
+    supabase = await get_async_supabase_client()
+    response = await supabase.table('competitions').delete().eq('id', comp_id).execute()
     return {"message": "Competition deleted"}
 
 
 @router.get("/competitions/{competition_id}/cfo-applications")
 async def get_competition_cfo_applications(
     competition_id: str,
-    current_user: User = Depends(get_admin_user)
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    final_status: Optional[str] = None,
+    has_red_flags: Optional[bool] = None,
+    red_flag: Optional[str] = None,
+    summary: bool = True,
+    current_user: User = Depends(get_admin_user),
+    reads: RequestReads = Depends(get_request_reads)
 ):
-    """Get all CFO applications for a specific competition (Admin only)"""
+    """
+    Ranked CFO applications for a competition (Admin only).
+    Keyset-paginated: pass the returned next_cursor as cursor for the next page.
+    status accepts a comma-separated list, e.g. status=pending,submitted.
+    """
     import logging
     logger = logging.getLogger(__name__)
-    supabase = get_supabase_client()
     
     # Verify competition exists
-    comp_check = supabase.table('competitions').select('id, title').eq('id', competition_id).execute()
-    if not comp_check.data:
+    competition = await reads.first('competitions', 'id, title', id=competition_id)
+    if not competition:
         raise HTTPException(status_code=404, detail="Competition not found")
     
-    # Get all applications for this competition with user info
-    # Use explicit relationship name to avoid ambiguity (user_id vs override_by)
-    response = supabase.table('cfo_applications')\
-        .select('*, user_profiles!cfo_applications_user_id_fkey(full_name, email)')\
-        .eq('competition_id', competition_id)\
-        .order('total_score', desc=True)\
-        .execute()
-    
-    applications = response.data or []
-    
-    # Add ranking
-    rank = 1
-    for app in applications:
-        if not app.get('auto_excluded'):
-            app['rank'] = rank
-            rank += 1
-        else:
-            app['rank'] = None
-    
-    logger.info(f"Admin {current_user.id} viewed {len(applications)} applications for competition {competition_id}")
+    page, counts = await asyncio.gather(
+        list_ranked_applications(
+            competition_id,
+            limit=limit,
+            cursor=cursor,
+            statuses=parse_status_filter(status),
+            final_status=final_status,
+            has_red_flags=has_red_flags,
+            red_flag=red_flag,
+            summary=summary
+        ),
+        get_ranking_counts(competition_id)
+    )
+    
+    logger.info(f"Admin {current_user.id} viewed {len(page['applications'])} applications for competition {competition_id}")
     
     return {
-        "competition": comp_check.data[0],
-        "total_count": len(applications),
-        "applications": applications
+        "competition": competition,
+        "total_count": counts["total"],
+        "counts": counts,
+        **page
     }
 
 
@@ -182,14 +212,12 @@ async def get_application_cv_download(
     BOARD-APPROVED: Manual CV download for admin review
     """
     import logging
-    import os
-    from supabase import create_client
     
     logger = logging.getLogger(__name__)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
     
     # Verify application exists and belongs to competition
-    app_response = supabase.table('cfo_applications')\
+    app_response = await supabase.table('cfo_applications')\
         .select('id, cv_url, user_id')\
         .eq('id', application_id)\
         .eq('competition_id', competition_id)\
@@ -226,18 +254,15 @@ async def get_application_cv_download(
         # Fallback: construct from known format
         file_path = f"cfo/{competition_id}/{application['user_id']}.pdf"
     
-    # Create dedicated admin client for storage access (service role key bypasses RLS)
-    SUPABASE_URL = os.environ.get("SUPABASE_URL")
-    SUPABASE_SERVICE_ROLE_KEY = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
-    
-    if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
+    # Dedicated pooled storage client (service role key bypasses RLS)
+    try:
+        storage = await get_storage_client()
+    except RuntimeError:
         raise HTTPException(status_code=500, detail="Storage configuration error")
     
-    supabase_admin = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
-    
     try:
         # Generate signed URL with short expiry (10 minutes = 600 seconds)
-        signed_url_result = supabase_admin.storage.from_("cfo-cvs").create_signed_url(file_path, 600)
+        signed_url_result = await storage.from_("cfo-cvs").create_signed_url(file_path, 600)
         
         if not signed_url_result:
             raise HTTPException(status_code=500, detail="Failed to generate download URL")
@@ -272,10 +297,10 @@ async def get_application_detail(
     current_user: User = Depends(get_admin_user)
 ):
     """Get detailed view of a single CFO application (Admin only)"""
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
     
     # Use explicit relationship name to avoid ambiguity
-    response = supabase.table('cfo_applications')\
+    response = await supabase.table('cfo_applications')\
         .select('*, user_profiles!cfo_applications_user_id_fkey(full_name, email)')\
         .eq('id', application_id)\
         .eq('competition_id', competition_id)\
@@ -293,25 +318,20 @@ async def update_application_status(
     application_id: str,
     new_status: str,
     reason: str = None,
-    current_user: User = Depends(get_admin_user)
+    current_user: User = Depends(get_admin_user),
+    reads: RequestReads = Depends(get_request_reads)
 ):
     """Update CFO application status (Admin only)"""
     import logging
     logger = logging.getLogger(__name__)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
     
     valid_statuses = ["qualified", "reserve", "not_selected", "excluded", "pending"]
     if new_status not in valid_statuses:
         raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {valid_statuses}")
     
     # Verify application exists and belongs to competition
-    app_check = supabase.table('cfo_applications')\
-        .select('id')\
-        .eq('id', application_id)\
-        .eq('competition_id', competition_id)\
-        .execute()
-    
-    if not app_check.data:
+    if not await reads.first('cfo_applications', 'id', id=application_id, competition_id=competition_id):
         raise HTTPException(status_code=404, detail="Application not found in this competition")
     
     # Update status
@@ -323,11 +343,13 @@ async def update_application_status(
         "override_at": datetime.utcnow().isoformat()
     }
     
-    response = supabase.table('cfo_applications')\
+    response = await supabase.table('cfo_applications')\
         .update(update_data)\
         .eq('id', application_id)\
         .execute()
     
+    ranking_index.set_status([application_id], new_status, admin_override=True)
+    
     logger.info(f"Admin {current_user.id} changed application {application_id} status to {new_status}")
     
     return {"success": True, "message": f"Application status updated to {new_status}"}
@@ -339,20 +361,20 @@ async def get_cfo_applications(
     competition_id: Optional[str] = None,
     current_user: User = Depends(get_admin_user)
 ):
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
     query = supabase.table('cfo_applications').select('*')
     if status:
         query = query.eq('status', status)
     if competition_id:
         query = query.eq('competition_id', competition_id)
-    response = query.order('final_score', desc=True).execute()
+    response = await query.order('final_score', desc=True).execute()
     return response.data or []
 
 @router.patch("/cfo-applications/{app_id}")
 async def review_cfo_application(app_id: str, review: CFOApplicationReview, current_user: User = Depends(get_admin_user)):
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
     
-    app_response = supabase.table('cfo_applications').select('*').eq('id', app_id).execute()
+    app_response = await supabase.table('cfo_applications').select('*').eq('id', app_id).execute()
     if not app_response.data:
         raise HTTPException(status_code=404, detail="Application not found")
     
@@ -375,15 +397,17 @@ async def review_cfo_application(app_id: str, review: CFOApplicationReview, curr
     if review.rejection_reason:
         update_data["rejection_reason"] = review.rejection_reason
     
-    response = supabase.table('cfo_applications').update(update_data).eq('id', app_id).execute()
+    response = await supabase.table('cfo_applications').update(update_data).eq('id', app_id).execute()
+    ranking_index.set_status([app_id], review.status.value)
     
     if review.status == CFOApplicationStatus.APPROVED:
-        supabase.table('user_profiles').update({
+        await supabase.table('user_profiles').update({
             "is_cfo_qualified": True,
             "updated_at": datetime.utcnow().isoformat()
         }).eq('id', app['user_id']).execute()
+        invalidate_profile(app['user_id'])
     
-    supabase.table('admin_audit_log').insert({
+    await supabase.table('admin_audit_log').insert({
         "admin_id": current_user.id,
         "action": f"reviewed_cfo_application_{review.status.value}",
         "entity_type": "cfo_application",
@@ -399,30 +423,438 @@ async def bulk_approve_top_applications(
     top_n: int = 40,
     current_user: User = Depends(get_admin_user)
 ):
-    supabase = get_supabase_client()
-    response = supabase.table('cfo_applications').select('id,final_score').eq('competition_id', competition_id).eq('status', 'pending').order('final_score', desc=True).limit(top_n).execute()
-    
-    approved_count = 0
-    for app in response.data or []:
-        supabase.table('cfo_applications').update({
-            "status": "approved",
-            "reviewed_by": current_user.id,
-            "reviewed_at": datetime.utcnow().isoformat(),
-            "updated_at": datetime.utcnow().isoformat()
-        }).eq('id', app['id']).execute()
-        
-        supabase.table('user_profiles').update({
+    """
+    Approve the top N pending applications by final_score (reviewer score where set), ties in ranking order:
+    one ranked read, one update per table, one audit insert
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+    supabase = await get_async_supabase_client()
+    
+    response = await supabase.table('cfo_applications')\
+        .select('id, user_id, final_score')\
+        .eq('competition_id', competition_id)\
+        .eq('status', 'pending')\
+        .order('final_score', desc=True)\
+        .order('rank_key')\
+        .limit(top_n)\
+        .execute()
+    candidates = response.data or []
+    
+    if not candidates:
+        return {"message": "Approved top 0 applications", "approved_count": 0, "results": []}
+    
+    now = datetime.utcnow().isoformat()
+    app_update = {
+        "status": "approved",
+        "reviewed_by": current_user.id,
+        "reviewed_at": now,
+        "updated_at": now
+    }
+    
+    # Still-pending guard: rows approved concurrently by another admin are not touched twice
+    approved = await supabase.table('cfo_applications')\
+        .update(app_update)\
+        .in_('id', [a['id'] for a in candidates])\
+        .eq('status', 'pending')\
+        .execute()
+    approved_ids = {a['id'] for a in approved.data or []}
+    ranking_index.set_status(approved_ids, "approved")
+    approved_user_ids = list({a['user_id'] for a in candidates if a['id'] in approved_ids})
+    
+    qualified_user_ids = set()
+    if approved_user_ids:
+        profiles = await supabase.table('user_profiles').update({
             "is_cfo_qualified": True,
-            "updated_at": datetime.utcnow().isoformat()
-        }).eq('id', app['user_id']).execute()
-        approved_count += 1
+            "updated_at": now
+        }).in_('id', approved_user_ids).execute()
+        qualified_user_ids = {p['id'] for p in profiles.data or []}
+        invalidate_profile(*approved_user_ids)
+        
+        await supabase.table('admin_audit_log').insert([
+            {
+                "admin_id": current_user.id,
+                "action": "reviewed_cfo_application_approved",
+                "entity_type": "cfo_application",
+                "entity_id": a['id'],
+                "new_values": app_update
+            }
+            for a in candidates if a['id'] in approved_ids
+        ]).execute()
+    
+    results = [
+        {
+            "application_id": a['id'],
+            "user_id": a['user_id'],
+            "final_score": a.get('final_score'),
+            "approved": a['id'] in approved_ids,
+            "profile_qualified": a['user_id'] in qualified_user_ids
+        }
+        for a in candidates
+    ]
+    
+    logger.info(f"Admin {current_user.id} bulk-approved {len(approved_ids)}/{len(candidates)} applications for competition {competition_id}")
+    
+    return {
+        "message": f"Approved top {len(approved_ids)} applications",
+        "approved_count": len(approved_ids),
+        "results": results
+    }
+
+@router.post("/competitions/{competition_id}/shortlist")
+async def shortlist_cfo_applications(
+    competition_id: str,
+    dry_run: bool = False,
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Assign final statuses for a competition (Admin only): top 100 qualified, next 50 reserve,
+    everyone else not_selected / excluded. Reads only the shortlisted rows (in rank order) and
+    writes all statuses in one call; admin overrides and reviewer decisions are kept.
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+    supabase = await get_async_supabase_client()
+    
+    result = await shortlist_competition(competition_id, dry_run=dry_run)
+    if dry_run:
+        return result
+    
+    ranking_index.apply_shortlist(
+        competition_id,
+        result["qualified"]["application_ids"],
+        result["reserve"]["application_ids"],
+        SHORTLIST_STATUSES
+    )
+    
+    await supabase.table('admin_audit_log').insert({
+        "admin_id": current_user.id,
+        "action": "shortlisted_cfo_applications",
+        "entity_type": "competition",
+        "entity_id": competition_id,
+        "new_values": {
+            "qualified": result["qualified"]["count"],
+            "reserve": result["reserve"]["count"],
+            "changed": result["changed"]
+        }
+    }).execute()
+    
+    logger.info(f"Admin {current_user.id} shortlisted competition {competition_id}: {result['changed']}")
+    
+    return result
+
+@router.post("/competitions/{competition_id}/finalize")
+async def finalize_cfo_applications(competition_id: str, current_user: User = Depends(get_admin_user)):
+    """
+    Run the automatic finalisation now (Admin only): re-score stale rows, write the
+    determine_status() bands in one call and set applications_finalized_at. Safe to repeat.
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+    supabase = await get_async_supabase_client()
+    
+    try:
+        result = await finalize_competition(competition_id)
+    except FinalizationError as e:
+        logger.error(f"Finalising competition {competition_id} failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    await supabase.table('admin_audit_log').insert({
+        "admin_id": current_user.id,
+        "action": "finalized_cfo_applications",
+        "entity_type": "competition",
+        "entity_id": competition_id,
+        "new_values": {
+            "qualified": result["qualified"],
+            "reserve": result["reserve"],
+            "changed": result["changed"]
+        }
+    }).execute()
+    
+    logger.info(f"Admin {current_user.id} finalised competition {competition_id}: {result['changed']}")
+    
+    return result
+
+@router.post("/competitions/{competition_id}/shortlist/quotas")
+async def shortlist_cfo_applications_with_quotas(
+    competition_id: str,
+    quotas: ShortlistQuotas,
+    dry_run: bool = False,
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Assign final statuses with soft quotas on the qualified band by country, industry and
+    years_of_experience (Admin only). Returns every swap and cap skip against the plain
+    ranking, plus the floors that could not be met; all statuses are written in one call.
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+    supabase = await get_async_supabase_client()
+    
+    try:
+        result = await quota_shortlist_competition(
+            competition_id,
+            {dimension: {value: bound.model_dump() for value, bound in values.items()} for dimension, values in quotas.quotas.items()},
+            dry_run=dry_run
+        )
+    except QuotaError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if dry_run:
+        return result
+    
+    ranking_index.apply_shortlist(
+        competition_id,
+        result["qualified"]["application_ids"],
+        result["reserve"]["application_ids"],
+        SHORTLIST_STATUSES
+    )
+    
+    await supabase.table('admin_audit_log').insert({
+        "admin_id": current_user.id,
+        "action": "shortlisted_cfo_applications",
+        "entity_type": "competition",
+        "entity_id": competition_id,
+        "new_values": {
+            "quotas": quotas.model_dump()["quotas"],
+            "qualified": result["qualified"]["count"],
+            "reserve": result["reserve"]["count"],
+            "swaps": len(result["swaps"]),
+            "unmet": result["unmet"],
+            "changed": result["changed"]
+        }
+    }).execute()
+    
+    logger.info(f"Admin {current_user.id} shortlisted competition {competition_id} with quotas: {len(result['swaps'])} swaps, {result['changed']}")
+    
+    return result
+
+@router.post("/cfo-applications/rescore")
+async def rescore_cfo_applications(
+    competition_id: Optional[str] = None,
+    dry_run: bool = False,
+    verify_sample: int = 50,
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Re-score stored CFO applications with the active scoring rubric version (Admin only).
+    Scores are computed in one vectorised batch; only rows whose stored scores change are written.
+    verify_sample rows are re-checked through the per-application scorer before anything is written.
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+    
+    result = await rescore_applications(competition_id, dry_run=dry_run, verify_sample=verify_sample)
     
-    return {"message": f"Approved top {approved_count} applications"}
+    if result["mismatched_ids"]:
+        logger.error(f"Batch rescoring disagreed with the scalar scorer for {result['mismatched_ids']}")
+        raise HTTPException(status_code=500, detail="Batch scoring verification failed; nothing was written")
+    
+    updated_rows = result.pop("updated_rows")
+    for row in updated_rows:
+        ranking_index.upsert(row)
+    
+    logger.info(f"Admin {current_user.id} rescored {result['scored']} applications ({result['written']} updated, dry_run={dry_run})")
+    
+    return result
+
+@router.get("/scoring-rubrics")
+async def list_scoring_rubrics(current_user: User = Depends(get_admin_user)):
+    """Stored rubric versions, newest first, plus the version this process is scoring with"""
+    supabase = await get_async_supabase_client()
+    response = await supabase.table('scoring_rubrics')\
+        .select('version, is_active, created_by, created_at, activated_at')\
+        .order('created_at', desc=True)\
+        .execute()
+    return {
+        "active_version": get_active_rubric().version,
+        "active_source": get_active_rubric_source(),
+        "versions": response.data or []
+    }
+
+@router.get("/scoring-rubrics/active")
+async def get_active_scoring_rubric(current_user: User = Depends(get_admin_user)):
+    rubric = get_active_rubric()
+    return {"version": rubric.version, "source": get_active_rubric_source(), "rubric": rubric.document}
+
+@router.post("/scoring-rubrics", status_code=201)
+async def create_scoring_rubric(
+    rubric: dict = Body(...),
+    activate: bool = False,
+    current_user: User = Depends(get_admin_user)
+):
+    """Store a new rubric version (validated by compiling it); optionally activate it right away"""
+    try:
+        compile_rubric(rubric)
+    except RubricError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid rubric: {e}")
+    
+    supabase = await get_async_supabase_client()
+    existing = await supabase.table('scoring_rubrics').select('version').eq('version', rubric['version']).execute()
+    if existing.data:
+        raise HTTPException(status_code=409, detail=f"Rubric version {rubric['version']} already exists")
+    
+    await supabase.table('scoring_rubrics').insert({
+        "version": rubric['version'],
+        "rubric": rubric,
+        "is_active": False,
+        "created_by": current_user.id
+    }).execute()
+    
+    if activate:
+        return await activate_scoring_rubric(rubric['version'], current_user)
+    return {"message": f"Rubric {rubric['version']} saved", "version": rubric['version'], "active": False}
+
+@router.post("/scoring-rubrics/{version}/activate")
+async def activate_scoring_rubric(version: str, current_user: User = Depends(get_admin_user)):
+    """
+    Make a stored rubric the one new submissions are scored with - no redeploy needed.
+    This worker switches immediately, others within RUBRIC_REFRESH_SECONDS.
+    Stored scores are unchanged until POST /cfo-applications/rescore is run.
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+    supabase = await get_async_supabase_client()
+    
+    response = await supabase.table('scoring_rubrics').select('version, rubric').eq('version', version).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Rubric version not found")
+    
+    try:
+        compiled = compile_rubric(response.data[0]['rubric'])
+    except RubricError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid rubric: {e}")
+    
+    previous_version = get_active_rubric().version
+    now = datetime.utcnow().isoformat()
+    await supabase.table('scoring_rubrics').update({"is_active": False}).eq('is_active', True).execute()
+    await supabase.table('scoring_rubrics').update({"is_active": True, "activated_at": now}).eq('version', version).execute()
+    activate_rubric(compiled)
+    
+    await supabase.table('admin_audit_log').insert({
+        "admin_id": current_user.id,
+        "action": "activated_scoring_rubric",
+        "entity_type": "scoring_rubric",
+        "old_values": {"version": previous_version},
+        "new_values": {"version": version}
+    }).execute()
+    
+    logger.info(f"Admin {current_user.id} activated scoring rubric {version} (was {previous_version})")
+    
+    return {"message": f"Rubric {version} activated", "version": version, "active": True, "previous_version": previous_version}
+
+@router.post("/competitions/{competition_id}/scoring-what-if")
+async def simulate_scoring_change(
+    competition_id: str,
+    what_if: ScoringWhatIf,
+    refresh: bool = False,
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Re-score the competition's whole cohort in memory with candidate weights/option points (Admin only).
+    Returns band entrants and drop-outs, rank deltas and the score histogram shift versus the active rubric.
+    Runs on a cached snapshot of the cohort; refresh=true reloads it first. Nothing is written.
+    """
+    baseline = get_active_rubric()
+    try:
+        candidate = candidate_rubric(baseline, what_if.weights, what_if.points)
+    except RubricError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid scoring change: {e}")
+    
+    snapshot = await get_cohort_snapshot(competition_id, refresh=refresh)
+    return simulate(snapshot, baseline, candidate, bins=what_if.bins, movers_limit=what_if.movers_limit)
+
+@router.get("/competitions/{competition_id}/cutoff-simulation")
+async def simulate_cutoffs(
+    competition_id: str,
+    qualified_rank: Optional[int] = None,
+    reserve_rank: Optional[int] = None,
+    qualified_score: Optional[float] = None,
+    reserve_score: Optional[float] = None,
+    refresh: bool = False,
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Band sizes and compositions (red flags, countries, industries) for arbitrary cut-offs (Admin only).
+    Cut-offs are inclusive ranks or minimum scores; defaults are the live 100 / 150.
+    Served from a cached per-competition snapshot; refresh=true reloads it.
+    """
+    if (qualified_rank is not None and qualified_rank < 0) or (reserve_rank is not None and reserve_rank < 0):
+        raise HTTPException(status_code=400, detail="Cut-off ranks must not be negative")
+    
+    snapshot = await get_cutoff_snapshot(competition_id, refresh=refresh)
+    return snapshot.simulate(
+        qualified_rank=qualified_rank,
+        reserve_rank=reserve_rank,
+        qualified_score=qualified_score,
+        reserve_score=reserve_score
+    )
+
+@router.post("/competitions/{competition_id}/answer-similarity/backfill")
+async def backfill_answer_similarity(
+    competition_id: str,
+    dry_run: bool = False,
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Compute missing answer signatures for a competition and re-run near-duplicate
+    detection over all its applications in submission order (Admin only).
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+    
+    result = await backfill_competition(competition_id, dry_run=dry_run)
+    
+    logger.info(f"Admin {current_user.id} backfilled answer similarity for competition {competition_id}: {result}")
+    
+    return result
+
+@router.get("/competitions/{competition_id}/text-features")
+async def get_text_features(
+    competition_id: str,
+    include_applications: bool = False,
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Text features of every free-text answer in a competition (Admin only): per-answer
+    vocabulary richness, finance keyword coverage and repetition, plus distinctiveness
+    within the cohort. Also warms the feature cache before a re-score with feature rules.
+    """
+    text_columns = get_active_rubric().text_columns
+    rows = await load_applications(["id", "user_id"] + text_columns, competition_id)
+    
+    # Extraction is CPU-bound (and may fan out to a process pool); keep the event loop free
+    started = datetime.utcnow()
+    features = {}
+    for column in text_columns:
+        features[column] = await asyncio.to_thread(cohort_features, [row.get(column) for row in rows])
+    
+    result = {
+        "competition_id": competition_id,
+        "applications": len(rows),
+        "summary": {
+            column: {name: feature_summary(values[name]) for name in FEATURE_NAMES}
+            for column, values in features.items()
+        },
+        "elapsed_ms": round((datetime.utcnow() - started).total_seconds() * 1000, 1)
+    }
+    if include_applications:
+        result["features"] = [
+            {
+                "application_id": row["id"],
+                "user_id": row.get("user_id"),
+                **{
+                    column: {name: round(float(features[column][name][i]), 4) for name in FEATURE_NAMES}
+                    for column in text_columns
+                }
+            }
+            for i, row in enumerate(rows)
+        ]
+    return result
 
 @router.get("/judges", response_model=List[AdminUserResponse])
 async def get_judges(current_user: User = Depends(get_admin_user)):
-    supabase = get_supabase_client()
-    response = supabase.table('user_profiles').select('*').eq('role', 'judge').execute()
+    supabase = await get_async_supabase_client()
+    response = await supabase.table('user_profiles').select('*').eq('role', 'judge').execute()
     
     judges = []
     for u in response.data or []:
@@ -439,24 +871,26 @@ async def get_judges(current_user: User = Depends(get_admin_user)):
 
 @router.post("/judge-assignments")
 async def assign_judge(assignment: JudgeAssignment, current_user: User = Depends(get_admin_user)):
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
     
-    existing = supabase.table('judge_assignments').select('id').eq('competition_id', assignment.competition_id).eq('judge_id', assignment.judge_id).execute()
+    existing = await supabase.table('judge_assignments').select('id').eq('competition_id', assignment.competition_id).eq('judge_id', assignment.judge_id).execute()
     if existing.data:
         raise HTTPException(status_code=400, detail="Judge already assigned to this competition")
     
-    response = supabase.table('judge_assignments').insert({
+    response = await supabase.table('judge_assignments').insert({
         "competition_id": assignment.competition_id,
         "judge_id": assignment.judge_id,
         "assigned_by": current_user.id,
+        "weight": assignment.weight,
         "status": "active"
     }).execute()
+    set_judge_weight(assignment.competition_id, assignment.judge_id, assignment.weight)
     return {"message": "Judge assigned", "assignment": response.data[0]}
 
 @router.get("/judge-assignments/{competition_id}")
 async def get_competition_judges(competition_id: str, current_user: User = Depends(get_admin_user)):
-    supabase = get_supabase_client()
-    response = supabase.table('judge_assignments').select('*, user_profiles(full_name, email)').eq('competition_id', competition_id).execute()
+    supabase = await get_async_supabase_client()
+    response = await supabase.table('judge_assignments').select('*, user_profiles(full_name, email)').eq('competition_id', competition_id).execute()
     
     assignments = []
     for a in response.data or []:
@@ -467,42 +901,116 @@ async def get_competition_judges(competition_id: str, current_user: User = Depen
             "judge_id": a['judge_id'],
             "judge_name": profile.get('full_name', ''),
             "judge_email": profile.get('email', ''),
+            "weight": float(a.get('weight') or 1.0),
             "status": a['status'],
             "created_at": a['created_at']
         })
     return assignments
 
+@router.put("/judge-assignments/{assignment_id}/weight")
+async def update_judge_weight(assignment_id: str, weight: float, current_user: User = Depends(get_admin_user)):
+    """Set a judge's weight in the competition's judging aggregate (Admin only)"""
+    if not 0 < weight <= 10:
+        raise HTTPException(status_code=400, detail="weight must be greater than 0 and at most 10")
+    supabase = await get_async_supabase_client()
+    response = await supabase.table('judge_assignments').update({"weight": weight}).eq('id', assignment_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Judge assignment not found")
+    assignment = response.data[0]
+    set_judge_weight(assignment['competition_id'], assignment['judge_id'], weight)
+    return {"message": "Judge weight updated", "assignment": assignment}
+
+@router.get("/competitions/{competition_id}/judging/board")
+async def get_judging_board_ranking(
+    competition_id: str,
+    entity_type: JudgingEntityType = JudgingEntityType.APPLICATION,
+    method: str = "zscore",
+    limit: Optional[int] = Query(None, ge=1),
+    reload: bool = False,
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Judged entities ranked by their calibrated aggregate (Admin only).
+    method: zscore or rank (per-judge normalisation). Only judges with new scores since the
+    last read are re-normalised; reload=true rebuilds the board from judge_scores.
+    """
+    if method not in NORMALIZATION_METHODS:
+        raise HTTPException(status_code=400, detail=f"method must be one of {', '.join(NORMALIZATION_METHODS)}")
+    board = await get_judging_board(competition_id, entity_type.value, reload=reload)
+    ranking = board.board(method, limit=limit)
+    return {
+        "competition_id": competition_id,
+        "entity_type": entity_type.value,
+        "method": method,
+        "score_count": board.score_count,
+        "judges": board.judge_stats(),
+        "ranking": ranking
+    }
+
+@router.post("/competitions/{competition_id}/judge-workload")
+async def distribute_judge_workload(
+    competition_id: str,
+    judges_per_application: int = DEFAULT_JUDGES_PER_APPLICATION,
+    status: Optional[str] = None,
+    dry_run: bool = False,
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Assign every ranked application to judges_per_application active judges (Admin only):
+    least-loaded judges first, no judge from the applicant's company, existing pairings kept.
+    status optionally limits the applications, e.g. status=qualified,reserve.
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+    if judges_per_application < 1:
+        raise HTTPException(status_code=400, detail="judges_per_application must be at least 1")
+    supabase = await get_async_supabase_client()
+    
+    result = await assign_competition(
+        competition_id,
+        judges_per_application=judges_per_application,
+        statuses=parse_status_filter(status),
+        dry_run=dry_run
+    )
+    if dry_run:
+        return result
+    
+    await supabase.table('admin_audit_log').insert({
+        "admin_id": current_user.id,
+        "action": "distributed_judge_workload",
+        "entity_type": "competition",
+        "entity_id": competition_id,
+        "new_values": {
+            "judges_per_application": judges_per_application,
+            "new_assignments": result["written"],
+            "shortfalls": len(result["shortfalls"])
+        }
+    }).execute()
+    
+    logger.info(f"Admin {current_user.id} assigned {result['written']} judge reviews for competition {competition_id}")
+    
+    return result
+
 @router.delete("/judge-assignments/{assignment_id}")
-async def remove_judge_assignment(assignment_id: str, current_user: User = Depends(get_admin_user)):
-    supabase = get_supabase_client()
-    supabase.table('judge_assignments').delete().eq('id', assignment_id).execute()
-    return {"message": "Judge assignment removed"}
+async def remove_judge_assignment(
+    assignment_id: str,
+    current_user: User = Depends(get_admin_user)
+):
+    """Remove a judge from a competition; the judge's unscored applications move to the remaining judges"""
+    supabase = await get_async_supabase_client()
+    existing = await supabase.table('judge_assignments').select('competition_id, judge_id').eq('id', assignment_id).execute()
+    await supabase.table('judge_assignments').delete().eq('id', assignment_id).execute()
+    if not existing.data:
+        return {"message": "Judge assignment removed"}
+    
+    assignment = existing.data[0]
+    rebalance = await rebalance_after_removal(assignment['competition_id'], assignment['judge_id'])
+    return {"message": "Judge assignment removed", "rebalance": rebalance}
+
+@router.get("/storage/pool-stats")
+async def get_storage_pool_status(current_user: User = Depends(get_admin_user)):
+    return get_storage_pool_stats()
 
 @router.get("/stats")
 async def get_admin_stats(current_user: User = Depends(get_admin_user)):
-    supabase = get_supabase_client()
-    
-    users = supabase.table('user_profiles').select('id').execute()
-    competitions = supabase.table('competitions').select('id').execute()
-    
-    try:
-        teams = supabase.table('teams').select('id').execute()
-        total_teams = len(teams.data or [])
-    except:
-        total_teams = 0
-    
-    try:
-        applications = supabase.table('cfo_applications').select('id, status').execute()
-        total_apps = len(applications.data or [])
-        pending_apps = len([a for a in (applications.data or []) if a.get('status') == 'pending'])
-    except:
-        total_apps = 0
-        pending_apps = 0
-    
-    return {
-        "total_users": len(users.data or []),
-        "total_competitions": len(competitions.data or []),
-        "total_teams": total_teams,
-        "total_applications": total_apps,
-        "pending_applications": pending_apps
-    }
+    return await get_admin_stats_cached()
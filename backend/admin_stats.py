@@ -0,0 +1,111 @@
+"""
+Admin dashboard statistics.
+
+Counts come from the admin_platform_stats() RPC (one aggregate query with
+per-status breakdowns) or, if the migration is not applied yet, from
+head/count queries - never by downloading rows. Results are cached for
+ADMIN_STATS_TTL_SECONDS; a stale entry is served immediately while one
+background task refreshes it.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+
+from supabase_client import get_async_supabase_client
+
+logger = logging.getLogger(__name__)
+
+ADMIN_STATS_TTL_SECONDS = float(os.getenv("ADMIN_STATS_TTL_SECONDS", "30"))
+
+_cached_stats: Optional[dict] = None
+_cached_at: float = 0.0
+_refresh_task: Optional[asyncio.Task] = None
+
+
+async def _count(supabase, table: str, **filters) -> int:
+    query = supabase.table(table).select("id", count="exact", head=True)
+    for column, value in filters.items():
+        query = query.eq(column, value)
+    response = await query.execute()
+    return response.count or 0
+
+
+async def _count_or_zero(supabase, table: str, **filters) -> int:
+    try:
+        return await _count(supabase, table, **filters)
+    except Exception as e:
+        logger.warning(f"Stats count failed for {table}: {e}")
+        return 0
+
+
+async def compute_admin_stats() -> dict:
+    supabase = await get_async_supabase_client()
+
+    try:
+        response = await supabase.rpc("admin_platform_stats").execute()
+        aggregate = response.data or {}
+        by_status = aggregate.get("applications_by_status") or {}
+        return {
+            "total_users": aggregate.get("total_users", 0),
+            "total_competitions": aggregate.get("total_competitions", 0),
+            "total_teams": aggregate.get("total_teams", 0),
+            "total_applications": aggregate.get("total_applications", 0),
+            "pending_applications": by_status.get("pending", 0),
+            "users_by_role": aggregate.get("users_by_role") or {},
+            "competitions_by_status": aggregate.get("competitions_by_status") or {},
+            "applications_by_status": by_status,
+            "generated_at": datetime.utcnow().isoformat()
+        }
+    except Exception as e:
+        logger.warning(f"admin_platform_stats RPC unavailable, using count queries: {e}")
+
+    users, competitions, teams, applications, pending = await asyncio.gather(
+        _count(supabase, "user_profiles"),
+        _count(supabase, "competitions"),
+        _count_or_zero(supabase, "teams"),
+        _count_or_zero(supabase, "cfo_applications"),
+        _count_or_zero(supabase, "cfo_applications", status="pending")
+    )
+    return {
+        "total_users": users,
+        "total_competitions": competitions,
+        "total_teams": teams,
+        "total_applications": applications,
+        "pending_applications": pending,
+        "generated_at": datetime.utcnow().isoformat()
+    }
+
+
+async def _refresh() -> dict:
+    global _cached_stats, _cached_at
+    stats = await compute_admin_stats()
+    _cached_stats = stats
+    _cached_at = time.monotonic()
+    return stats
+
+
+def _refresh_in_background() -> None:
+    global _refresh_task
+    if _refresh_task is not None and not _refresh_task.done():
+        return
+
+    async def run():
+        try:
+            await _refresh()
+        except Exception as e:
+            logger.error(f"Background admin stats refresh failed: {e}")
+
+    _refresh_task = asyncio.create_task(run())
+
+
+async def get_admin_stats_cached() -> dict:
+    """Cached stats; only the very first call waits for the database"""
+    if _cached_stats is None:
+        return await _refresh()
+    if time.monotonic() - _cached_at > ADMIN_STATS_TTL_SECONDS:
+        _refresh_in_background()
+    return _cached_stats
@@ -0,0 +1,226 @@
+"""
+Near-duplicate detection for free-text CFO application answers.
+
+Each application gets a MinHash signature over the word 3-shingles of its
+six free-text answers (SIGNATURE_SIZE murmur3-based permutations, stored in
+cfo_applications.answer_minhash). Signatures are split into LSH bands; a
+per-competition in-memory band index returns candidate matches in
+sub-linear time and candidates are confirmed by estimated Jaccard
+similarity >= NEAR_DUPLICATE_THRESHOLD.
+
+An application that near-duplicates an earlier one in its competition gets
+the near_duplicate_answers red flag (informational: it is not part of the
+rubric and carries no score penalty) and the matches in near_duplicate_of.
+"""
+
+import asyncio
+import os
+import re
+from typing import Dict, List, Optional, Set
+
+import mmh3
+import numpy as np
+
+from supabase_client import get_async_supabase_client
+
+NEAR_DUPLICATE_FLAG = "near_duplicate_answers"
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8"))
+
+TEXT_ANSWER_COLUMNS = [
+    "capital_justification", "cash_vs_profit", "kpi_prioritization",
+    "dscr_impact", "mindset_explanation", "why_top_100"
+]
+
+SHINGLE_SIZE = 3
+MIN_SHINGLES = 5  # shorter answers are too generic to compare
+SIGNATURE_SIZE = 128
+LSH_BANDS = 16
+LSH_ROWS = SIGNATURE_SIZE // LSH_BANDS  # 16 x 8: ~50% candidate rate at Jaccard 0.7, >90% at 0.8
+LOAD_PAGE_SIZE = 1000
+WRITE_CHUNK_SIZE = 500
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.RandomState(20251221)  # fixed: stored signatures must stay comparable
+_PERM_A = _rng.randint(1, 1 << 32, size=SIGNATURE_SIZE, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 32, size=SIGNATURE_SIZE, dtype=np.uint64)
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def shingles(texts: List[Optional[str]]) -> Set[str]:
+    result = set()
+    for text in texts:
+        words = _WORD.findall((text or "").lower())
+        if 0 < len(words) < SHINGLE_SIZE:
+            result.add(" ".join(words))
+        for i in range(len(words) - SHINGLE_SIZE + 1):
+            result.add(" ".join(words[i:i + SHINGLE_SIZE]))
+    return result
+
+
+def minhash_signature(answers: dict) -> Optional[List[int]]:
+    """Signature of an application's free-text answers (signed int32s, for an INTEGER[] column)"""
+    items = shingles([answers.get(column) for column in TEXT_ANSWER_COLUMNS])
+    if len(items) < MIN_SHINGLES:
+        return None
+    hashes = np.fromiter((mmh3.hash(item, signed=False) for item in items), dtype=np.uint64, count=len(items))
+    # (a * h + b) mod p per permutation; a, b, h < 2^32 so nothing overflows uint64
+    permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _MERSENNE_PRIME
+    signature = (permuted.min(axis=1) & np.uint64(0xFFFFFFFF)).astype(np.uint32).view(np.int32)
+    return signature.tolist()
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.count_nonzero(a == b)) / SIGNATURE_SIZE
+
+
+class CompetitionSignatureIndex:
+    """LSH band index over one competition's stored signatures"""
+
+    def __init__(self, competition_id: str):
+        self.competition_id = competition_id
+        self.signatures: Dict[str, np.ndarray] = {}
+        self.bands: List[Dict[bytes, List[str]]] = [{} for _ in range(LSH_BANDS)]
+        self.loaded_until: Optional[str] = None  # newest submitted_at seen
+        self.lock = asyncio.Lock()
+
+    @staticmethod
+    def _band_keys(signature: np.ndarray) -> List[bytes]:
+        return [signature[i * LSH_ROWS:(i + 1) * LSH_ROWS].tobytes() for i in range(LSH_BANDS)]
+
+    def add(self, app_id: str, signature: List[int], submitted_at: Optional[str] = None) -> None:
+        app_id = str(app_id)
+        if app_id in self.signatures or not signature or len(signature) != SIGNATURE_SIZE:
+            return
+        array = np.array(signature, dtype=np.int32)
+        self.signatures[app_id] = array
+        for band, key in zip(self.bands, self._band_keys(array)):
+            band.setdefault(key, []).append(app_id)
+        if submitted_at and (self.loaded_until is None or submitted_at > self.loaded_until):
+            self.loaded_until = submitted_at
+
+    def matches(self, signature: Optional[List[int]], exclude_id: Optional[str] = None) -> List[dict]:
+        """Indexed applications at or above the similarity threshold, most similar first"""
+        if not signature:
+            return []
+        array = np.array(signature, dtype=np.int32)
+        candidates = set()
+        for band, key in zip(self.bands, self._band_keys(array)):
+            candidates.update(band.get(key, ()))
+        candidates.discard(str(exclude_id) if exclude_id is not None else None)
+
+        found = []
+        for app_id in candidates:
+            score = similarity(array, self.signatures[app_id])
+            if score >= NEAR_DUPLICATE_THRESHOLD:
+                found.append({"application_id": app_id, "similarity": round(score, 3)})
+        return sorted(found, key=lambda match: -match["similarity"])
+
+
+_indexes: Dict[str, CompetitionSignatureIndex] = {}
+
+
+async def get_signature_index(competition_id: str) -> CompetitionSignatureIndex:
+    """Competition index, topped up with signatures stored since it was last read
+    (so submissions handled by other workers are seen too)"""
+    index = _indexes.setdefault(competition_id, CompetitionSignatureIndex(competition_id))
+    async with index.lock:
+        supabase = await get_async_supabase_client()
+        start = 0
+        while True:
+            query = supabase.table("cfo_applications")\
+                .select("id, answer_minhash, submitted_at")\
+                .eq("competition_id", competition_id)\
+                .not_.is_("answer_minhash", "null")
+            if index.loaded_until:
+                query = query.gte("submitted_at", index.loaded_until)
+            response = await query.order("submitted_at").order("id").range(start, start + LOAD_PAGE_SIZE - 1).execute()
+            rows = response.data or []
+            for row in rows:
+                index.add(row["id"], row["answer_minhash"], row.get("submitted_at"))
+            if len(rows) < LOAD_PAGE_SIZE:
+                return index
+            start += LOAD_PAGE_SIZE
+
+
+def with_near_duplicate_flag(red_flags: List[str], is_duplicate: bool) -> List[str]:
+    flags = [flag for flag in (red_flags or []) if flag != NEAR_DUPLICATE_FLAG]
+    return flags + [NEAR_DUPLICATE_FLAG] if is_duplicate else flags
+
+
+async def check_submission(competition_id: str, answers: dict) -> dict:
+    """Signature and near-duplicate matches for an application about to be stored"""
+    signature = minhash_signature(answers)
+    index = await get_signature_index(competition_id)
+    return {"answer_minhash": signature, "near_duplicate_of": index.matches(signature)}
+
+
+def register_submission(competition_id: str, app_id: str, signature: Optional[List[int]], submitted_at: Optional[str]) -> None:
+    index = _indexes.get(competition_id)
+    if index is not None and signature:
+        index.add(app_id, signature, submitted_at)
+
+
+async def backfill_competition(competition_id: str, dry_run: bool = False) -> dict:
+    """
+    Compute missing signatures and re-check every application against the ones
+    submitted before it (same rule as at submit time), then write what changed.
+    """
+    supabase = await get_async_supabase_client()
+    columns = ["id", "submitted_at", "answer_minhash", "near_duplicate_of", "red_flags"] + TEXT_ANSWER_COLUMNS
+    rows = []
+    start = 0
+    while True:
+        response = await supabase.table("cfo_applications")\
+            .select(", ".join(columns))\
+            .eq("competition_id", competition_id)\
+            .order("submitted_at")\
+            .order("id")\
+            .range(start, start + LOAD_PAGE_SIZE - 1)\
+            .execute()
+        page = response.data or []
+        rows.extend(page)
+        if len(page) < LOAD_PAGE_SIZE:
+            break
+        start += LOAD_PAGE_SIZE
+
+    index = CompetitionSignatureIndex(competition_id)
+    patches = []
+    computed = 0
+    flagged = 0
+    for row in rows:
+        signature = row.get("answer_minhash")
+        if not signature:
+            signature = minhash_signature(row)
+            computed += signature is not None
+        matches = index.matches(signature)
+        index.add(row["id"], signature, row.get("submitted_at"))
+
+        red_flags = with_near_duplicate_flag(row.get("red_flags") or [], bool(matches))
+        flagged += bool(matches)
+        if signature != row.get("answer_minhash") or matches != (row.get("near_duplicate_of") or []) or red_flags != (row.get("red_flags") or []):
+            patches.append({
+                "id": row["id"],
+                "answer_minhash": signature,
+                "near_duplicate_of": matches,
+                "red_flags": red_flags,
+                "red_flag_count": len(red_flags)
+            })
+
+    if not dry_run:
+        for chunk_start in range(0, len(patches), WRITE_CHUNK_SIZE):
+            await supabase.rpc(
+                "apply_answer_similarity",
+                {"p_rows": patches[chunk_start:chunk_start + WRITE_CHUNK_SIZE]}
+            ).execute()
+        _indexes[competition_id] = index
+
+    return {
+        "competition_id": competition_id,
+        "applications": len(rows),
+        "signatures_computed": computed,
+        "near_duplicates": flagged,
+        "updated": len(patches),
+        "dry_run": dry_run
+    }
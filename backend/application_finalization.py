@@ -0,0 +1,127 @@
+"""
+Automatic finalisation of CFO application statuses.
+
+A background loop checks every FINALIZATION_INTERVAL_SECONDS for
+competitions that have left the application phase (status no longer
+applications_open / open, and not draft / upcoming) without a
+competitions.applications_finalized_at marker. For each one it:
+
+  1. re-scores rows still on an older rubric version (score_refresh)
+  2. streams the ranking by rank_key and bands it with determine_status()
+     (shortlisting.select_shortlist)
+  3. writes every status in one apply_cfo_shortlist() call, which keeps
+     admin overrides and reviewer decisions and only touches changed rows
+  4. sets applications_finalized_at
+
+Every step is idempotent, so a run that stops part-way is simply repeated on
+the next tick; the marker is only written once the statuses are. If
+re-scoring disagrees with the scalar scorer, nothing is written and the
+competition stays unmarked. Reopening a competition clears the marker.
+Competitions that were already closed when the marker was introduced are
+backfilled as finalised by its migration.
+"""
+
+import asyncio
+import os
+from datetime import datetime
+from typing import List, Optional
+
+from supabase_client import get_async_supabase_client
+from shortlisting import SHORTLIST_STATUSES, select_shortlist, write_shortlist
+from score_refresh import rescore_stale
+from ranking_index import ranking_index
+
+FINALIZATION_INTERVAL_SECONDS = int(os.getenv("FINALIZATION_INTERVAL_SECONDS", "60"))
+
+OPEN_STATUSES = ("applications_open", "open")
+NOT_STARTED_STATUSES = ("draft", "upcoming")
+
+_scheduler_task: Optional[asyncio.Task] = None
+
+
+class FinalizationError(RuntimeError):
+    pass
+
+
+def applications_closed(competition: dict) -> bool:
+    return (competition.get("status") or "draft") not in OPEN_STATUSES + NOT_STARTED_STATUSES
+
+
+async def competitions_to_finalize() -> List[dict]:
+    supabase = await get_async_supabase_client()
+    response = await supabase.table("competitions")\
+        .select("id, title, status")\
+        .is_("applications_finalized_at", "null")\
+        .execute()
+    return [competition for competition in response.data or [] if applications_closed(competition)]
+
+
+async def finalize_competition(competition_id: str) -> dict:
+    """Write the final ranked statuses for one competition and mark it finalised"""
+    supabase = await get_async_supabase_client()
+
+    rescored = await rescore_stale(competition_id)
+    if rescored["mismatched_ids"]:
+        # Statuses from stale scores would be final; leave the competition for the next tick
+        raise FinalizationError(f"Re-scoring disagreed with the scalar scorer for {rescored['mismatched_ids']}; nothing was written")
+    selection = await select_shortlist(competition_id)
+    qualified = [row["id"] for row in selection["qualified"]]
+    reserve = [row["id"] for row in selection["reserve"]]
+    changed = await write_shortlist(competition_id, qualified, reserve)
+    ranking_index.apply_shortlist(competition_id, qualified, reserve, SHORTLIST_STATUSES)
+
+    finalized_at = datetime.utcnow().isoformat()
+    await supabase.table("competitions")\
+        .update({"applications_finalized_at": finalized_at})\
+        .eq("id", competition_id)\
+        .execute()
+
+    return {
+        "competition_id": competition_id,
+        "qualified": len(qualified),
+        "reserve": len(reserve),
+        "rescored": rescored["written"],
+        "changed": changed,
+        "finalized_at": finalized_at
+    }
+
+
+async def finalize_closed_competitions() -> List[dict]:
+    """One scheduler tick: finalise every closed, unfinalised competition"""
+    import logging
+    logger = logging.getLogger(__name__)
+
+    results = []
+    for competition in await competitions_to_finalize():
+        try:
+            result = await finalize_competition(competition["id"])
+        except Exception as e:
+            # Left unmarked, so the next tick retries it
+            logger.error(f"Finalising applications for competition {competition['id']} failed: {e}")
+            continue
+        logger.info(f"Finalised applications for competition {competition['id']} ({competition.get('title')}): {result['changed']}")
+        results.append(result)
+    return results
+
+
+async def _run_scheduler() -> None:
+    import logging
+    logger = logging.getLogger(__name__)
+    while True:
+        try:
+            await finalize_closed_competitions()
+        except Exception as e:
+            logger.error(f"Application finalisation check failed: {e}")
+        await asyncio.sleep(FINALIZATION_INTERVAL_SECONDS)
+
+
+def start_finalization_scheduler() -> asyncio.Task:
+    global _scheduler_task
+    if _scheduler_task is None or _scheduler_task.done():
+        _scheduler_task = asyncio.create_task(_run_scheduler())
+    return _scheduler_task
+
+
+def stop_finalization_scheduler() -> None:
+    if _scheduler_task is not None:
+        _scheduler_task.cancel()
@@ -1,56 +1,170 @@
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from supabase_client import get_supabase_client
+from supabase_client import get_async_supabase_client
+from profile_cache import get_cached_profile, cache_profile
+from request_reads import RequestReads, get_request_reads
 from models import User, UserRole
 from typing import Optional
+import asyncio
+import os
 import jwt
 
 security = HTTPBearer()
 
-def decode_supabase_jwt(token: str):
+# Local JWT verification
+# HS256 tokens are checked against the project JWT secret, asymmetric tokens
+# against the project's JWKS (fetched once, re-fetched only on an unknown kid)
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
+SUPABASE_JWT_AUDIENCE = os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated")
+SUPABASE_JWKS_CACHE_SECONDS = int(os.getenv("SUPABASE_JWKS_CACHE_SECONDS", "600"))
+
+ASYMMETRIC_ALGORITHMS = ["RS256", "ES256"]
+
+_jwks_client: Optional[jwt.PyJWKClient] = None
+
+
+class LocalVerificationUnavailable(Exception):
+    """The token is well-formed but cannot be checked without Supabase Auth"""
+
+
+def _get_jwks_client() -> jwt.PyJWKClient:
+    global _jwks_client
+    if _jwks_client is None:
+        if not SUPABASE_URL:
+            raise LocalVerificationUnavailable("SUPABASE_URL is not configured")
+        _jwks_client = jwt.PyJWKClient(
+            f"{SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json",
+            cache_keys=True,
+            lifespan=SUPABASE_JWKS_CACHE_SECONDS
+        )
+    return _jwks_client
+
+
+def verify_supabase_jwt_locally(token: str) -> dict:
+    """
+    Verify signature, expiry and audience of a Supabase access token.
+    Raises jwt.PyJWTError for invalid tokens and LocalVerificationUnavailable
+    when no key material is configured for the token's algorithm.
+    """
+    alg = jwt.get_unverified_header(token).get("alg")
+
+    if alg == "HS256":
+        if not SUPABASE_JWT_SECRET:
+            raise LocalVerificationUnavailable("SUPABASE_JWT_SECRET is not configured")
+        key = SUPABASE_JWT_SECRET
+    elif alg in ASYMMETRIC_ALGORITHMS:
+        try:
+            # Unknown kid triggers a single JWKS refetch (key rotation)
+            key = _get_jwks_client().get_signing_key_from_jwt(token).key
+        except jwt.PyJWKClientConnectionError as e:
+            raise LocalVerificationUnavailable(str(e))
+    else:
+        raise jwt.InvalidAlgorithmError(f"Unsupported token algorithm: {alg}")
+
+    return jwt.decode(
+        token,
+        key,
+        algorithms=[alg],
+        audience=SUPABASE_JWT_AUDIENCE,
+        options={"require": ["exp", "sub"]}
+    )
+
+
+async def introspect_supabase_jwt(token: str) -> Optional[dict]:
+    """Ask Supabase Auth about the token (network round trip, sees revocations)"""
     try:
-        supabase = get_supabase_client()
-        response = supabase.auth.get_user(token)
-        if response:
-            return response.user
+        supabase = await get_async_supabase_client()
+        response = await supabase.auth.get_user(token)
+        if response and response.user:
+            return {"id": response.user.id, "email": response.user.email or ''}
         return None
     except Exception:
         return None
 
+
+async def decode_supabase_jwt(token: str) -> Optional[dict]:
+    """Resolve a token to {"id", "email"}, verifying locally whenever possible"""
+    try:
+        if jwt.get_unverified_header(token).get("alg") in ASYMMETRIC_ALGORITHMS:
+            # A JWKS cache miss is a blocking HTTP fetch; keep it off the event loop
+            claims = await asyncio.to_thread(verify_supabase_jwt_locally, token)
+        else:
+            claims = verify_supabase_jwt_locally(token)
+        return {"id": claims["sub"], "email": claims.get("email") or ''}
+    except LocalVerificationUnavailable:
+        return await introspect_supabase_jwt(token)
+    except jwt.PyJWTError:
+        return None
+
+
+async def load_user_profile(user_id: str, fresh: bool = False) -> Optional[dict]:
+    """Full user_profiles row, served from the profile cache unless fresh=True"""
+    profile = None if fresh else get_cached_profile(user_id)
+    if profile is not None:
+        return profile
+
+    supabase = await get_async_supabase_client()
+    profile_response = await supabase.table('user_profiles').select('*').eq('id', user_id).execute()
+    if not profile_response.data:
+        return None
+
+    profile = profile_response.data[0]
+    cache_profile(profile)
+    return profile
+
+
+async def _load_user(identity: Optional[dict], reads: RequestReads, fresh: bool = False) -> User:
+    if not identity:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials"
+        )
+
+    profile = await load_user_profile(identity["id"], fresh=fresh)
+
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User profile not found"
+        )
+
+    # Handlers in the same request read this row from the identity map
+    reads.prime('user_profiles', [profile], id=profile['id'])
+
+    return User(
+        id=profile['id'],
+        email=identity["email"] or profile.get('email') or '',
+        full_name=profile['full_name'],
+        role=UserRole(profile['role']),
+        created_at=profile['created_at'],
+        updated_at=profile['updated_at']
+    )
+
+
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    reads: RequestReads = Depends(get_request_reads)
 ) -> User:
-    token = credentials.credentials
-    supabase = get_supabase_client()
-
     try:
-        user_response = supabase.auth.get_user(token)
-        if not user_response or not user_response.user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication credentials"
-            )
-
-        user_id = user_response.user.id
-
-        profile_response = supabase.table('user_profiles').select('*').eq('id', user_id).execute()
-
-        if not profile_response.data or len(profile_response.data) == 0:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User profile not found"
-            )
-
-        profile = profile_response.data[0]
-
-        return User(
-            id=profile['id'],
-            email=user_response.user.email or '',
-            full_name=profile['full_name'],
-            role=UserRole(profile['role']),
-            created_at=profile['created_at'],
-            updated_at=profile['updated_at']
+        return await _load_user(await decode_supabase_jwt(credentials.credentials), reads)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"Authentication error: {str(e)}"
         )
+
+
+async def get_current_user_introspected(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    reads: RequestReads = Depends(get_request_reads)
+) -> User:
+    """Like get_current_user, but always checks with Supabase Auth and reloads the profile,
+    so revoked sessions and role changes take effect immediately"""
+    try:
+        return await _load_user(await introspect_supabase_jwt(credentials.credentials), reads, fresh=True)
     except HTTPException:
         raise
     except Exception as e:
@@ -59,7 +173,8 @@ async def get_current_user(
             detail=f"Authentication error: {str(e)}"
         )
 
-async def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+
+async def get_admin_user(current_user: User = Depends(get_current_user_introspected)) -> User:
     import logging
     logger = logging.getLogger(__name__)
     logger.info(f"Admin check: user {current_user.email} has role {current_user.role}")
@@ -70,3 +185,13 @@ async def get_admin_user(current_user: User = Depends(get_current_user)) -> User
             detail="Admin access required"
         )
     return current_user
+
+
+async def get_judge_user(current_user: User = Depends(get_current_user_introspected)) -> User:
+    """Judges (and admins, who may score as well)"""
+    if current_user.role not in (UserRole.JUDGE, UserRole.ADMIN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Judge access required"
+        )
+    return current_user
@@ -7,6 +7,7 @@ from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 from enum import Enum
 from datetime import datetime
+from scoring_rubric import DEFAULT_RUBRIC, get_active_rubric
 
 # =========================================================
 # STEP 1: Leadership Profile Questions & Scoring
@@ -143,14 +144,10 @@ class CFOFullApplication(BaseModel):
 # SCORING WEIGHTS
 # =========================================================
 
-SCORING_WEIGHTS = {
-    "leadership": 1.2,
-    "ethics": 1.3,
-    "capital_allocation": 1.2,
-    "technical_finance": 0.8,
-    "judgment": 1.0,
-    "commitment": 1.0
-}
+# Weights, option points, length bands, red flags and gates are data: see
+# scoring_rubric.DEFAULT_RUBRIC and the scoring_rubrics table. These are the
+# default rubric's weights, kept for callers that read them directly.
+SCORING_WEIGHTS = DEFAULT_RUBRIC["weights"]
 
 # =========================================================
 # SCORING LOGIC
@@ -158,234 +155,23 @@ SCORING_WEIGHTS = {
 
 def score_step1(step1: CFOApplicationStep1) -> Dict:
     """Score Leadership Profile - returns score and red flags"""
-    score = 0
-    red_flags = []
-    
-    # Experience years scoring
-    exp_scores = {
-        ExperienceYears.LESS_THAN_2: 5,
-        ExperienceYears.TWO_TO_FIVE: 15,
-        ExperienceYears.FIVE_TO_TEN: 25,
-        ExperienceYears.MORE_THAN_10: 30
-    }
-    score += exp_scores.get(step1.experience_years, 0)
-    
-    # Leadership exposure scoring
-    exposure_scores = {
-        LeadershipExposure.NONE: 0,
-        LeadershipExposure.TEAM_LEAD: 15,
-        LeadershipExposure.DEPARTMENT_HEAD: 25,
-        LeadershipExposure.C_SUITE: 35
-    }
-    score += exposure_scores.get(step1.leadership_exposure, 0)
-    
-    # Decision ownership scoring
-    ownership_scores = {
-        DecisionOwnership.AVOID: 0,
-        DecisionOwnership.DELEGATE: 10,
-        DecisionOwnership.OWN_WITH_SUPPORT: 20,
-        DecisionOwnership.FULL_OWNERSHIP: 30
-    }
-    score += ownership_scores.get(step1.decision_ownership, 0)
-    if step1.decision_ownership == DecisionOwnership.AVOID:
-        red_flags.append("avoids_decisions")
-    
-    # Leadership willingness scoring
-    willingness_scores = {
-        LeadershipWillingness.NOT_INTERESTED: 0,
-        LeadershipWillingness.MAYBE_LATER: 5,
-        LeadershipWillingness.READY_WITH_GUIDANCE: 15,
-        LeadershipWillingness.FULLY_READY: 25
-    }
-    score += willingness_scores.get(step1.leadership_willingness, 0)
-    
-    # Commitment level scoring
-    commitment_scores = {
-        CommitmentLevel.EXPLORING: 5,
-        CommitmentLevel.PARTIALLY_COMMITTED: 10,
-        CommitmentLevel.HIGHLY_COMMITTED: 20,
-        CommitmentLevel.ALL_IN: 25
-    }
-    score += commitment_scores.get(step1.commitment_level, 0)
-    
-    # NEW: CFO Readiness & Commitment scoring (merged question)
-    # Replaces both willingness and commitment weights
-    if step1.cfo_readiness_commitment:
-        readiness_scores = {
-            CFOReadinessCommitment.NOT_READY: 0,  # Hard gate - should not reach here
-            CFOReadinessCommitment.EXPLORING: 10,
-            CFOReadinessCommitment.READY_WITH_CONDITIONS: 25,
-            CFOReadinessCommitment.FULLY_READY: 40
-        }
-        score += readiness_scores.get(step1.cfo_readiness_commitment, 0)
-        
-        # Hard gate: NOT_READY = auto-exclude
-        if step1.cfo_readiness_commitment == CFOReadinessCommitment.NOT_READY:
-            red_flags.append("not_ready_for_cfo")
-            return {
-                "raw_score": 0,
-                "weighted_score": 0,
-                "red_flags": ["not_ready_for_cfo"],
-                "auto_exclude": True,
-                "exclusion_reason": "Applicant indicated they are not ready for CFO responsibilities"
-            }
-    
-    # Auto-exclude check: lowest willingness AND lowest commitment
-    auto_exclude = (
-        step1.leadership_willingness == LeadershipWillingness.NOT_INTERESTED and
-        step1.commitment_level == CommitmentLevel.EXPLORING
-    )
-    
-    if auto_exclude:
-        red_flags.append("low_willingness_commitment")
-    
-    return {
-        "raw_score": score,
-        "weighted_score": score * SCORING_WEIGHTS["leadership"],
-        "red_flags": red_flags,
-        "auto_exclude": auto_exclude
-    }
+    return get_active_rubric().score_step("step1", step1)
 
 def score_step2(step2: CFOApplicationStep2) -> Dict:
     """Score Judgment & Capital Allocation"""
-    score = 0
-    red_flags = []
-    
-    # Capital allocation choice
-    capital_scores = {
-        CapitalAllocationChoice.SAFE_INVESTMENT: 10,
-        CapitalAllocationChoice.MODERATE_RISK: 20,
-        CapitalAllocationChoice.GROWTH_INVESTMENT: 25,
-        CapitalAllocationChoice.AGGRESSIVE_EXPANSION: 15  # Too risky without context
-    }
-    score += capital_scores.get(step2.capital_allocation, 0)
-    
-    # Text answer quality (basic check - length and substance)
-    if len(step2.capital_justification.strip()) < 50:
-        red_flags.append("weak_justification")
-        score += 5
-    elif len(step2.capital_justification.strip()) >= 100:
-        score += 20
-    else:
-        score += 15
-    
-    if len(step2.cash_vs_profit.strip()) < 50:
-        red_flags.append("weak_cash_profit_answer")
-        score += 5
-    elif len(step2.cash_vs_profit.strip()) >= 100:
-        score += 20
-    else:
-        score += 15
-    
-    if len(step2.kpi_prioritization.strip()) < 50:
-        score += 5
-    elif len(step2.kpi_prioritization.strip()) >= 100:
-        score += 20
-    else:
-        score += 15
-    
-    return {
-        "raw_score": score,
-        "weighted_score": score * SCORING_WEIGHTS["capital_allocation"],
-        "red_flags": red_flags,
-        "auto_exclude": False
-    }
+    return get_active_rubric().score_step("step2", step2)
 
 def score_step3(step3: CFOApplicationStep3) -> Dict:
     """Score Financial Reality Under Pressure"""
-    score = 0
-    red_flags = []
-    
-    # DSCR choice
-    dscr_scores = {
-        DSCRChoice.PRIORITIZE_DEBT: 15,
-        DSCRChoice.BALANCE_BOTH: 25,
-        DSCRChoice.PRIORITIZE_GROWTH: 10,
-        DSCRChoice.RENEGOTIATE: 20
-    }
-    score += dscr_scores.get(step3.dscr_choice, 0)
-    
-    # Cost priority
-    cost_scores = {
-        CostPriority.CUT_PEOPLE: 5,  # Last resort mentality
-        CostPriority.CUT_MARKETING: 10,
-        CostPriority.OPTIMIZE_OPERATIONS: 25,
-        CostPriority.RENEGOTIATE_VENDORS: 20
-    }
-    score += cost_scores.get(step3.cost_priority, 0)
-    if step3.cost_priority == CostPriority.CUT_PEOPLE:
-        red_flags.append("people_first_cut")
-    
-    # CFO mindset
-    mindset_scores = {
-        CFOMindset.NUMBER_CRUNCHER: 10,
-        CFOMindset.BUSINESS_PARTNER: 20,
-        CFOMindset.STRATEGIC_ADVISOR: 25,
-        CFOMindset.CHIEF_VALUE_OFFICER: 30
-    }
-    score += mindset_scores.get(step3.cfo_mindset, 0)
-    
-    # Text quality
-    if len(step3.dscr_impact.strip()) >= 50:
-        score += 10
-    if len(step3.mindset_explanation.strip()) >= 50:
-        score += 10
-    
-    return {
-        "raw_score": score,
-        "weighted_score": score * SCORING_WEIGHTS["technical_finance"],
-        "red_flags": red_flags,
-        "auto_exclude": False
-    }
+    return get_active_rubric().score_step("step3", step3)
 
 def score_step4(step4: CFOApplicationStep4) -> Dict:
     """Score Ethics & Final Ownership - HARD DISQUALIFIER"""
-    score = 0
-    red_flags = []
-    auto_exclude = False
-    
-    # Ethics choice - CRITICAL
-    ethics_scores = {
-        EthicsChoice.REPORT_IMMEDIATELY: 35,
-        EthicsChoice.INVESTIGATE_FIRST: 30,
-        EthicsChoice.CONSULT_LEGAL: 25,
-        EthicsChoice.ADJUST_QUIETLY: 0,  # DISQUALIFIER
-        EthicsChoice.DO_NOTHING: 0  # DISQUALIFIER
-    }
-    score += ethics_scores.get(step4.ethics_choice, 0)
-    
-    # Auto-exclude for unethical choices
-    if step4.ethics_choice in [EthicsChoice.ADJUST_QUIETLY, EthicsChoice.DO_NOTHING]:
-        auto_exclude = True
-        red_flags.append("ethics_failure")
-    
-    # Culture vs results
-    culture_scores = {
-        CultureVsResults.RESULTS_FIRST: 10,
-        CultureVsResults.CULTURE_FIRST: 20,
-        CultureVsResults.BALANCE_BOTH: 30,
-        CultureVsResults.DEPENDS_ON_SITUATION: 15
-    }
-    score += culture_scores.get(step4.culture_vs_results, 0)
-    
-    # Final motivation - length and substance
-    if len(step4.why_top_100.strip()) < 100:
-        red_flags.append("weak_motivation")
-        score += 10
-    elif len(step4.why_top_100.strip()) >= 200:
-        score += 35
-    else:
-        score += 25
-    
-    return {
-        "raw_score": score,
-        "weighted_score": score * SCORING_WEIGHTS["ethics"],
-        "red_flags": red_flags,
-        "auto_exclude": auto_exclude
-    }
+    return get_active_rubric().score_step("step4", step4)
 
 def calculate_total_score(application: CFOFullApplication) -> Dict:
-    """Calculate total score with all components"""
+    """Calculate total score with all components (active rubric)"""
+    rubric = get_active_rubric()
     
     step1_result = score_step1(application.step1)
     step2_result = score_step2(application.step2)
@@ -414,12 +200,14 @@ def calculate_total_score(application: CFOFullApplication) -> Dict:
         step4_result["red_flags"]
     )
     
-    # Red flag penalty (5 points per flag after first 2)
-    red_flag_penalty = max(0, (len(all_red_flags) - 2) * 5)
+    # Red flag penalty (default: 5 points per flag after first 2)
+    red_flag_penalty = rubric.red_flag_penalty(len(all_red_flags))
     
     # Auto-exclude if any step triggers it
     auto_exclude = (
         step1_result["auto_exclude"] or
+        step2_result["auto_exclude"] or
+        step3_result["auto_exclude"] or
         step4_result["auto_exclude"]  # Ethics is hardest
     )
     
@@ -433,13 +221,15 @@ def calculate_total_score(application: CFOFullApplication) -> Dict:
         "red_flags": all_red_flags,
         "red_flag_count": len(all_red_flags),
         "auto_exclude": auto_exclude,
-        "exclusion_reason": "ethics_or_commitment_failure" if auto_exclude else None,
+        "exclusion_reason": rubric.exclusion_reason if auto_exclude else None,
+        "rubric_version": rubric.version,
         "section_scores": {
             "leadership": step1_result["weighted_score"],
             "capital_allocation": step2_result["weighted_score"],
             "financial_judgment": step3_result["weighted_score"],
             "ethics": step4_result["weighted_score"]
         },
+        # Ranking order after final_score; persisted in cfo_applications.rank_key
         "tie_breakers": {
             "leadership_score": step1_result["weighted_score"],
             "ethics_score": step4_result["weighted_score"],
@@ -448,12 +238,16 @@ def calculate_total_score(application: CFOFullApplication) -> Dict:
         }
     }
 
+# Rank cut-offs: top 100 qualify, the next 50 are the reserve list
+QUALIFIED_LIMIT = 100
+RESERVE_LIMIT = 150
+
 def determine_status(rank: int, auto_exclude: bool) -> str:
     """Determine applicant status based on rank"""
     if auto_exclude:
         return "excluded"
-    if rank <= 100:
+    if rank <= QUALIFIED_LIMIT:
         return "qualified"
-    if rank <= 150:
+    if rank <= RESERVE_LIMIT:
         return "reserve"
     return "not_selected"
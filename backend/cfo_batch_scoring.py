@@ -0,0 +1,333 @@
+"""
+Batch re-scoring of stored CFO applications.
+
+Evaluates the active compiled rubric column-wise: stored answers are loaded
+into NumPy arrays, option answers become integer codes into per-question
+point arrays, length and text-feature bands are a searchsorted over the
+rubric thresholds, and every flag, gate and penalty rule is applied to the
+whole batch at once.
+
+The arithmetic follows the scalar path operation for operation (integer raw
+points, raw * weight per step, steps summed in order 1-4), so results are
+bit-identical; verify_against_scalar() checks that on a sample before writes.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from supabase_client import get_async_supabase_client
+from cfo_application_scoring import CFOFullApplication, calculate_total_score
+from answer_similarity import NEAR_DUPLICATE_FLAG
+from text_features import ANSWER_FEATURES, answer_features
+from scoring_rubric import STEP_NAMES, CompiledRubric, get_active_rubric, refresh_active_rubric
+
+LOAD_PAGE_SIZE = 1000
+WRITE_CHUNK_SIZE = 1000
+
+# Stored score column for each step's weighted score
+SECTION_COLUMNS = {
+    "step1": "leadership_score",
+    "step2": "capital_score",
+    "step3": "judgment_score",
+    "step4": "ethics_score"
+}
+
+# Red flags set outside the rubric (answer_similarity); re-scoring keeps them
+PRESERVED_FLAGS = {NEAR_DUPLICATE_FLAG}
+
+STORED_SCORE_COLUMNS = [
+    "total_score", "raw_score", "leadership_score", "ethics_score", "capital_score",
+    "judgment_score", "red_flag_count", "red_flags", "auto_excluded", "exclusion_reason",
+    "scoring_version"
+]
+
+
+def load_columns(rubric: CompiledRubric) -> List[str]:
+    return (
+        ["id", "competition_id", "submitted_at", "status", "admin_override"] +
+        list(rubric.option_values) + rubric.text_columns + STORED_SCORE_COLUMNS
+    )
+
+
+def is_scorable(row: dict, rubric: CompiledRubric) -> bool:
+    """Rows CFOFullApplication would accept: every required option valid, texts present"""
+    for column, values in rubric.option_values.items():
+        value = row.get(column)
+        if value is None and column in rubric.optional_columns:
+            continue
+        if value not in values:
+            return False
+    return all(isinstance(row.get(column), str) for column in rubric.text_columns)
+
+
+def _codes(rows: List[dict], values: tuple, column: str) -> np.ndarray:
+    """Option value -> index into the question's values; unanswered -> len(values)"""
+    lookup = {value: i for i, value in enumerate(values)}
+    return np.fromiter((lookup.get(row.get(column), len(values)) for row in rows), dtype=np.int64, count=len(rows))
+
+
+def _text_lengths(rows: List[dict], column: str) -> np.ndarray:
+    return np.fromiter((len(row[column].strip()) for row in rows), dtype=np.int64, count=len(rows))
+
+
+def _matches(condition, codes: Dict[str, np.ndarray], rubric: CompiledRubric, n: int) -> np.ndarray:
+    mask = np.ones(n, dtype=bool)
+    for column, values in condition:
+        wanted = [i for i, value in enumerate(rubric.option_values[column]) if value in values]
+        mask &= np.isin(codes[column], wanted)
+    return mask
+
+
+def _text_feature_values(rows: List[dict], rubric: CompiledRubric) -> Dict[tuple, np.ndarray]:
+    values = {}
+    for column in sorted({column for column, _ in rubric.feature_inputs}):
+        features = answer_features([row[column] for row in rows])
+        for i, feature in enumerate(ANSWER_FEATURES):
+            values[(column, feature)] = features[:, i]
+    return values
+
+
+def answer_columns(rows: List[dict], rubric: Optional[CompiledRubric] = None) -> dict:
+    """Columnar form of the answers: option codes, stripped text lengths and the
+    text features the rubric reads. Codes index the form's option values, so they
+    stay valid across rubric versions."""
+    rubric = rubric or get_active_rubric()
+    return {
+        "n": len(rows),
+        "codes": {column: _codes(rows, values, column) for column, values in rubric.option_values.items()},
+        "lengths": {column: _text_lengths(rows, column) for column in rubric.text_columns},
+        "features": _text_feature_values(rows, rubric)
+    }
+
+
+def score_batch(rows: List[dict], rubric: Optional[CompiledRubric] = None) -> Dict[str, np.ndarray]:
+    """Vectorised calculate_total_score() over stored application rows (all must be scorable)"""
+    rubric = rubric or get_active_rubric()
+    return score_columns(answer_columns(rows, rubric), rubric)
+
+
+def score_columns(columns: dict, rubric: CompiledRubric) -> Dict[str, np.ndarray]:
+    """score_batch() over answers already in columnar form (see answer_columns())"""
+    n = columns["n"]
+    codes = columns["codes"]
+    lengths = columns["lengths"]
+    features = columns.get("features") or {}
+
+    flag_names: List[str] = []
+    flag_masks: List[np.ndarray] = []
+    total_raw = np.zeros(n, dtype=np.int64)
+    total_weighted = np.zeros(n, dtype=np.float64)
+    auto_exclude = np.zeros(n, dtype=bool)
+    sections = {}
+
+    for step_name in STEP_NAMES:
+        step = rubric.steps[step_name]
+
+        # Gates return early in the scalar path: first matching gate wins
+        gated = np.zeros(n, dtype=bool)
+        gate_flags = []
+        for condition, flag, _ in step.gates:
+            hit = _matches(condition, codes, rubric, n) & ~gated
+            gate_flags.append((flag, hit))
+            gated |= hit
+
+        raw = np.zeros(n, dtype=np.int64)
+        for column, points in step.points:
+            table = np.array([points.get(value, 0) for value in rubric.option_values[column]] + [0], dtype=np.int64)
+            raw += table[codes[column]]
+
+        step_flags = []
+        step_exclude = np.zeros(n, dtype=bool)
+        for rule in step.rules:
+            if rule[0] == "length":
+                _, column, thresholds, points, flag_below, flag = rule
+                band = np.searchsorted(np.array(thresholds), lengths[column], side="right") - 1
+                raw += np.array(points, dtype=np.int64)[band]
+                if flag:
+                    step_flags.append((flag, lengths[column] < flag_below))
+            elif rule[0] == "feature":
+                _, column, feature, thresholds, points, flag_below, flag = rule
+                values = features[(column, feature)]
+                band = np.searchsorted(np.array(thresholds), values, side="right") - 1
+                raw += np.array(points, dtype=np.int64)[band]
+                if flag:
+                    step_flags.append((flag, values < flag_below))
+            else:
+                _, condition, flag, exclude = rule
+                hit = _matches(condition, codes, rubric, n)
+                step_flags.append((flag, hit))
+                if exclude:
+                    step_exclude |= hit
+
+        raw = np.where(gated, 0, raw)
+        weighted = raw * step.weight
+        for flag, mask in gate_flags + [(flag, mask & ~gated) for flag, mask in step_flags]:
+            flag_names.append(flag)
+            flag_masks.append(mask)
+
+        total_raw = total_raw + raw
+        total_weighted = total_weighted + weighted
+        auto_exclude |= gated | step_exclude
+        sections[step_name] = weighted
+
+    flags = np.stack(flag_masks, axis=1) if flag_masks else np.zeros((n, 0), dtype=bool)
+    red_flag_count = flags.sum(axis=1).astype(np.int64)
+    red_flag_penalty = np.maximum(0, (red_flag_count - rubric.free_flags) * rubric.points_per_flag)
+
+    return {
+        "total_raw_score": total_raw,
+        "total_weighted_score": total_weighted,
+        "red_flag_penalty": red_flag_penalty,
+        "final_score": total_weighted - red_flag_penalty,
+        "red_flag_count": red_flag_count,
+        "auto_exclude": auto_exclude,
+        "sections": sections,
+        "flags": flags,
+        "flag_names": flag_names
+    }
+
+
+def red_flag_lists(flags: np.ndarray, flag_names: List[str]) -> List[List[str]]:
+    """Per-row flag names, in the order calculate_total_score() emits them"""
+    return [[flag_names[i] for i in np.flatnonzero(row)] for row in flags]
+
+
+def score_patches(rows: List[dict], result: Dict[str, np.ndarray], rubric: Optional[CompiledRubric] = None) -> List[dict]:
+    """Stored-column values for each scored row, in cfo_applications column names"""
+    rubric = rubric or get_active_rubric()
+    red_flags = [
+        flags + [flag for flag in (row.get("red_flags") or []) if flag in PRESERVED_FLAGS]
+        for row, flags in zip(rows, red_flag_lists(result["flags"], result["flag_names"]))
+    ]
+    final_score = result["final_score"].tolist()
+    raw_score = result["total_raw_score"].tolist()
+    sections = {SECTION_COLUMNS[step]: weighted.tolist() for step, weighted in result["sections"].items()}
+    auto_exclude = result["auto_exclude"].tolist()
+    return [
+        {
+            "id": row["id"],
+            "total_score": final_score[i],
+            "raw_score": raw_score[i],
+            **{column: values[i] for column, values in sections.items()},
+            "red_flag_count": len(red_flags[i]),
+            "red_flags": red_flags[i],
+            "auto_excluded": auto_exclude[i],
+            "exclusion_reason": rubric.exclusion_reason if auto_exclude[i] else None,
+            "scoring_version": rubric.version
+        }
+        for i, row in enumerate(rows)
+    ]
+
+
+def application_from_row(row: dict) -> CFOFullApplication:
+    """Rebuild the submitted model from a stored row (for the scalar path)"""
+    steps = {
+        step: {column: row.get(column) for column in CFOFullApplication.model_fields[step].annotation.model_fields}
+        for step in STEP_NAMES
+    }
+    return CFOFullApplication(competition_id=str(row.get("competition_id") or ""), **steps)
+
+
+def verify_against_scalar(rows: List[dict], patches: List[dict], sample: int) -> List[str]:
+    """Ids (from an evenly spaced sample) where the batch result differs from calculate_total_score()"""
+    if not rows or sample <= 0:
+        return []
+    mismatched = []
+    for i in np.unique(np.linspace(0, len(rows) - 1, min(sample, len(rows))).astype(int)):
+        try:
+            expected = calculate_total_score(application_from_row(rows[i]))
+        except ValueError:
+            # Legacy row the submit model would reject (e.g. over-length text)
+            continue
+        patch = patches[i]
+        if (
+            patch["total_score"] != expected["final_score"] or
+            patch["raw_score"] != expected["total_raw_score"] or
+            patch["leadership_score"] != expected["section_scores"]["leadership"] or
+            patch["capital_score"] != expected["section_scores"]["capital_allocation"] or
+            patch["judgment_score"] != expected["section_scores"]["financial_judgment"] or
+            patch["ethics_score"] != expected["section_scores"]["ethics"] or
+            [flag for flag in patch["red_flags"] if flag not in PRESERVED_FLAGS] != expected["red_flags"] or
+            patch["auto_excluded"] != expected["auto_exclude"]
+        ):
+            mismatched.append(rows[i]["id"])
+    return mismatched
+
+
+def _stored_value_differs(stored, new) -> bool:
+    if isinstance(new, float):
+        # Score columns are DECIMAL(10,2)
+        return stored is None or round(float(stored), 2) != round(new, 2)
+    return stored != new
+
+
+def changed_patches(rows: List[dict], patches: List[dict]) -> List[dict]:
+    return [
+        patch for row, patch in zip(rows, patches)
+        if any(_stored_value_differs(row.get(column), patch[column]) for column in STORED_SCORE_COLUMNS)
+    ]
+
+
+async def load_applications(columns: List[str], competition_id: Optional[str] = None) -> List[dict]:
+    """All stored applications (optionally one competition), paged by id"""
+    supabase = await get_async_supabase_client()
+    rows = []
+    start = 0
+    while True:
+        query = supabase.table("cfo_applications").select(", ".join(columns))
+        if competition_id:
+            query = query.eq("competition_id", competition_id)
+        response = await query.order("id").range(start, start + LOAD_PAGE_SIZE - 1).execute()
+        page = response.data or []
+        rows.extend(page)
+        if len(page) < LOAD_PAGE_SIZE:
+            return rows
+        start += LOAD_PAGE_SIZE
+
+
+async def write_scores(patches: List[dict]) -> List[dict]:
+    """Apply score patches in chunks through apply_cfo_application_scores(); returns the updated rows"""
+    supabase = await get_async_supabase_client()
+    updated = []
+    for start in range(0, len(patches), WRITE_CHUNK_SIZE):
+        response = await supabase.rpc(
+            "apply_cfo_application_scores",
+            {"p_scores": patches[start:start + WRITE_CHUNK_SIZE]}
+        ).execute()
+        updated.extend(response.data or [])
+    return updated
+
+
+async def rescore_applications(
+    competition_id: Optional[str] = None,
+    dry_run: bool = False,
+    verify_sample: int = 50
+) -> dict:
+    """Re-score stored applications with the active rubric and write back the ones that changed
+    (scores or scoring_version)"""
+    rubric = await refresh_active_rubric()
+    rows = await load_applications(load_columns(rubric), competition_id)
+    scorable = [row for row in rows if is_scorable(row, rubric)]
+    skipped = [row["id"] for row in rows if not is_scorable(row, rubric)]
+
+    patches = score_patches(scorable, score_batch(scorable, rubric), rubric) if scorable else []
+    mismatched = verify_against_scalar(scorable, patches, verify_sample)
+    changed = changed_patches(scorable, patches)
+
+    updated = []
+    if changed and not dry_run and not mismatched:
+        updated = await write_scores(changed)
+
+    return {
+        "rubric_version": rubric.version,
+        "loaded": len(rows),
+        "scored": len(scorable),
+        "skipped_ids": skipped,
+        "changed": len(changed),
+        "written": len(updated),
+        "verified": min(verify_sample, len(scorable)) if verify_sample > 0 else 0,
+        "mismatched_ids": mismatched,
+        "dry_run": dry_run,
+        "updated_rows": updated
+    }
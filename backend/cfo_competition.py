@@ -3,16 +3,20 @@ from fastapi.security import HTTPBearer
 from typing import Optional, List
 from datetime import datetime
 from pydantic import BaseModel
+import asyncio
 import json
 import os
 
-from supabase_client import get_supabase_client
-from auth import get_current_user, get_admin_user
+from supabase_client import get_async_supabase_client, get_storage_client
+from auth import get_current_user, get_admin_user, get_judge_user
+from judging import record_score
+from profile_cache import cache_profile, invalidate_profile
+from request_reads import RequestReads, get_request_reads
 from models import (User, UserCreate, UserLogin, UserResponse, UserRole, Team,
                     TeamCreate, TeamJoin, TeamResponse, TeamMember, AssignRole,
                     TeamStatus, TeamMemberRole, Competition, CompetitionCreate,
                     CompetitionResponse, CompetitionStatus, GlobalProfileUpdate,
-                    GlobalProfileResponse)
+                    GlobalProfileResponse, JudgeScoreCreate, JudgingEntityType)
 
 # =========================================================
 # MODELS
@@ -41,14 +45,14 @@ router = APIRouter(prefix="/api/cfo", tags=["CFO Competition"])
 async def register(user_data: UserCreate):
     import logging
     logger = logging.getLogger(__name__)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
     # Email normalization (MANDATORY)
     normalized_email = user_data.email.strip().lower()
 
     try:
         # Step 1: Create user in Supabase Auth (email confirmation will be required)
-        auth_response = supabase.auth.sign_up({
+        auth_response = await supabase.auth.sign_up({
             "email": normalized_email,
             "password": user_data.password,
             "options": {
@@ -66,7 +70,7 @@ async def register(user_data: UserCreate):
         now = datetime.utcnow().isoformat()
 
         # Step 2: Check if profile was auto-created by trigger
-        existing_profile = supabase.table("user_profiles")\
+        existing_profile = await supabase.table("user_profiles")\
             .select("id")\
             .eq("id", user_id)\
             .execute()
@@ -74,7 +78,7 @@ async def register(user_data: UserCreate):
         if existing_profile.data:
             # Profile exists (created by trigger), update it with full details
             logger.info(f"Updating auto-created profile for user {user_id}")
-            supabase.table("user_profiles").update({
+            await supabase.table("user_profiles").update({
                 "email": normalized_email,
                 "full_name": user_data.full_name,
                 "role": user_data.role.value,
@@ -91,8 +95,9 @@ async def register(user_data: UserCreate):
                 "created_at": now,
                 "updated_at": now
             }
-            supabase.table("user_profiles").insert(profile_data).execute()
+            await supabase.table("user_profiles").insert(profile_data).execute()
 
+        invalidate_profile(user_id)
         logger.info(f"Registration successful for {normalized_email} (email confirmation required)")
         
         return UserResponse(
@@ -138,13 +143,13 @@ async def register(user_data: UserCreate):
 async def login(user_credentials: UserLogin):
     import logging
     logger = logging.getLogger(__name__)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
     # Email normalization (MANDATORY)
     normalized_email = user_credentials.email.strip().lower()
 
     try:
-        auth_response = supabase.auth.sign_in_with_password({
+        auth_response = await supabase.auth.sign_in_with_password({
             "email": normalized_email,
             "password": user_credentials.password
         })
@@ -161,7 +166,7 @@ async def login(user_credentials: UserLogin):
     user_email = auth_response.user.email or normalized_email
 
     try:
-        profile_result = supabase.table("user_profiles") \
+        profile_result = await supabase.table("user_profiles") \
             .select("*") \
             .eq("id", user_id) \
             .execute()
@@ -183,7 +188,7 @@ async def login(user_credentials: UserLogin):
             "updated_at": now
         }
         try:
-            insert_result = supabase.table("user_profiles").insert(new_profile).execute()
+            insert_result = await supabase.table("user_profiles").insert(new_profile).execute()
             profile_data = insert_result.data[0] if insert_result.data else new_profile
         except Exception as e:
             logger.error(f"Failed to create profile: {e}")
@@ -192,6 +197,10 @@ async def login(user_credentials: UserLogin):
     if not profile_data:
         raise HTTPException(status_code=401, detail="User profile not found")
 
+    # Fresh row from the login read replaces whatever the cache held
+    invalidate_profile(user_id)
+    cache_profile(profile_data)
+
     return {
         "access_token": auth_response.session.access_token,
         "token_type": "bearer",
@@ -207,11 +216,13 @@ async def login(user_credentials: UserLogin):
 
 
 @router.get("/auth/me", response_model=UserResponse)
-async def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(
+    current_user: User = Depends(get_current_user),
+    reads: RequestReads = Depends(get_request_reads)
+):
     """Get current user with profile_completed status"""
-    supabase = get_supabase_client()
-    profile = supabase.table("user_profiles").select("profile_completed").eq("id", current_user.id).execute()
-    profile_completed = profile.data[0].get("profile_completed", False) if profile.data else False
+    profile = await reads.first("user_profiles", id=current_user.id)
+    profile_completed = profile.get("profile_completed", False) if profile else False
     
     return UserResponse(
         id=current_user.id,
@@ -228,17 +239,16 @@ async def get_me(current_user: User = Depends(get_current_user)):
 # =========================================================
 
 @router.get("/profile", response_model=GlobalProfileResponse)
-async def get_profile(current_user: User = Depends(get_current_user)):
+async def get_profile(
+    current_user: User = Depends(get_current_user),
+    reads: RequestReads = Depends(get_request_reads)
+):
     """Get current user's global profile"""
-    supabase = get_supabase_client()
-    
-    result = supabase.table("user_profiles").select("*").eq("id", current_user.id).execute()
+    profile = await reads.first("user_profiles", id=current_user.id)
     
-    if not result.data:
+    if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
     
-    profile = result.data[0]
-    
     # Parse certifications JSON if stored as string
     certs = profile.get("certifications", [])
     if isinstance(certs, str):
@@ -276,7 +286,7 @@ async def update_profile(
     import logging
     import re
     logger = logging.getLogger(__name__)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
     
     # ============================================
     # BACKEND VALIDATION (Re-validate all inputs)
@@ -356,7 +366,8 @@ async def update_profile(
     }
     
     try:
-        result = supabase.table("user_profiles").update(update_data).eq("id", current_user.id).execute()
+        result = await supabase.table("user_profiles").update(update_data).eq("id", current_user.id).execute()
+        invalidate_profile(current_user.id)
         
         if not result.data:
             raise HTTPException(status_code=500, detail="Failed to update profile")
@@ -396,8 +407,14 @@ async def update_profile(
 # Phase 1: Individual CFO applications (NO team requirements)
 # Phase 2: Only Qualified CFOs (Top 100) can create teams
 
+from ranking_index import ranking_index, ensure_ranking_index
+from scoring_rubric import refresh_active_rubric
+from answer_similarity import check_submission, register_submission, with_near_duplicate_flag
+from cfo_rankings import (
+    DEFAULT_PAGE_SIZE, list_ranked_applications, get_ranking_counts, parse_status_filter
+)
 from cfo_application_scoring import (
-    CFOFullApplication, calculate_total_score, determine_status,
+    CFOFullApplication, calculate_total_score,
     CFOApplicationStep1, CFOApplicationStep2, CFOApplicationStep3, CFOApplicationStep4
 )
 
@@ -414,7 +431,7 @@ async def check_cfo_eligibility(
     import logging
     import re
     logger = logging.getLogger(__name__)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
     
     # UUID validation guard
     UUID_PATTERN = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
@@ -435,7 +452,7 @@ async def check_cfo_eligibility(
     }
     
     # Check competition exists
-    comp_result = supabase.table("competitions").select("*").eq("id", competition_id).execute()
+    comp_result = await supabase.table("competitions").select("*").eq("id", competition_id).execute()
     if not comp_result.data:
         eligibility["reasons"].append("Competition not found")
         return eligibility
@@ -449,7 +466,7 @@ async def check_cfo_eligibility(
         eligibility["reasons"].append("CFO applications are not currently open")
     
     # Check if already applied
-    existing_app = supabase.table("cfo_applications")\
+    existing_app = await supabase.table("cfo_applications")\
         .select("id, status")\
         .eq("user_id", current_user.id)\
         .eq("competition_id", competition_id)\
@@ -489,20 +506,16 @@ async def upload_cv(
     """
     import logging
     import re
-    from supabase import create_client
     logger = logging.getLogger(__name__)
     
-    # BOARD-APPROVED FIX: Create dedicated admin client for storage uploads
-    # This ensures service_role key is used, bypassing RLS
-    SUPABASE_URL = os.environ.get("SUPABASE_URL")
-    SUPABASE_SERVICE_ROLE_KEY = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
-    
-    if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
+    # BOARD-APPROVED FIX: Dedicated service-role storage client for uploads
+    # This ensures service_role key is used, bypassing RLS. It is separate from
+    # the global client, whose auth header changes on sign-in events.
+    try:
+        storage = await get_storage_client()
+    except RuntimeError:
         raise HTTPException(status_code=500, detail="Storage configuration error")
     
-    # Create fresh admin client - DO NOT reuse global client
-    supabase_admin = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
-    
     # UUID validation
     UUID_PATTERN = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
     if not competition_id or not UUID_PATTERN.match(competition_id):
@@ -548,12 +561,12 @@ async def upload_cv(
     try:
         # Try to remove existing file first (ignore errors)
         try:
-            supabase_admin.storage.from_("cfo-cvs").remove([file_path])
+            await storage.from_("cfo-cvs").remove([file_path])
         except Exception:
             pass
         
         # Upload new file using admin client (service role key bypasses RLS)
-        upload_result = supabase_admin.storage.from_("cfo-cvs").upload(
+        upload_result = await storage.from_("cfo-cvs").upload(
             path=file_path,
             file=contents,
             file_options={"content-type": upload_content_type, "upsert": "true"}
@@ -571,7 +584,7 @@ async def upload_cv(
         
         # Alternatively, try to get a signed URL valid for 1 year
         try:
-            signed_url_result = supabase_admin.storage.from_("cfo-cvs").create_signed_url(file_path, 31536000)  # 1 year
+            signed_url_result = await storage.from_("cfo-cvs").create_signed_url(file_path, 31536000)  # 1 year
             if signed_url_result and 'signedURL' in signed_url_result:
                 cv_url = signed_url_result['signedURL']
             elif signed_url_result and 'signedUrl' in signed_url_result:
@@ -603,7 +616,7 @@ async def submit_cfo_application(
     import logging
     import re
     logger = logging.getLogger(__name__)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
     
     # UUID validation guard - prevent unresolved placeholders
     UUID_PATTERN = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
@@ -683,7 +696,7 @@ async def submit_cfo_application(
     
     # Verify eligibility (do NOT re-check during submission, trust frontend)
     # But still check for duplicate submissions
-    existing_app = supabase.table("cfo_applications")\
+    existing_app = await supabase.table("cfo_applications")\
         .select("id")\
         .eq("user_id", current_user.id)\
         .eq("competition_id", application.competition_id)\
@@ -695,7 +708,8 @@ async def submit_cfo_application(
             detail="You have already submitted an application for this competition"
         )
     
-    # Calculate score
+    # Calculate score (with the currently active rubric version)
+    await refresh_active_rubric()
     score_result = calculate_total_score(application)
     
     # Prepare application data for storage - ATOMIC SINGLE INSERT
@@ -739,17 +753,29 @@ async def submit_cfo_application(
         "red_flags": score_result["red_flags"],
         "auto_excluded": score_result["auto_exclude"],
         "exclusion_reason": score_result["exclusion_reason"],
+        "scoring_version": score_result["rubric_version"],
         # Status - EXPLICIT SUBMITTED STATUS
         "status": "excluded" if score_result["auto_exclude"] else "submitted",
         "submitted_at": datetime.utcnow().isoformat()
     }
     
+    # Near-duplicate answers within the competition (informational red flag, no score penalty)
+    similarity_check = await check_submission(application.competition_id, app_data)
+    app_data["answer_minhash"] = similarity_check["answer_minhash"]
+    app_data["near_duplicate_of"] = similarity_check["near_duplicate_of"]
+    if similarity_check["near_duplicate_of"]:
+        app_data["red_flags"] = with_near_duplicate_flag(app_data["red_flags"], True)
+        app_data["red_flag_count"] = len(app_data["red_flags"])
+    
     try:
-        result = supabase.table("cfo_applications").insert(app_data).execute()
+        result = await supabase.table("cfo_applications").insert(app_data).execute()
         
         if not result.data:
             raise HTTPException(status_code=500, detail="Database error: Failed to save application")
         
+        ranking_index.upsert(result.data[0])
+        register_submission(application.competition_id, result.data[0]["id"], app_data["answer_minhash"], app_data["submitted_at"])
+        
         logger.info(f"CFO application submitted by user {current_user.id}, score: {score_result['final_score']}, excluded: {score_result['auto_exclude']}")
         
         # Return clean success response
@@ -774,9 +800,9 @@ async def get_my_cfo_application(
     current_user: User = Depends(get_current_user)
 ):
     """Get current user's CFO application status (without revealing score)"""
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
     
-    result = supabase.table("cfo_applications")\
+    result = await supabase.table("cfo_applications")\
         .select("id, status, submitted_at")\
         .eq("user_id", current_user.id)\
         .eq("competition_id", competition_id)\
@@ -808,37 +834,55 @@ async def get_my_cfo_application(
 @router.get("/applications/admin/list")
 async def admin_list_applications(
     competition_id: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    final_status: Optional[str] = None,
+    has_red_flags: Optional[bool] = None,
+    red_flag: Optional[str] = None,
+    summary: bool = True,
     current_user: User = Depends(get_admin_user)
 ):
-    """Admin: List all applications with scores and rankings"""
-    supabase = get_supabase_client()
-    
-    result = supabase.table("cfo_applications")\
-        .select("*, user_profiles(full_name, email)")\
-        .eq("competition_id", competition_id)\
-        .order("total_score", desc=True)\
-        .execute()
-    
-    applications = result.data or []
-    
-    # Add ranking
-    for i, app in enumerate(applications):
-        if not app.get("auto_excluded"):
-            app["rank"] = i + 1
-            app["final_status"] = determine_status(i + 1, app.get("auto_excluded", False))
-        else:
-            app["rank"] = None
-            app["final_status"] = "excluded"
+    """Admin: List applications with server-side ranks, keyset-paginated (cursor = next_cursor)"""
+    page, counts = await asyncio.gather(
+        list_ranked_applications(
+            competition_id,
+            limit=limit,
+            cursor=cursor,
+            statuses=parse_status_filter(status),
+            final_status=final_status,
+            has_red_flags=has_red_flags,
+            red_flag=red_flag,
+            summary=summary
+        ),
+        get_ranking_counts(competition_id)
+    )
     
     return {
-        "total_applications": len(applications),
-        "qualified_count": len([a for a in applications if a["final_status"] == "qualified"]),
-        "reserve_count": len([a for a in applications if a["final_status"] == "reserve"]),
-        "excluded_count": len([a for a in applications if a["final_status"] == "excluded"]),
-        "applications": applications
+        "total_applications": counts["total"],
+        "qualified_count": counts["qualified"],
+        "reserve_count": counts["reserve"],
+        "excluded_count": counts["excluded"],
+        "counts": counts,
+        **page
     }
 
 
+@router.get("/applications/admin/{application_id}/rank")
+async def admin_get_application_rank(
+    application_id: str,
+    current_user: User = Depends(get_admin_user)
+):
+    """Admin: Rank and qualification band of one application, from the in-memory ranking index"""
+    index = await ensure_ranking_index()
+    
+    ranking = index.lookup(application_id)
+    if not ranking:
+        raise HTTPException(status_code=404, detail="Application not found")
+    
+    return ranking
+
+
 @router.put("/applications/admin/{application_id}/override")
 async def admin_override_status(
     application_id: str,
@@ -849,13 +893,13 @@ async def admin_override_status(
     """Admin: Manual override of application status (rare cases)"""
     import logging
     logger = logging.getLogger(__name__)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
     
     valid_statuses = ["qualified", "reserve", "not_selected", "excluded"]
     if new_status not in valid_statuses:
         raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {valid_statuses}")
     
-    result = supabase.table("cfo_applications")\
+    result = await supabase.table("cfo_applications")\
         .update({
             "status": new_status,
             "admin_override": True,
@@ -869,6 +913,8 @@ async def admin_override_status(
     if not result.data:
         raise HTTPException(status_code=404, detail="Application not found")
     
+    ranking_index.upsert(result.data[0])
+    
     logger.info(f"Admin {current_user.id} overrode application {application_id} to status {new_status}")
     
     return {"success": True, "message": f"Application status updated to {new_status}"}
@@ -896,8 +942,10 @@ async def apply_for_cfo_legacy(
 async def list_competitions():
     import logging
     logger = logging.getLogger(__name__)
-    supabase = get_supabase_client()
-    response = supabase.table("competitions").select("*").order("created_at", desc=True).execute()
+    supabase = await get_async_supabase_client()
+    # teams(count) is a PostgREST aggregate embed: team counts for every
+    # competition come back grouped in the same query
+    response = await supabase.table("competitions").select("*, teams(count)").order("created_at", desc=True).execute()
     
     competitions = response.data or []
     
@@ -915,10 +963,9 @@ async def list_competitions():
         comp['status'] = status_map.get(original_status, original_status)
         
         # Ensure registered_teams field exists (frontend expects it)
+        team_counts = comp.pop('teams', None) or []
         if 'registered_teams' not in comp:
-            # Count actual teams for this competition
-            teams_count = supabase.table("teams").select("id", count="exact").eq("competition_id", comp["id"]).execute()
-            comp['registered_teams'] = teams_count.count if hasattr(teams_count, 'count') else 0
+            comp['registered_teams'] = team_counts[0].get('count', 0) if team_counts else 0
     
     logger.info(f"Returning {len(competitions)} competitions")
     return competitions
@@ -926,8 +973,8 @@ async def list_competitions():
 
 @router.get("/competitions/{competition_id}")
 async def get_competition(competition_id: str):
-    supabase = get_supabase_client()
-    response = supabase.table("competitions").select("*").eq("id", competition_id).execute()
+    supabase = await get_async_supabase_client()
+    response = await supabase.table("competitions").select("*").eq("id", competition_id).execute()
     
     if not response.data:
         raise HTTPException(status_code=404, detail="Competition not found")
@@ -938,7 +985,7 @@ async def get_competition(competition_id: str):
 @router.post("/competitions")
 async def create_competition(competition_data: CompetitionCreate,
                              admin_user: User = Depends(get_admin_user)):
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
     competition_dict = {
         "title": competition_data.title,
@@ -951,7 +998,7 @@ async def create_competition(competition_data: CompetitionCreate,
         "status": competition_data.status if competition_data.status in ["draft", "open", "closed"] else "draft"
     }
 
-    response = supabase.table("competitions").insert(competition_dict).execute()
+    response = await supabase.table("competitions").insert(competition_dict).execute()
 
     if not response.data:
         raise HTTPException(status_code=500, detail="Failed to create competition")
@@ -971,13 +1018,13 @@ async def check_registration(
 ):
     import logging
     logger = logging.getLogger(__name__)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
     
-    response = supabase.table("competitions").select("id").eq("id", competition_id).execute()
+    response = await supabase.table("competitions").select("id").eq("id", competition_id).execute()
     if not response.data:
         raise HTTPException(status_code=404, detail="Competition not found")
     
-    registration = supabase.table("competition_registrations") \
+    registration = await supabase.table("competition_registrations") \
         .select("id") \
         .eq("competition_id", competition_id) \
         .eq("user_id", current_user.id) \
@@ -996,9 +1043,9 @@ async def register_for_competition(
 ):
     import logging
     logger = logging.getLogger(__name__)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
     
-    competition = supabase.table("competitions").select("*").eq("id", competition_id).execute()
+    competition = await supabase.table("competitions").select("*").eq("id", competition_id).execute()
     if not competition.data:
         raise HTTPException(status_code=404, detail="Competition not found")
     
@@ -1010,7 +1057,7 @@ async def register_for_competition(
             detail="Registration is not open for this competition"
         )
     
-    existing = supabase.table("competition_registrations") \
+    existing = await supabase.table("competition_registrations") \
         .select("id") \
         .eq("competition_id", competition_id) \
         .eq("user_id", current_user.id) \
@@ -1028,7 +1075,7 @@ async def register_for_competition(
     }
     
     try:
-        result = supabase.table("competition_registrations").insert(registration_data).execute()
+        result = await supabase.table("competition_registrations").insert(registration_data).execute()
         
         if not result.data:
             raise HTTPException(status_code=500, detail="Failed to register for competition")
@@ -1048,11 +1095,33 @@ async def register_for_competition(
 # TEAMS (CFO-FIRST: Only Qualified CFOs can create teams)
 # =========================================================
 
+MAX_TEAM_SIZE = 5  # Constant max team size (no status column in DB)
+
+
+async def load_teams_with_members(reads: RequestReads, **filters) -> List[dict]:
+    """
+    Teams matching the equality filters with members embedded (teams(*, team_members(*))),
+    so any number of teams costs one round trip. Adds the computed fields the
+    frontend expects: members, max_members and status.
+    """
+    rows = await reads.select("teams", "*, team_members(*)", **filters)
+    
+    teams = []
+    for row in rows:
+        team = dict(row)
+        team["members"] = team.pop("team_members", None) or []
+        team["max_members"] = MAX_TEAM_SIZE
+        team["status"] = "complete" if len(team["members"]) >= MAX_TEAM_SIZE else "forming"
+        teams.append(team)
+    return teams
+
+
 
 @router.post("/teams")
 async def create_team(
     team_data: TeamCreate,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    reads: RequestReads = Depends(get_request_reads)
 ):
     """
     Create a new team for a competition.
@@ -1060,22 +1129,19 @@ async def create_team(
     """
     import logging
     logger = logging.getLogger(__name__)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
     
     # CFO-FIRST: Check if user is a QUALIFIED CFO for this competition
-    cfo_app = supabase.table("cfo_applications") \
-        .select("id, status") \
-        .eq("competition_id", team_data.competition_id) \
-        .eq("user_id", current_user.id) \
-        .execute()
+    cfo_app = await reads.first("cfo_applications", "id, status",
+                          competition_id=team_data.competition_id, user_id=current_user.id)
     
-    if not cfo_app.data:
+    if not cfo_app:
         raise HTTPException(
             status_code=403,
             detail="You must apply as CFO first before creating a team"
         )
     
-    app_status = cfo_app.data[0].get("status")
+    app_status = cfo_app.get("status")
     if app_status != "qualified":
         status_messages = {
             "pending": "Your CFO application is still under review",
@@ -1089,12 +1155,9 @@ async def create_team(
         )
     
     # Check if user is already in a team for this competition
-    existing_membership = supabase.table("team_members") \
-        .select("team_id, teams(competition_id)") \
-        .eq("user_id", current_user.id) \
-        .execute()
+    existing_membership = await reads.select("team_members", "team_id, teams(competition_id)", user_id=current_user.id)
     
-    for membership in existing_membership.data or []:
+    for membership in existing_membership:
         team_info = membership.get("teams")
         if team_info and team_info.get("competition_id") == team_data.competition_id:
             raise HTTPException(
@@ -1105,7 +1168,7 @@ async def create_team(
     # Create team - database trigger automatically adds leader to team_members
     try:
         # Step 1: Insert into teams table (trigger creates team_member with team_role='leader')
-        team_result = supabase.table("teams").insert({
+        team_result = await supabase.table("teams").insert({
             "team_name": team_data.team_name,
             "competition_id": team_data.competition_id,
             "leader_id": current_user.id
@@ -1118,9 +1181,11 @@ async def create_team(
         team_id = team["id"]
         
         # Step 2: Update the auto-created team_member with user_name
-        supabase.table("team_members").update({
+        await supabase.table("team_members").update({
             "user_name": current_user.full_name
         }).eq("team_id", team_id).eq("user_id", current_user.id).execute()
+        reads.invalidate("teams")
+        reads.invalidate("team_members")
         
         logger.info(f"Team created by qualified CFO {current_user.id}")
         
@@ -1136,13 +1201,13 @@ async def create_team(
 @router.get("/teams/eligibility")
 async def check_team_creation_eligibility(
     competition_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    reads: RequestReads = Depends(get_request_reads)
 ):
     """
     Check if user can create a team (CFO-FIRST model).
     Only qualified CFOs (Top 100) can create teams.
     """
-    supabase = get_supabase_client()
     
     eligibility = {
         "can_create_team": False,
@@ -1152,17 +1217,14 @@ async def check_team_creation_eligibility(
     }
     
     # Check CFO application status
-    cfo_app = supabase.table("cfo_applications") \
-        .select("id, status") \
-        .eq("competition_id", competition_id) \
-        .eq("user_id", current_user.id) \
-        .execute()
+    cfo_app = await reads.first("cfo_applications", "id, status",
+                          competition_id=competition_id, user_id=current_user.id)
     
-    if not cfo_app.data:
+    if not cfo_app:
         eligibility["reason"] = "You must apply as CFO first"
         return eligibility
     
-    app_status = cfo_app.data[0].get("status")
+    app_status = cfo_app.get("status")
     eligibility["cfo_status"] = app_status
     
     if app_status != "qualified":
@@ -1176,12 +1238,9 @@ async def check_team_creation_eligibility(
         return eligibility
     
     # Check if already in a team
-    existing = supabase.table("team_members") \
-        .select("team_id, teams(competition_id)") \
-        .eq("user_id", current_user.id) \
-        .execute()
+    existing = await reads.select("team_members", "team_id, teams(competition_id)", user_id=current_user.id)
     
-    for membership in existing.data or []:
+    for membership in existing:
         team_info = membership.get("teams")
         if team_info and team_info.get("competition_id") == competition_id:
             eligibility["has_team"] = True
@@ -1195,117 +1254,67 @@ async def check_team_creation_eligibility(
 
 
 @router.get("/teams/my-team")
-async def get_my_team(current_user: User = Depends(get_current_user)):
+async def get_my_team(
+    current_user: User = Depends(get_current_user),
+    reads: RequestReads = Depends(get_request_reads)
+):
     """Get the current user's team."""
-    supabase = get_supabase_client()
-    
     # Find team membership for current user
-    membership = supabase.table("team_members") \
-        .select("team_id") \
-        .eq("user_id", current_user.id) \
-        .execute()
+    membership = await reads.first("team_members", "team_id", user_id=current_user.id)
     
-    if not membership.data:
+    if not membership:
         raise HTTPException(status_code=404, detail="You are not in any team")
     
-    team_id = membership.data[0]["team_id"]
-    
-    # Get team details
-    team_result = supabase.table("teams") \
-        .select("*") \
-        .eq("id", team_id) \
-        .execute()
+    # Get team details with members
+    teams = await load_teams_with_members(reads, id=membership["team_id"])
     
-    if not team_result.data:
+    if not teams:
         raise HTTPException(status_code=404, detail="Team not found")
     
-    team = team_result.data[0]
-    
-    # Get team members
-    members_result = supabase.table("team_members") \
-        .select("*") \
-        .eq("team_id", team_id) \
-        .execute()
-    
-    team["members"] = members_result.data or []
-    team["max_members"] = 5  # Constant max team size for frontend
-    # Compute status from member count (no status column in DB)
-    team["status"] = "complete" if len(team["members"]) >= 5 else "forming"
-    
-    return team
+    return teams[0]
 
 
 @router.get("/teams/competition/{competition_id}")
 async def get_teams_by_competition(
     competition_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    reads: RequestReads = Depends(get_request_reads)
 ):
-    """Get all teams for a competition."""
-    supabase = get_supabase_client()
-    
-    # Get all teams for this competition
-    teams_result = supabase.table("teams") \
-        .select("*") \
-        .eq("competition_id", competition_id) \
-        .execute()
-    
-    teams = teams_result.data or []
-    
-    # Get members for each team and add computed fields
-    for team in teams:
-        members_result = supabase.table("team_members") \
-            .select("*") \
-            .eq("team_id", team["id"]) \
-            .execute()
-        team["members"] = members_result.data or []
-        team["max_members"] = 5  # Constant max team size for frontend
-        # Compute status from member count (no status column in DB)
-        team["status"] = "complete" if len(team["members"]) >= 5 else "forming"
-    
-    return teams
+    """Get all teams for a competition (members embedded, single query)."""
+    return await load_teams_with_members(reads, competition_id=competition_id)
 
 
 @router.post("/teams/join")
 async def join_team(
     join_data: TeamJoin,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    reads: RequestReads = Depends(get_request_reads)
 ):
     """Join an existing team."""
     import logging
     logger = logging.getLogger(__name__)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
     
     # Get team details
-    team_result = supabase.table("teams") \
-        .select("*") \
-        .eq("id", join_data.team_id) \
-        .execute()
+    team = await reads.first("teams", id=join_data.team_id)
     
-    if not team_result.data:
+    if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     
-    team = team_result.data[0]
-    
     # Check if user is registered for the competition
-    registration = supabase.table("competition_registrations") \
-        .select("id") \
-        .eq("competition_id", team["competition_id"]) \
-        .eq("user_id", current_user.id) \
-        .execute()
+    registration = await reads.first("competition_registrations", "id",
+                               competition_id=team["competition_id"], user_id=current_user.id)
     
-    if not registration.data:
+    if not registration:
         raise HTTPException(
             status_code=403,
             detail="You must be registered for this competition to join a team"
         )
     
     # Check if user is already in a team for this competition
-    existing_membership = supabase.table("team_members") \
-        .select("team_id, teams(competition_id)") \
-        .eq("user_id", current_user.id) \
-        .execute()
+    existing_membership = await reads.select("team_members", "team_id, teams(competition_id)", user_id=current_user.id)
     
-    for membership in existing_membership.data or []:
+    for membership in existing_membership:
         team_info = membership.get("teams")
         if team_info and team_info.get("competition_id") == team["competition_id"]:
             raise HTTPException(
@@ -1314,13 +1323,7 @@ async def join_team(
             )
     
     # Get current member count
-    MAX_TEAM_SIZE = 5  # Constant max team size
-    members_result = supabase.table("team_members") \
-        .select("id") \
-        .eq("team_id", join_data.team_id) \
-        .execute()
-    
-    current_members = len(members_result.data or [])
+    current_members = len(await reads.select("team_members", "id", team_id=join_data.team_id))
     
     if current_members >= MAX_TEAM_SIZE:
         raise HTTPException(status_code=400, detail="Team is full")
@@ -1335,7 +1338,8 @@ async def join_team(
     }
     
     try:
-        supabase.table("team_members").insert(member_dict).execute()
+        await supabase.table("team_members").insert(member_dict).execute()
+        reads.invalidate("team_members")
         
         # Team is implicitly complete when member count reaches MAX_TEAM_SIZE
         # No status update needed - frontend calculates from member count
@@ -1352,57 +1356,36 @@ async def join_team(
 @router.get("/teams/{team_id}")
 async def get_team(
     team_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    reads: RequestReads = Depends(get_request_reads)
 ):
     """Get team details by ID."""
-    supabase = get_supabase_client()
-    
-    # Get team
-    team_result = supabase.table("teams") \
-        .select("*") \
-        .eq("id", team_id) \
-        .execute()
+    # Get team with members
+    teams = await load_teams_with_members(reads, id=team_id)
     
-    if not team_result.data:
+    if not teams:
         raise HTTPException(status_code=404, detail="Team not found")
     
-    team = team_result.data[0]
-    
-    # Get team members
-    members_result = supabase.table("team_members") \
-        .select("*") \
-        .eq("team_id", team_id) \
-        .execute()
-    
-    team["members"] = members_result.data or []
-    team["max_members"] = 5  # Constant max team size for frontend
-    # Compute status from member count (no status column in DB)
-    team["status"] = "complete" if len(team["members"]) >= 5 else "forming"
-    
-    return team
+    return teams[0]
 
 
 @router.delete("/teams/{team_id}/leave")
 async def leave_team(
     team_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    reads: RequestReads = Depends(get_request_reads)
 ):
     """Leave a team."""
     import logging
     logger = logging.getLogger(__name__)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
     
     # Get team
-    team_result = supabase.table("teams") \
-        .select("*") \
-        .eq("id", team_id) \
-        .execute()
+    team = await reads.first("teams", id=team_id)
     
-    if not team_result.data:
+    if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     
-    team = team_result.data[0]
-    
     # Check if user is the leader
     if team["leader_id"] == current_user.id:
         raise HTTPException(
@@ -1411,22 +1394,17 @@ async def leave_team(
         )
     
     # Check if user is a member
-    membership = supabase.table("team_members") \
-        .select("id") \
-        .eq("team_id", team_id) \
-        .eq("user_id", current_user.id) \
-        .execute()
-    
-    if not membership.data:
+    if not await reads.first("team_members", "id", team_id=team_id, user_id=current_user.id):
         raise HTTPException(status_code=400, detail="You are not a member of this team")
     
     # Remove user from team
     try:
-        supabase.table("team_members") \
+        await supabase.table("team_members") \
             .delete() \
             .eq("team_id", team_id) \
             .eq("user_id", current_user.id) \
             .execute()
+        reads.invalidate("team_members")
         
         # No status update needed - team completeness is calculated from member count
         
@@ -1443,24 +1421,20 @@ async def leave_team(
 async def assign_role(
     team_id: str,
     role_data: AssignRole,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    reads: RequestReads = Depends(get_request_reads)
 ):
     """Assign a role to a team member (leader only)."""
     import logging
     logger = logging.getLogger(__name__)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
     
     # Get team
-    team_result = supabase.table("teams") \
-        .select("*") \
-        .eq("id", team_id) \
-        .execute()
+    team = await reads.first("teams", id=team_id)
     
-    if not team_result.data:
+    if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     
-    team = team_result.data[0]
-    
     # Check if current user is the leader
     if team["leader_id"] != current_user.id:
         raise HTTPException(
@@ -1469,24 +1443,14 @@ async def assign_role(
         )
     
     # Check if target user is a team member
-    membership = supabase.table("team_members") \
-        .select("id") \
-        .eq("team_id", team_id) \
-        .eq("user_id", role_data.user_id) \
-        .execute()
-    
-    if not membership.data:
+    if not await reads.first("team_members", "id", team_id=team_id, user_id=role_data.user_id):
         raise HTTPException(status_code=400, detail="User is not a member of this team")
     
     # Check if role is already assigned to another member
-    existing_role = supabase.table("team_members") \
-        .select("user_id") \
-        .eq("team_id", team_id) \
-        .eq("team_role", role_data.team_role.value) \
-        .execute()
+    existing_role = await reads.select("team_members", "user_id", team_id=team_id, team_role=role_data.team_role.value)
     
-    if existing_role.data:
-        for member in existing_role.data:
+    if existing_role:
+        for member in existing_role:
             if member["user_id"] != role_data.user_id:
                 raise HTTPException(
                     status_code=400,
@@ -1495,9 +1459,10 @@ async def assign_role(
     
     # Update the role
     try:
-        supabase.table("team_members").update({
+        await supabase.table("team_members").update({
             "team_role": role_data.team_role.value
         }).eq("team_id", team_id).eq("user_id", role_data.user_id).execute()
+        reads.invalidate("team_members")
         
         logger.info(f"Role {role_data.team_role.value} assigned to user {role_data.user_id} in team {team_id}")
         
@@ -1506,3 +1471,86 @@ async def assign_role(
     except Exception as e:
         logger.error(f"Assign role error: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to assign role: {str(e)}")
+
+
+# =========================================================
+# JUDGING
+# =========================================================
+
+
+@router.get("/judging/assignments")
+async def get_my_judging_assignments(
+    competition_id: str,
+    current_user: User = Depends(get_judge_user)
+):
+    """Judge: applications assigned to me in a competition, with my score where I have given one"""
+    supabase = await get_async_supabase_client()
+    assignments_query = supabase.table("judge_application_assignments")\
+        .select("application_id, created_at")\
+        .eq("competition_id", competition_id)\
+        .eq("judge_id", current_user.id)\
+        .order("created_at")
+    scores_query = supabase.table("judge_scores")\
+        .select("entity_id, score")\
+        .eq("competition_id", competition_id)\
+        .eq("judge_id", current_user.id)\
+        .eq("entity_type", JudgingEntityType.APPLICATION.value)
+    assignments, scores = await asyncio.gather(assignments_query.execute(), scores_query.execute())
+    my_scores = {row["entity_id"]: row["score"] for row in scores.data or []}
+    items = [
+        {**row, "score": my_scores.get(row["application_id"])}
+        for row in assignments.data or []
+    ]
+    return {
+        "competition_id": competition_id,
+        "assigned": len(items),
+        "scored": sum(1 for item in items if item["score"] is not None),
+        "applications": items
+    }
+
+
+@router.post("/judging/scores")
+async def submit_judge_score(
+    score_data: JudgeScoreCreate,
+    current_user: User = Depends(get_judge_user),
+    reads: RequestReads = Depends(get_request_reads)
+):
+    """Judge: score one application or submission (re-scoring replaces the judge's earlier score)"""
+    import logging
+    logger = logging.getLogger(__name__)
+    supabase = await get_async_supabase_client()
+    
+    assignment = await reads.first(
+        "judge_assignments", "id, status",
+        competition_id=score_data.competition_id, judge_id=current_user.id
+    )
+    if not assignment or assignment["status"] != "active":
+        raise HTTPException(status_code=403, detail="You are not assigned to judge this competition")
+    
+    if score_data.entity_type == JudgingEntityType.APPLICATION:
+        entity = await reads.first("cfo_applications", "id, competition_id", id=score_data.entity_id)
+        entity_competition = entity["competition_id"] if entity else None
+    else:
+        entity = await reads.first("submissions", "id, task_id", id=score_data.entity_id)
+        task = await reads.first("tasks", "id, competition_id", id=entity["task_id"]) if entity else None
+        entity_competition = task["competition_id"] if task else None
+    if entity_competition != score_data.competition_id:
+        raise HTTPException(status_code=404, detail=f"{score_data.entity_type.value.capitalize()} not found in this competition")
+    
+    response = await supabase.table("judge_scores").upsert({
+        "competition_id": score_data.competition_id,
+        "judge_id": current_user.id,
+        "entity_type": score_data.entity_type.value,
+        "entity_id": score_data.entity_id,
+        "score": score_data.score,
+        "criteria_scores": score_data.criteria_scores,
+        "feedback": score_data.feedback
+    }, on_conflict="judge_id,entity_type,entity_id").execute()
+    
+    if not response.data:
+        raise HTTPException(status_code=500, detail="Database error: Failed to save score")
+    
+    record_score(score_data.competition_id, score_data.entity_type.value, current_user.id, score_data.entity_id, score_data.score)
+    logger.info(f"Judge {current_user.id} scored {score_data.entity_type.value} {score_data.entity_id}: {score_data.score}")
+    
+    return {"success": True, "score": response.data[0]}
@@ -0,0 +1,175 @@
+"""
+Ranked, keyset-paginated CFO application listing.
+
+Rows are ordered by the stored composite rank_key (score, tie-breakers,
+submission time, id; unique per competition, with auto-excluded keys sorting
+last) and each page is read straight from cfo_applications through the
+(competition_id, rank_key) index: rank_key > cursor, limit + 1 rows, with
+the applicant's name and email embedded for just those rows.
+
+Ranks and bands are then filled in for the page only: the
+cfo_application_page_positions() RPC counts the rows ahead of the page's
+first key (an index-only scan, so it grows with the page's depth rather
+than with the page size) and numbers the index range the page spans. The
+final_status filter becomes a rank_key range, bounded by the keys at the
+qualified and reserve cut-offs. Band counts come from the
+cfo_application_counts() RPC, separately from the page itself.
+
+Each read also schedules a background re-score of rows scored with an older
+rubric version (score_refresh.py); the page reports how many of its rows are
+still on another version.
+"""
+
+from typing import List, Optional, Tuple
+
+from supabase_client import get_async_supabase_client
+from cfo_application_scoring import QUALIFIED_LIMIT, RESERVE_LIMIT, determine_status
+from scoring_rubric import get_active_rubric
+from score_refresh import schedule_stale_rescore
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+PROFILE_EMBED = "user_profiles!cfo_applications_user_id_fkey(full_name, email)"
+
+# List views only need these; the long free-text answers stay out of the payload
+SUMMARY_COLUMNS = [
+    "id", "user_id", "competition_id", "status", "total_score", "raw_score",
+    "leadership_score", "ethics_score", "capital_score", "judgment_score",
+    "red_flag_count", "red_flags", "auto_excluded", "admin_override",
+    "cv_url", "submitted_at", "scoring_version", "rank_key", PROFILE_EMBED
+]
+
+FINAL_STATUSES = ("qualified", "reserve", "not_selected", "excluded")
+
+
+async def _band_bounds(competition_id: str) -> Tuple[Optional[str], Optional[str]]:
+    """rank_key of the last qualified and the last reserve application (None while the band is not full)"""
+    supabase = await get_async_supabase_client()
+    response = await supabase.table("cfo_applications")\
+        .select("rank_key")\
+        .eq("competition_id", competition_id)\
+        .lt("rank_key", "1")\
+        .order("rank_key")\
+        .range(QUALIFIED_LIMIT - 1, RESERVE_LIMIT - 1)\
+        .execute()
+    keys = [row["rank_key"] for row in response.data or []]
+    reserve_at = RESERVE_LIMIT - QUALIFIED_LIMIT
+    return (keys[0] if keys else None, keys[reserve_at] if len(keys) > reserve_at else None)
+
+
+async def _with_positions(competition_id: str, rows: List[dict]) -> List[dict]:
+    """Add position, rank and final_status to one page of rows"""
+    if not rows:
+        return rows
+    supabase = await get_async_supabase_client()
+    response = await supabase.rpc("cfo_application_page_positions", {
+        "p_competition_id": competition_id,
+        "p_keys": [row["rank_key"] for row in rows]
+    }).execute()
+    positions = {entry["rank_key"]: entry["position"] for entry in response.data or []}
+    for row in rows:
+        excluded = row["rank_key"].startswith("1")
+        row["position"] = positions.get(row["rank_key"])
+        # Ranked keys sort before excluded ones, so a ranked row's position is its rank
+        row["rank"] = None if excluded else row["position"]
+        row["final_status"] = determine_status(row["rank"], excluded) if excluded or row["rank"] is not None else None
+    return rows
+
+
+async def list_ranked_applications(
+    competition_id: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    statuses: Optional[List[str]] = None,
+    final_status: Optional[str] = None,
+    has_red_flags: Optional[bool] = None,
+    red_flag: Optional[str] = None,
+    summary: bool = True
+) -> dict:
+    """One page of ranked applications plus the cursor of the next page"""
+    supabase = await get_async_supabase_client()
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    rescoring = schedule_stale_rescore(competition_id)
+    version = get_active_rubric().version
+    empty = {
+        "applications": [],
+        "next_cursor": None,
+        "limit": limit,
+        "scoring_version": version,
+        "stale_on_page": 0,
+        "rescoring": rescoring
+    }
+
+    columns = ", ".join(SUMMARY_COLUMNS) if summary else f"*, {PROFILE_EMBED}"
+    query = supabase.table("cfo_applications").select(columns).eq("competition_id", competition_id)
+
+    if final_status:
+        if final_status not in FINAL_STATUSES:
+            return empty
+        if final_status == "excluded":
+            query = query.gte("rank_key", "1")
+        else:
+            qualified_key, reserve_key = await _band_bounds(competition_id)
+            query = query.lt("rank_key", "1")
+            if final_status == "qualified":
+                if qualified_key is not None:
+                    query = query.lte("rank_key", qualified_key)
+            elif final_status == "reserve":
+                if qualified_key is None:
+                    return empty
+                query = query.gt("rank_key", qualified_key)
+                if reserve_key is not None:
+                    query = query.lte("rank_key", reserve_key)
+            else:
+                if reserve_key is None:
+                    return empty
+                query = query.gt("rank_key", reserve_key)
+
+    if cursor is not None:
+        query = query.gt("rank_key", cursor)
+    if statuses:
+        query = query.in_("status", statuses)
+    if has_red_flags is True:
+        query = query.gt("red_flag_count", 0)
+    elif has_red_flags is False:
+        query = query.eq("red_flag_count", 0)
+    if red_flag:
+        query = query.contains("red_flags", [red_flag])
+
+    # One extra row tells us whether another page exists
+    response = await query.order("rank_key").limit(limit + 1).execute()
+    rows = response.data or []
+
+    has_more = len(rows) > limit
+    rows = await _with_positions(competition_id, rows[:limit])
+
+    return {
+        **empty,
+        "applications": rows,
+        "next_cursor": rows[-1]["rank_key"] if has_more else None,
+        "stale_on_page": sum(1 for row in rows if row.get("scoring_version") != version)
+    }
+
+
+async def get_ranking_counts(competition_id: str) -> dict:
+    """Band/status aggregates for a competition (one RPC round trip)"""
+    supabase = await get_async_supabase_client()
+    response = await supabase.rpc("cfo_application_counts", {"p_competition_id": competition_id}).execute()
+    counts = response.data or {}
+    return {
+        "total": counts.get("total", 0),
+        "qualified": counts.get("qualified", 0),
+        "reserve": counts.get("reserve", 0),
+        "not_selected": counts.get("not_selected", 0),
+        "excluded": counts.get("excluded", 0),
+        "with_red_flags": counts.get("with_red_flags", 0),
+        "by_status": counts.get("by_status") or {}
+    }
+
+
+def parse_status_filter(status: Optional[str]) -> Optional[List[str]]:
+    """'pending,submitted' -> ['pending', 'submitted']"""
+    if not status:
+        return None
+    return [s.strip() for s in status.split(",") if s.strip()]
@@ -45,6 +45,7 @@ class ChatMessageResponse(BaseModel):
     timestamp: datetime
     edited: bool
     edited_at: Optional[datetime]
+    seq: Optional[int] = None
 
 class TypingIndicator(BaseModel):
     team_id: str
@@ -1,12 +1,12 @@
-from fastapi import APIRouter, HTTPException, Depends, status, UploadFile, File
+from fastapi import APIRouter, HTTPException, Depends, Response, status, UploadFile, File
 from fastapi.responses import FileResponse
-from typing import List
+from typing import List, Optional
 import os
 import aiofiles
 from pathlib import Path
 from datetime import datetime
 
-from supabase_client import get_supabase_client
+from supabase_client import get_async_supabase_client
 from models import User
 from chat_models import (
     ChatMessage,
@@ -15,40 +15,63 @@ from chat_models import (
     MessageType,
 )
 from auth import get_current_user
+from request_reads import RequestReads, get_request_reads
 
 router = APIRouter(prefix="/api/chat", tags=["Chat"])
 
 UPLOAD_DIR = Path(__file__).parent / "uploads"
 UPLOAD_DIR.mkdir(exist_ok=True, parents=True)
 
+DEFAULT_HISTORY_PAGE_SIZE = 100
+MAX_HISTORY_PAGE_SIZE = 200
+
+# History page cursors (seq values) travel in headers so the body stays a plain message list
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+PREV_CURSOR_HEADER = "X-Prev-Cursor"
+
+
+def _message_response(msg: dict) -> ChatMessageResponse:
+    # Use created_at from database (not timestamp)
+    msg_timestamp = msg.get('created_at') or msg.get('timestamp')
+    msg_edited_at = msg.get('edited_at')
+    
+    return ChatMessageResponse(
+        id=msg['id'],
+        team_id=msg['team_id'],
+        user_id=msg['user_id'],
+        user_name=msg['user_name'],
+        message_type=MessageType(msg['message_type']),
+        content=msg['content'],
+        file_url=msg.get('file_url'),
+        file_name=msg.get('file_name'),
+        file_size=msg.get('file_size'),
+        timestamp=datetime.fromisoformat(msg_timestamp.replace('Z', '+00:00')) if isinstance(msg_timestamp, str) else msg_timestamp,
+        edited=msg.get('edited', False),
+        edited_at=datetime.fromisoformat(msg_edited_at.replace('Z', '+00:00')) if msg_edited_at and isinstance(msg_edited_at, str) else msg_edited_at,
+        seq=msg.get('seq')
+    )
+
 @router.post("/messages", response_model=ChatMessageResponse)
 async def send_message(
     message_data: ChatMessageCreate,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    reads: RequestReads = Depends(get_request_reads)
 ):
     import logging
     logger = logging.getLogger(__name__)
     
     try:
-        supabase = get_supabase_client()
+        supabase = await get_async_supabase_client()
         
         # Verify team exists
-        team_response = supabase.table('teams').select('*').eq('id', message_data.team_id).execute()
-        
-        if not team_response.data or len(team_response.data) == 0:
+        if not await reads.first('teams', id=message_data.team_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Team not found"
             )
         
         # Verify user is team member
-        member_response = supabase.table('team_members')\
-            .select('*')\
-            .eq('team_id', message_data.team_id)\
-            .eq('user_id', current_user.id)\
-            .execute()
-        
-        if not member_response.data or len(member_response.data) == 0:
+        if not await reads.first('team_members', team_id=message_data.team_id, user_id=current_user.id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You are not a member of this team"
@@ -69,7 +92,7 @@ async def send_message(
         logger.info(f"Chat insert payload: {message_dict}")
         
         # Insert to database
-        response = supabase.table('chat_messages').insert(message_dict).execute()
+        response = await supabase.table('chat_messages').insert(message_dict).execute()
         
         logger.info(f"Chat insert response: {response}")
         
@@ -83,24 +106,7 @@ async def send_message(
         msg = response.data[0]
         logger.info(f"Chat message created: {msg['id']}")
         
-        # Use created_at from database (not timestamp)
-        msg_timestamp = msg.get('created_at') or msg.get('timestamp')
-        msg_edited_at = msg.get('edited_at')
-        
-        return ChatMessageResponse(
-            id=msg['id'],
-            team_id=msg['team_id'],
-            user_id=msg['user_id'],
-            user_name=msg['user_name'],
-            message_type=MessageType(msg['message_type']),
-            content=msg['content'],
-            file_url=msg.get('file_url'),
-            file_name=msg.get('file_name'),
-            file_size=msg.get('file_size'),
-            timestamp=datetime.fromisoformat(msg_timestamp.replace('Z', '+00:00')) if isinstance(msg_timestamp, str) else msg_timestamp,
-            edited=msg.get('edited', False),
-            edited_at=datetime.fromisoformat(msg_edited_at.replace('Z', '+00:00')) if msg_edited_at and isinstance(msg_edited_at, str) else msg_edited_at
-        )
+        return _message_response(msg)
         
     except HTTPException:
         raise
@@ -114,63 +120,63 @@ async def send_message(
 @router.get("/messages/{team_id}", response_model=List[ChatMessageResponse])
 async def get_team_messages(
     team_id: str,
-    limit: int = 100,
-    before_id: str = None,
-    current_user: User = Depends(get_current_user)
+    response: Response,
+    limit: int = DEFAULT_HISTORY_PAGE_SIZE,
+    before_seq: Optional[int] = None,
+    after_seq: Optional[int] = None,
+    before_id: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    reads: RequestReads = Depends(get_request_reads)
 ):
-    supabase = get_supabase_client()
-
-    team_response = supabase.table('teams').select('*').eq('id', team_id).execute()
-
-    if not team_response.data or len(team_response.data) == 0:
+    """
+    Team chat history, oldest first; by default the latest `limit` messages.
+    Keyset-paginated on the per-team seq: pass X-Prev-Cursor as before_seq for older
+    messages and X-Next-Cursor as after_seq for newer ones (each header is absent at that end).
+    before_id is the legacy cursor and costs one extra lookup.
+    """
+    supabase = await get_async_supabase_client()
+    limit = max(1, min(limit, MAX_HISTORY_PAGE_SIZE))
+
+    if not await reads.first('teams', id=team_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Team not found"
         )
 
-    member_response = supabase.table('team_members')\
-        .select('*')\
-        .eq('team_id', team_id)\
-        .eq('user_id', current_user.id)\
-        .execute()
-
-    if not member_response.data or len(member_response.data) == 0:
+    if not await reads.first('team_members', team_id=team_id, user_id=current_user.id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You are not a member of this team"
         )
 
-    query = supabase.table('chat_messages').select('*').eq('team_id', team_id)
+    if before_id and before_seq is None and after_seq is None:
+        before_msg = await reads.first('chat_messages', 'seq', id=before_id, team_id=team_id)
+        if before_msg:
+            before_seq = before_msg['seq']
 
-    if before_id:
-        before_msg_response = supabase.table('chat_messages').select('created_at').eq('id', before_id).execute()
-        if before_msg_response.data and len(before_msg_response.data) > 0:
-            before_timestamp = before_msg_response.data[0]['created_at']
-            query = query.lt('created_at', before_timestamp)
-
-    response = query.order('created_at', desc=False).limit(limit).execute()
-
-    messages = []
-    for msg in response.data:
-        msg_timestamp = msg.get('created_at') or msg.get('timestamp')
-        msg_edited_at = msg.get('edited_at')
-        
-        messages.append(ChatMessageResponse(
-            id=msg['id'],
-            team_id=msg['team_id'],
-            user_id=msg['user_id'],
-            user_name=msg['user_name'],
-            message_type=MessageType(msg['message_type']),
-            content=msg['content'],
-            file_url=msg.get('file_url'),
-            file_name=msg.get('file_name'),
-            file_size=msg.get('file_size'),
-            timestamp=datetime.fromisoformat(msg_timestamp.replace('Z', '+00:00')) if isinstance(msg_timestamp, str) else msg_timestamp,
-            edited=msg.get('edited', False),
-            edited_at=datetime.fromisoformat(msg_edited_at.replace('Z', '+00:00')) if msg_edited_at and isinstance(msg_edited_at, str) else msg_edited_at
-        ))
-
-    return messages
+    # One extra row tells us whether the page has a neighbour in the scroll direction
+    query = supabase.table('chat_messages').select('*').eq('team_id', team_id)
+    if after_seq is not None:
+        result = await query.gt('seq', after_seq).order('seq').limit(limit + 1).execute()
+        rows = result.data or []
+        has_newer = len(rows) > limit
+        rows = rows[:limit]
+        has_older = after_seq > 0
+    else:
+        if before_seq is not None:
+            query = query.lt('seq', before_seq)
+        result = await query.order('seq', desc=True).limit(limit + 1).execute()
+        rows = result.data or []
+        has_older = len(rows) > limit
+        rows = rows[:limit][::-1]
+        has_newer = before_seq is not None
+
+    if rows and has_older:
+        response.headers[PREV_CURSOR_HEADER] = str(rows[0]['seq'])
+    if rows and has_newer:
+        response.headers[NEXT_CURSOR_HEADER] = str(rows[-1]['seq'])
+
+    return [_message_response(msg) for msg in rows]
 
 @router.post("/upload")
 async def upload_file(
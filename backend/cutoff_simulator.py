@@ -0,0 +1,150 @@
+"""
+Qualification cut-off simulator.
+
+For each competition the ranked (non-excluded) applications are held as a
+score array in ranking order with prefix aggregates: a running score sum
+and, for every red flag, country and industry, the sorted ranking positions
+that carry it (a compressed prefix count). Any pair of cut-offs - given as
+ranks or as minimum scores - is answered with a few binary searches, so the
+dashboard can slide cut-offs without touching the database. Snapshots are
+rebuilt after CUTOFF_SNAPSHOT_TTL_SECONDS or on request.
+"""
+
+import asyncio
+import os
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from supabase_client import get_async_supabase_client
+from cfo_application_scoring import QUALIFIED_LIMIT, RESERVE_LIMIT
+from ranking_index import rank_key
+
+CUTOFF_SNAPSHOT_TTL_SECONDS = int(os.getenv("CUTOFF_SNAPSHOT_TTL_SECONDS", "120"))
+LOAD_PAGE_SIZE = 1000
+
+DIMENSIONS = ["red_flags", "countries", "industries"]
+
+
+class CutoffSnapshot:
+    def __init__(self, competition_id: str, rows: List[dict]):
+        self.competition_id = competition_id
+        self.loaded_at = time.monotonic()
+
+        ranked = sorted((row for row in rows if not row.get("auto_excluded")), key=rank_key)
+        self.excluded_count = len(rows) - len(ranked)
+        self.scores = np.array([float(row.get("total_score") or 0) for row in ranked], dtype=np.float64)
+        # Ascending copy for score -> rank lookups
+        self._negated_scores = -self.scores
+        self.score_prefix = np.concatenate([[0.0], np.cumsum(self.scores)])
+
+        positions: Dict[str, Dict[str, List[int]]] = {dimension: {} for dimension in DIMENSIONS}
+        positions["red_flags"]["any"] = []
+        for i, row in enumerate(ranked):
+            flags = row.get("red_flags") or []
+            if flags:
+                positions["red_flags"]["any"].append(i)
+            for flag in set(flags):
+                positions["red_flags"].setdefault(flag, []).append(i)
+            profile = row.get("user_profiles") or {}
+            positions["countries"].setdefault(profile.get("country") or "unknown", []).append(i)
+            positions["industries"].setdefault(profile.get("industry") or "unknown", []).append(i)
+
+        # Positions are appended in ranking order, so each list is already sorted
+        self.positions = {
+            dimension: {key: np.array(values, dtype=np.int64) for key, values in groups.items()}
+            for dimension, groups in positions.items()
+        }
+
+    @property
+    def ranked_count(self) -> int:
+        return len(self.scores)
+
+    @property
+    def age_seconds(self) -> float:
+        return time.monotonic() - self.loaded_at
+
+    def rank_for_score(self, min_score: float) -> int:
+        """Number of ranked applications scoring at least min_score"""
+        return int(np.searchsorted(self._negated_scores, -min_score, side="right"))
+
+    def band(self, start: int, end: int) -> dict:
+        """Size, score range and composition of ranking positions [start, end)"""
+        start = max(0, min(start, self.ranked_count))
+        end = max(start, min(end, self.ranked_count))
+        size = end - start
+        composition = {}
+        for dimension, groups in self.positions.items():
+            counts = {}
+            for key, positions in groups.items():
+                count = int(np.searchsorted(positions, end) - np.searchsorted(positions, start))
+                if count:
+                    counts[key] = count
+            composition[dimension] = dict(sorted(counts.items(), key=lambda item: -item[1]))
+        return {
+            "from_rank": start + 1 if size else None,
+            "to_rank": end if size else None,
+            "size": size,
+            "max_score": round(float(self.scores[start]), 2) if size else None,
+            "min_score": round(float(self.scores[end - 1]), 2) if size else None,
+            "mean_score": round(float((self.score_prefix[end] - self.score_prefix[start]) / size), 2) if size else None,
+            **composition
+        }
+
+    def simulate(self, qualified_rank: Optional[int] = None, reserve_rank: Optional[int] = None,
+                 qualified_score: Optional[float] = None, reserve_score: Optional[float] = None) -> dict:
+        """Bands for cut-offs given as ranks (inclusive) or as minimum scores; scores win if both are given"""
+        qualified_end = self.rank_for_score(qualified_score) if qualified_score is not None else (QUALIFIED_LIMIT if qualified_rank is None else qualified_rank)
+        reserve_end = self.rank_for_score(reserve_score) if reserve_score is not None else (RESERVE_LIMIT if reserve_rank is None else reserve_rank)
+        reserve_end = max(reserve_end, qualified_end)
+
+        return {
+            "competition_id": self.competition_id,
+            "ranked_count": self.ranked_count,
+            "excluded_count": self.excluded_count,
+            "snapshot_age_seconds": round(self.age_seconds, 1),
+            "cutoffs": {"qualified_rank": min(qualified_end, self.ranked_count), "reserve_rank": min(reserve_end, self.ranked_count)},
+            "bands": {
+                "qualified": self.band(0, qualified_end),
+                "reserve": self.band(qualified_end, reserve_end),
+                "not_selected": self.band(reserve_end, self.ranked_count)
+            }
+        }
+
+
+_snapshots: Dict[str, CutoffSnapshot] = {}
+_snapshot_locks: Dict[str, asyncio.Lock] = {}
+
+
+async def _load_rows(competition_id: str) -> List[dict]:
+    supabase = await get_async_supabase_client()
+    rows = []
+    start = 0
+    while True:
+        response = await supabase.table("cfo_applications")\
+            .select("id, total_score, rank_key, auto_excluded, red_flags, user_profiles!cfo_applications_user_id_fkey(country, industry)")\
+            .eq("competition_id", competition_id)\
+            .order("id")\
+            .range(start, start + LOAD_PAGE_SIZE - 1)\
+            .execute()
+        page = response.data or []
+        rows.extend(page)
+        if len(page) < LOAD_PAGE_SIZE:
+            return rows
+        start += LOAD_PAGE_SIZE
+
+
+async def get_cutoff_snapshot(competition_id: str, refresh: bool = False) -> CutoffSnapshot:
+    snapshot = _snapshots.get(competition_id)
+    if snapshot is not None and not refresh and snapshot.age_seconds < CUTOFF_SNAPSHOT_TTL_SECONDS:
+        return snapshot
+
+    lock = _snapshot_locks.setdefault(competition_id, asyncio.Lock())
+    async with lock:
+        snapshot = _snapshots.get(competition_id)
+        if snapshot is not None and not refresh and snapshot.age_seconds < CUTOFF_SNAPSHOT_TTL_SECONDS:
+            return snapshot
+        snapshot = CutoffSnapshot(competition_id, await _load_rows(competition_id))
+        _snapshots[competition_id] = snapshot
+        return snapshot
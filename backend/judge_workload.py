@@ -0,0 +1,263 @@
+"""
+Judge workload distribution for CFO applications.
+
+Every application of a competition is assigned to judges_per_application
+of the competition's active judges (judge_application_assignments):
+
+  - balanced: judges sit in a min-heap keyed on load, so each application
+    goes to the least-loaded eligible judges; equal loads are broken by a
+    draw seeded with the competition id, so the same judges are not always
+    grouped together and a re-run plans the same way
+  - conflict of interest: a judge never gets an applicant from one of the
+    judge's own companies (user_profiles.company_name / company, compared
+    case- and whitespace-insensitively)
+  - no repeated pairings: existing (judge, application) rows are kept and
+    only the missing seats are filled
+
+One pass over the applications in rank order produces every new row, which
+is written with one batched insert. The seat count is stored on
+competitions.judges_per_application, so removing a judge releases the
+judge's unscored applications and refills them to that same count from the
+remaining judges.
+"""
+
+import heapq
+import random
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from supabase_client import get_async_supabase_client
+
+DEFAULT_JUDGES_PER_APPLICATION = 3
+LOAD_PAGE_SIZE = 1000
+DELETE_CHUNK_SIZE = 200
+
+
+def company_keys(profile: Optional[dict]) -> Set[str]:
+    profile = profile or {}
+    return {
+        " ".join(value.split()).casefold()
+        for value in (profile.get("company_name"), profile.get("company"))
+        if isinstance(value, str) and value.strip()
+    }
+
+
+def plan_assignments(
+    applications: List[dict],
+    judges: List[dict],
+    judges_per_application: int,
+    existing: Iterable[Tuple[str, str]] = (),
+    seed: str = ""
+) -> dict:
+    """New (judge_id, application_id) pairs giving every application judges_per_application judges.
+
+    applications: [{"id", "companies"}] in assignment order; judges: [{"judge_id", "companies"}];
+    existing: pairs already assigned (they count towards both the seats and the judges' loads).
+    """
+    existing_pairs = set(existing)
+    active = {judge["judge_id"] for judge in judges}
+    load: Dict[str, int] = {judge["judge_id"]: 0 for judge in judges}
+    seats: Dict[str, int] = {}
+    for judge_id, application_id in existing_pairs:
+        if judge_id in active:
+            load[judge_id] += 1
+            seats[application_id] = seats.get(application_id, 0) + 1
+
+    # (load, tie-break draw, judge position)
+    draw = random.Random(seed).random
+    heap = [(load[judge["judge_id"]], draw(), i) for i, judge in enumerate(judges)]
+    heapq.heapify(heap)
+
+    new_pairs: List[Tuple[str, str]] = []
+    shortfalls = []
+    conflicts_skipped = 0
+    for application in applications:
+        needed = judges_per_application - seats.get(application["id"], 0)
+        if needed <= 0:
+            continue
+        chosen = []
+        passed = []
+        while heap and len(chosen) < needed:
+            entry = heapq.heappop(heap)
+            judge = judges[entry[2]]
+            if (judge["judge_id"], application["id"]) in existing_pairs:
+                passed.append(entry)
+            elif judge["companies"] & application["companies"]:
+                conflicts_skipped += 1
+                passed.append(entry)
+            else:
+                chosen.append(entry)
+        for entry in passed:
+            heapq.heappush(heap, entry)
+        for entry_load, _, position in chosen:
+            judge_id = judges[position]["judge_id"]
+            new_pairs.append((judge_id, application["id"]))
+            load[judge_id] = entry_load + 1
+            heapq.heappush(heap, (entry_load + 1, draw(), position))
+        if len(chosen) < needed:
+            shortfalls.append({"application_id": application["id"], "missing": needed - len(chosen)})
+
+    return {
+        "pairs": new_pairs,
+        "loads": load,
+        "shortfalls": shortfalls,
+        "conflicts_skipped": conflicts_skipped
+    }
+
+
+async def _active_judges(competition_id: str, exclude: Optional[str] = None) -> List[dict]:
+    supabase = await get_async_supabase_client()
+    response = await supabase.table("judge_assignments")\
+        .select("judge_id, user_profiles!judge_assignments_judge_id_fkey(company_name, company)")\
+        .eq("competition_id", competition_id)\
+        .eq("status", "active")\
+        .order("judge_id")\
+        .execute()
+    return [
+        {"judge_id": row["judge_id"], "companies": company_keys(row.get("user_profiles"))}
+        for row in response.data or []
+        if row["judge_id"] != exclude
+    ]
+
+
+async def _applications(competition_id: str, statuses: Optional[List[str]] = None) -> List[dict]:
+    """Ranked (non-excluded) applications with the applicant's companies, in rank_key order"""
+    supabase = await get_async_supabase_client()
+    rows = []
+    cursor = None
+    while True:
+        query = supabase.table("cfo_applications")\
+            .select("id, rank_key, user_profiles!cfo_applications_user_id_fkey(company_name, company)")\
+            .eq("competition_id", competition_id)\
+            .lt("rank_key", "1")
+        if statuses:
+            query = query.in_("status", statuses)
+        if cursor is not None:
+            query = query.gt("rank_key", cursor)
+        response = await query.order("rank_key").limit(LOAD_PAGE_SIZE).execute()
+        page = response.data or []
+        rows.extend({"id": row["id"], "companies": company_keys(row.get("user_profiles"))} for row in page)
+        if len(page) < LOAD_PAGE_SIZE:
+            return rows
+        cursor = page[-1]["rank_key"]
+
+
+async def _existing_pairs(competition_id: str) -> List[Tuple[str, str]]:
+    supabase = await get_async_supabase_client()
+    pairs = []
+    start = 0
+    while True:
+        response = await supabase.table("judge_application_assignments")\
+            .select("judge_id, application_id")\
+            .eq("competition_id", competition_id)\
+            .order("id")\
+            .range(start, start + LOAD_PAGE_SIZE - 1)\
+            .execute()
+        page = response.data or []
+        pairs.extend((row["judge_id"], row["application_id"]) for row in page)
+        if len(page) < LOAD_PAGE_SIZE:
+            return pairs
+        start += LOAD_PAGE_SIZE
+
+
+async def stored_judges_per_application(competition_id: str) -> int:
+    """Seat count the competition's workload was last distributed with"""
+    supabase = await get_async_supabase_client()
+    response = await supabase.table("competitions")\
+        .select("judges_per_application")\
+        .eq("id", competition_id)\
+        .execute()
+    stored = response.data[0].get("judges_per_application") if response.data else None
+    return stored or DEFAULT_JUDGES_PER_APPLICATION
+
+
+async def _insert_pairs(competition_id: str, pairs: List[Tuple[str, str]]) -> int:
+    if not pairs:
+        return 0
+    supabase = await get_async_supabase_client()
+    await supabase.table("judge_application_assignments").insert([
+        {"competition_id": competition_id, "judge_id": judge_id, "application_id": application_id}
+        for judge_id, application_id in pairs
+    ]).execute()
+    return len(pairs)
+
+
+def _summary(plan: dict, judges_per_application: int, application_count: int, written: int, dry_run: bool) -> dict:
+    loads = plan["loads"]
+    return {
+        "judges_per_application": judges_per_application,
+        "applications": application_count,
+        "judges": len(loads),
+        "new_assignments": len(plan["pairs"]),
+        "written": written,
+        "min_load": min(loads.values()) if loads else 0,
+        "max_load": max(loads.values()) if loads else 0,
+        "loads": loads,
+        "conflicts_skipped": plan["conflicts_skipped"],
+        "shortfalls": plan["shortfalls"],
+        "dry_run": dry_run
+    }
+
+
+async def assign_competition(
+    competition_id: str,
+    judges_per_application: int = DEFAULT_JUDGES_PER_APPLICATION,
+    statuses: Optional[List[str]] = None,
+    dry_run: bool = False
+) -> dict:
+    """Fill every application's missing judge seats in one pass and one insert"""
+    judges = await _active_judges(competition_id)
+    applications = await _applications(competition_id, statuses)
+    plan = plan_assignments(applications, judges, judges_per_application, await _existing_pairs(competition_id), seed=competition_id)
+    written = 0
+    if not dry_run:
+        written = await _insert_pairs(competition_id, plan["pairs"])
+        supabase = await get_async_supabase_client()
+        await supabase.table("competitions")\
+            .update({"judges_per_application": judges_per_application})\
+            .eq("id", competition_id)\
+            .execute()
+    return _summary(plan, judges_per_application, len(applications), written, dry_run)
+
+
+async def rebalance_after_removal(competition_id: str, judge_id: str) -> dict:
+    """Release a removed judge's unscored applications and give them to the remaining judges,
+    up to the seat count the workload was distributed with"""
+    supabase = await get_async_supabase_client()
+    judges_per_application = await stored_judges_per_application(competition_id)
+
+    scored_response = await supabase.table("judge_scores")\
+        .select("entity_id")\
+        .eq("competition_id", competition_id)\
+        .eq("judge_id", judge_id)\
+        .eq("entity_type", "application")\
+        .execute()
+    scored = {row["entity_id"] for row in scored_response.data or []}
+
+    pairs = await _existing_pairs(competition_id)
+    released = [application_id for pair_judge, application_id in pairs if pair_judge == judge_id and application_id not in scored]
+    for start in range(0, len(released), DELETE_CHUNK_SIZE):
+        await supabase.table("judge_application_assignments")\
+            .delete()\
+            .eq("competition_id", competition_id)\
+            .eq("judge_id", judge_id)\
+            .in_("application_id", released[start:start + DELETE_CHUNK_SIZE])\
+            .execute()
+
+    # Applications the judge already scored keep that seat and are not refilled
+    companies: Dict[str, Set[str]] = {}
+    for start in range(0, len(released), DELETE_CHUNK_SIZE):
+        response = await supabase.table("cfo_applications")\
+            .select("id, user_profiles!cfo_applications_user_id_fkey(company_name, company)")\
+            .in_("id", released[start:start + DELETE_CHUNK_SIZE])\
+            .execute()
+        companies.update((row["id"], company_keys(row.get("user_profiles"))) for row in response.data or [])
+    applications = [{"id": application_id, "companies": companies.get(application_id, set())} for application_id in released]
+
+    judges = await _active_judges(competition_id, exclude=judge_id)
+    remaining = [pair for pair in pairs if pair[0] != judge_id]
+    plan = plan_assignments(applications, judges, judges_per_application, remaining, seed=competition_id)
+    written = await _insert_pairs(competition_id, plan["pairs"])
+    result = _summary(plan, judges_per_application, len(applications), written, False)
+    result["released"] = len(released)
+    result["kept_scored"] = len(scored)
+    return result
@@ -0,0 +1,307 @@
+"""
+Judge score calibration and aggregation.
+
+Raw judge scores are stored in judge_scores (one row per judge and scored
+entity: a CFO application or a task submission). Judges score on different
+scales, so every score is normalised within its judge before aggregation:
+
+  zscore  (score - judge mean) / judge standard deviation
+  rank    mid-rank percentile of the score among the judge's scores
+
+An entity's aggregate is the judge-weighted mean (judge_assignments.weight)
+of its normalised scores, after trimming JUDGE_TRIM_COUNT scores from each
+end once it has JUDGE_TRIM_MIN_SCORES of them.
+
+Each (competition, entity type) board is held in memory as flat NumPy arrays
+(one slot per score) plus running per-judge sums. A new or changed score
+updates its judge's sums in O(1) and marks the judge dirty; reading the board
+re-normalises only the dirty judges' scores and re-aggregates only the
+entities they scored, so bursts of scores are folded into one vectorised
+pass. Boards are reloaded from the database after JUDGING_BOARD_TTL_SECONDS
+to pick up scores written by other processes.
+"""
+
+import asyncio
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from supabase_client import get_async_supabase_client
+
+NORMALIZATION_METHODS = ("zscore", "rank")
+JUDGE_TRIM_COUNT = int(os.getenv("JUDGE_TRIM_COUNT", "1"))
+JUDGE_TRIM_MIN_SCORES = int(os.getenv("JUDGE_TRIM_MIN_SCORES", "5"))
+JUDGING_BOARD_TTL_SECONDS = int(os.getenv("JUDGING_BOARD_TTL_SECONDS", "300"))
+LOAD_PAGE_SIZE = 1000
+
+
+class JudgingBoard:
+    def __init__(self, competition_id: str, entity_type: str):
+        self.competition_id = competition_id
+        self.entity_type = entity_type
+        self.loaded_at = time.monotonic()
+
+        self._judges: Dict[str, int] = {}
+        self._judge_ids: List[str] = []
+        self._entities: Dict[str, int] = {}
+        self._entity_ids: List[str] = []
+        self._slots: Dict[Tuple[int, int], int] = {}
+        self._judge_slots: List[List[int]] = []
+        self._entity_slots: List[List[int]] = []
+
+        # Per slot
+        self._slot_judge = np.zeros(0, dtype=np.int64)
+        self._slot_entity = np.zeros(0, dtype=np.int64)
+        self._raw = np.zeros(0, dtype=np.float64)
+        self._normalized = {method: np.zeros(0, dtype=np.float64) for method in NORMALIZATION_METHODS}
+        self._size = 0
+
+        # Per judge: weight and running sums for mean / standard deviation
+        self._weight = np.zeros(0, dtype=np.float64)
+        self._count = np.zeros(0, dtype=np.float64)
+        self._sum = np.zeros(0, dtype=np.float64)
+        self._sum_sq = np.zeros(0, dtype=np.float64)
+
+        # Per entity, per method
+        self._aggregate = {method: np.zeros(0, dtype=np.float64) for method in NORMALIZATION_METHODS}
+        self._raw_mean = np.zeros(0, dtype=np.float64)
+        self._judge_count = np.zeros(0, dtype=np.int64)
+        self._kept = np.zeros(0, dtype=np.int64)
+        self._dirty_judges: Set[int] = set()
+
+    @property
+    def age_seconds(self) -> float:
+        return time.monotonic() - self.loaded_at
+
+    @property
+    def score_count(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _grown(array: np.ndarray, size: int) -> np.ndarray:
+        if size <= array.size:
+            return array
+        grown = np.zeros(max(size, 2 * array.size, 64), dtype=array.dtype)
+        grown[:array.size] = array
+        return grown
+
+    def _judge(self, judge_id: str) -> int:
+        index = self._judges.get(judge_id)
+        if index is None:
+            index = self._judges[judge_id] = len(self._judge_ids)
+            self._judge_ids.append(judge_id)
+            self._judge_slots.append([])
+            for name in ("_weight", "_count", "_sum", "_sum_sq"):
+                setattr(self, name, self._grown(getattr(self, name), index + 1))
+            self._weight[index] = 1.0
+        return index
+
+    def _entity(self, entity_id: str) -> int:
+        index = self._entities.get(entity_id)
+        if index is None:
+            index = self._entities[entity_id] = len(self._entity_ids)
+            self._entity_ids.append(entity_id)
+            self._entity_slots.append([])
+            for name in ("_raw_mean", "_judge_count", "_kept"):
+                setattr(self, name, self._grown(getattr(self, name), index + 1))
+            for method in NORMALIZATION_METHODS:
+                self._aggregate[method] = self._grown(self._aggregate[method], index + 1)
+        return index
+
+    def set_weights(self, weights: Dict[str, float]) -> None:
+        for judge_id, weight in weights.items():
+            judge = self._judge(judge_id)
+            if self._weight[judge] != weight:
+                self._weight[judge] = weight
+                self._dirty_judges.add(judge)
+
+    def record(self, judge_id: str, entity_id: str, score: float) -> None:
+        """Add or replace one judge's score for one entity"""
+        judge = self._judge(judge_id)
+        entity = self._entity(entity_id)
+        score = float(score)
+        slot = self._slots.get((judge, entity))
+        if slot is None:
+            slot = self._slots[(judge, entity)] = self._size
+            self._size += 1
+            for name in ("_slot_judge", "_slot_entity", "_raw"):
+                setattr(self, name, self._grown(getattr(self, name), self._size))
+            for method in NORMALIZATION_METHODS:
+                self._normalized[method] = self._grown(self._normalized[method], self._size)
+            self._slot_judge[slot] = judge
+            self._slot_entity[slot] = entity
+            self._judge_slots[judge].append(slot)
+            self._entity_slots[entity].append(slot)
+        else:
+            old = self._raw[slot]
+            self._count[judge] -= 1
+            self._sum[judge] -= old
+            self._sum_sq[judge] -= old * old
+        self._raw[slot] = score
+        self._count[judge] += 1
+        self._sum[judge] += score
+        self._sum_sq[judge] += score * score
+        self._dirty_judges.add(judge)
+
+    def load(self, rows: Iterable[dict]) -> None:
+        for row in rows:
+            self.record(row["judge_id"], row["entity_id"], row["score"])
+
+    def _renormalize(self, judges: np.ndarray) -> np.ndarray:
+        """Normalised values of the given judges' slots; returns those slots"""
+        slots = np.concatenate([np.array(self._judge_slots[j], dtype=np.int64) for j in judges])
+        slot_judge = self._slot_judge[slots]
+        raw = self._raw[slots]
+
+        count = self._count[slot_judge]
+        mean = self._sum[slot_judge] / count
+        variance = np.maximum(self._sum_sq[slot_judge] / count - mean * mean, 0.0)
+        std = np.sqrt(variance)
+        self._normalized["zscore"][slots] = np.divide(raw - mean, std, out=np.zeros(slots.size), where=std > 1e-9)
+
+        # Mid-rank percentile within each judge: order the slots by (judge, score)
+        # as one integer key and count the judge's scores below / not above each
+        code = np.searchsorted(np.sort(raw), raw)
+        key = slot_judge * (slots.size + 1) + code
+        sorted_key = np.sort(key)
+        start = np.searchsorted(sorted_key, slot_judge * (slots.size + 1))
+        below = np.searchsorted(sorted_key, key, side="left") - start
+        not_above = np.searchsorted(sorted_key, key, side="right") - start
+        self._normalized["rank"][slots] = (below + not_above) / (2.0 * count)
+        return slots
+
+    def _reaggregate(self, entities: np.ndarray) -> None:
+        slots = np.concatenate([np.array(self._entity_slots[e], dtype=np.int64) for e in entities])
+        local = np.repeat(np.arange(entities.size), [len(self._entity_slots[e]) for e in entities])
+        weight = self._weight[self._slot_judge[slots]]
+        sizes = np.bincount(local, minlength=entities.size)
+        trim = np.where(sizes >= JUDGE_TRIM_MIN_SCORES, JUDGE_TRIM_COUNT, 0)
+
+        for method in NORMALIZATION_METHODS:
+            values = self._normalized[method][slots]
+            # Position of each score within its entity, lowest first
+            order = np.lexsort((values, local))
+            position = np.empty(slots.size, dtype=np.int64)
+            group_start = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+            position[order] = np.arange(slots.size) - group_start[local[order]]
+            keep = (position >= trim[local]) & (position < sizes[local] - trim[local])
+            total = np.bincount(local[keep], weights=(weight * values)[keep], minlength=entities.size)
+            weights = np.bincount(local[keep], weights=weight[keep], minlength=entities.size)
+            self._aggregate[method][entities] = np.divide(total, weights, out=np.zeros(entities.size), where=weights > 0)
+        self._raw_mean[entities] = np.bincount(local, weights=self._raw[slots], minlength=entities.size) / sizes
+        self._judge_count[entities] = sizes
+        self._kept[entities] = sizes - 2 * trim
+
+    def refresh(self) -> int:
+        """Re-normalise dirty judges and re-aggregate the entities they scored; returns that entity count"""
+        if not self._dirty_judges:
+            return 0
+        judges = np.array(sorted(j for j in self._dirty_judges if self._judge_slots[j]), dtype=np.int64)
+        self._dirty_judges.clear()
+        if not judges.size:
+            return 0
+        slots = self._renormalize(judges)
+        entities = np.unique(self._slot_entity[slots])
+        self._reaggregate(entities)
+        return int(entities.size)
+
+    def board(self, method: str = "zscore", limit: Optional[int] = None) -> List[dict]:
+        """Entities ranked by their aggregate (ties: higher raw mean, then id)"""
+        self.refresh()
+        n = len(self._entity_ids)
+        if not n:
+            return []
+        aggregate = self._aggregate[method][:n]
+        raw_mean = self._raw_mean[:n]
+        judge_count = self._judge_count[:n]
+        ids = np.array(self._entity_ids)
+        order = np.lexsort((ids, -raw_mean, -aggregate))
+        if limit is not None:
+            order = order[:limit]
+        return [
+            {
+                "rank": i + 1,
+                "entity_id": self._entity_ids[e],
+                "normalized_score": round(float(aggregate[e]), 4),
+                "raw_mean": round(float(raw_mean[e]), 2),
+                "judge_count": int(judge_count[e]),
+                "scores_used": int(self._kept[e])
+            }
+            for i, e in enumerate(order)
+        ]
+
+    def judge_stats(self) -> List[dict]:
+        stats = []
+        for judge_id, j in self._judges.items():
+            count = self._count[j]
+            mean = float(self._sum[j] / count) if count else None
+            std = float(np.sqrt(max(self._sum_sq[j] / count - mean * mean, 0.0))) if count else None
+            stats.append({
+                "judge_id": judge_id,
+                "scores": int(count),
+                "weight": float(self._weight[j]),
+                "mean": round(mean, 2) if mean is not None else None,
+                "std": round(std, 2) if std is not None else None
+            })
+        return stats
+
+
+_boards: Dict[Tuple[str, str], JudgingBoard] = {}
+_board_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+
+async def _load_board(competition_id: str, entity_type: str) -> JudgingBoard:
+    supabase = await get_async_supabase_client()
+    board = JudgingBoard(competition_id, entity_type)
+
+    assignments = await supabase.table("judge_assignments")\
+        .select("judge_id, weight")\
+        .eq("competition_id", competition_id)\
+        .execute()
+    board.set_weights({row["judge_id"]: float(row.get("weight") or 1.0) for row in assignments.data or []})
+
+    start = 0
+    while True:
+        response = await supabase.table("judge_scores")\
+            .select("judge_id, entity_id, score")\
+            .eq("competition_id", competition_id)\
+            .eq("entity_type", entity_type)\
+            .order("id")\
+            .range(start, start + LOAD_PAGE_SIZE - 1)\
+            .execute()
+        page = response.data or []
+        board.load(page)
+        if len(page) < LOAD_PAGE_SIZE:
+            return board
+        start += LOAD_PAGE_SIZE
+
+
+async def get_judging_board(competition_id: str, entity_type: str, reload: bool = False) -> JudgingBoard:
+    key = (competition_id, entity_type)
+    board = _boards.get(key)
+    if board is not None and not reload and board.age_seconds < JUDGING_BOARD_TTL_SECONDS:
+        return board
+
+    lock = _board_locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        board = _boards.get(key)
+        if board is not None and not reload and board.age_seconds < JUDGING_BOARD_TTL_SECONDS:
+            return board
+        board = await _load_board(competition_id, entity_type)
+        _boards[key] = board
+        return board
+
+
+def record_score(competition_id: str, entity_type: str, judge_id: str, entity_id: str, score: float) -> None:
+    """Fold a stored score into the in-memory board (if that board is loaded)"""
+    board = _boards.get((competition_id, entity_type))
+    if board is not None:
+        board.record(judge_id, entity_id, score)
+
+
+def set_judge_weight(competition_id: str, judge_id: str, weight: float) -> None:
+    for (board_competition, _), board in _boards.items():
+        if board_competition == competition_id:
+            board.set_weights({judge_id: weight})
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, EmailStr, ConfigDict
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 import uuid
 from enum import Enum
@@ -287,6 +287,22 @@ class CFOApplicationReview(BaseModel):
     admin_notes: Optional[str] = None
     rejection_reason: Optional[str] = None
 
+class ScoringWhatIf(BaseModel):
+    """Candidate changes to the active scoring rubric, for the admin what-if simulator"""
+    weights: Dict[str, float] = {}
+    points: Dict[str, Dict[str, int]] = {}  # question -> option value -> raw points
+    bins: int = Field(default=20, ge=1, le=200)
+    movers_limit: int = Field(default=25, ge=0, le=1000)
+
+class QuotaBound(BaseModel):
+    """Soft bounds on how many qualified applicants may share one profile value"""
+    min: int = Field(default=0, ge=0)
+    max: Optional[int] = Field(default=None, ge=0)
+
+class ShortlistQuotas(BaseModel):
+    """Quota-constrained shortlist: profile field (country / industry / years_of_experience) -> value -> bounds"""
+    quotas: Dict[str, Dict[str, QuotaBound]] = {}
+
 # Task Models
 class TaskCreate(BaseModel):
     competition_id: str
@@ -331,6 +347,19 @@ class AdminUserResponse(BaseModel):
 class JudgeAssignment(BaseModel):
     judge_id: str
     competition_id: str
+    weight: float = Field(default=1.0, gt=0, le=10)
+
+class JudgingEntityType(str, Enum):
+    APPLICATION = "application"
+    SUBMISSION = "submission"
+
+class JudgeScoreCreate(BaseModel):
+    competition_id: str
+    entity_type: JudgingEntityType
+    entity_id: str
+    score: float = Field(ge=0, le=100)
+    criteria_scores: Dict[str, float] = {}
+    feedback: Optional[str] = Field(default=None, max_length=5000)
 
 class JudgeAssignmentResponse(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -340,5 +369,6 @@ class JudgeAssignmentResponse(BaseModel):
     judge_id: str
     judge_name: Optional[str] = None
     judge_email: Optional[str] = None
+    weight: float = 1.0
     status: str
     created_at: datetime
@@ -0,0 +1,40 @@
+"""
+In-process cache of user_profiles rows keyed by user id.
+Entries expire after PROFILE_CACHE_TTL_SECONDS (least recently used rows are
+evicted first when full); code paths that write a profile invalidate it.
+"""
+
+import os
+import threading
+from typing import Optional
+from cachetools import TTLCache
+
+PROFILE_CACHE_TTL_SECONDS = int(os.getenv("PROFILE_CACHE_TTL_SECONDS", "60"))
+PROFILE_CACHE_MAX_SIZE = int(os.getenv("PROFILE_CACHE_MAX_SIZE", "10000"))
+
+_cache: TTLCache = TTLCache(maxsize=PROFILE_CACHE_MAX_SIZE, ttl=PROFILE_CACHE_TTL_SECONDS)
+_lock = threading.Lock()
+
+
+def get_cached_profile(user_id: str) -> Optional[dict]:
+    with _lock:
+        profile = _cache.get(user_id)
+    return dict(profile) if profile is not None else None
+
+
+def cache_profile(profile: dict) -> None:
+    if not profile or not profile.get("id"):
+        return
+    with _lock:
+        _cache[profile["id"]] = dict(profile)
+
+
+def invalidate_profile(*user_ids: str) -> None:
+    with _lock:
+        for user_id in user_ids:
+            _cache.pop(user_id, None)
+
+
+def clear_profile_cache() -> None:
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,249 @@
+"""
+Quota-constrained shortlisting.
+
+Admins can put soft quotas on the qualified band by the applicant's
+country, industry and years_of_experience (user_profiles), e.g.
+{"country": {"EG": {"min": 20}, "SA": {"max": 40}}}. Selection runs over
+the ranked (non-excluded) applications in rank_key order:
+
+  1. caps     walk the ranking and take the first QUALIFIED_LIMIT rows whose
+              strata are all below their max; each row passed over is
+              reported as a cap skip
+  2. floors   for every stratum below its min, pop the best unselected
+              applicant from that stratum's heap and swap out the lowest
+              ranked selected applicant whose removal breaks no other floor
+              (a max-heap over the selected ranking positions)
+  3. reserve  the next RESERVE_LIMIT - QUALIFIED_LIMIT unselected rows in
+              plain rank order
+
+Sorting and heap construction are O(n log n); each swap is a few heap
+operations. Quotas are soft: floors that cannot be met are reported, not
+enforced. The result explains every swap and cap skip, and the statuses are
+written through the same single apply_cfo_shortlist() call as the plain
+shortlist.
+"""
+
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+from supabase_client import get_async_supabase_client
+from cfo_application_scoring import QUALIFIED_LIMIT, RESERVE_LIMIT
+from shortlisting import write_shortlist
+
+QUOTA_DIMENSIONS = ("country", "industry", "years_of_experience")
+QUOTA_PAGE_SIZE = 1000
+
+Stratum = Tuple[str, str]
+
+
+class QuotaError(ValueError):
+    pass
+
+
+def _bounds(quotas: Dict[str, Dict[str, dict]], seats: int) -> Dict[Stratum, Tuple[int, Optional[int]]]:
+    bounds = {}
+    for dimension, values in quotas.items():
+        if dimension not in QUOTA_DIMENSIONS:
+            raise QuotaError(f"Unknown quota dimension '{dimension}'; expected one of {', '.join(QUOTA_DIMENSIONS)}")
+        for value, bound in values.items():
+            low = int(bound.get("min") or 0)
+            high = bound.get("max")
+            if high is not None and int(high) < low:
+                raise QuotaError(f"{dimension}={value}: max {high} is below min {low}")
+            bounds[(dimension, value)] = (min(low, seats), None if high is None else int(high))
+    return bounds
+
+
+def _strata(row: dict) -> List[Stratum]:
+    profile = row.get("user_profiles") or {}
+    return [(dimension, str(profile.get(dimension) or "unknown")) for dimension in QUOTA_DIMENSIONS]
+
+
+def _label(stratum: Stratum) -> str:
+    return f"{stratum[0]}={stratum[1]}"
+
+
+def select_with_quotas(
+    rows: List[dict],
+    quotas: Dict[str, Dict[str, dict]],
+    seats: int = QUALIFIED_LIMIT,
+    reserve_seats: int = RESERVE_LIMIT - QUALIFIED_LIMIT
+) -> dict:
+    """Quota-respecting qualified / reserve bands for ranked rows (rank_key + user_profiles)"""
+    bounds = _bounds(quotas, seats)
+    ranked = sorted((row for row in rows if not row.get("auto_excluded")), key=lambda row: row["rank_key"])
+    strata = [[stratum for stratum in _strata(row) if stratum in bounds] for row in ranked]
+
+    def entry(i: int) -> dict:
+        row = ranked[i]
+        return {
+            "application_id": row["id"],
+            "rank": i + 1,
+            "total_score": row.get("total_score"),
+            "strata": [_label(stratum) for stratum in strata[i]]
+        }
+
+    # Per-stratum heaps of ranking positions (already ascending, so valid heaps)
+    heaps: Dict[Stratum, List[int]] = {stratum: [] for stratum in bounds}
+    for i, row_strata in enumerate(strata):
+        for stratum in row_strata:
+            heaps[stratum].append(i)
+
+    counts = {stratum: 0 for stratum in bounds}
+    baseline = {stratum: sum(1 for i in range(min(seats, len(ranked))) if stratum in strata[i]) for stratum in bounds}
+    selected = set()
+
+    def capped(i: int, leaving: Optional[int] = None) -> Optional[Stratum]:
+        for stratum in strata[i]:
+            high = bounds[stratum][1]
+            held = counts[stratum] - (leaving is not None and stratum in strata[leaving])
+            if high is not None and held >= high:
+                return stratum
+        return None
+
+    def add(i: int) -> None:
+        selected.add(i)
+        for stratum in strata[i]:
+            counts[stratum] += 1
+
+    def remove(i: int) -> None:
+        selected.discard(i)
+        for stratum in strata[i]:
+            counts[stratum] -= 1
+
+    # 1. Caps
+    cap_skips = []
+    for i in range(len(ranked)):
+        if len(selected) == seats:
+            break
+        stratum = capped(i)
+        if stratum is None:
+            add(i)
+        else:
+            cap_skips.append({**entry(i), "reason": f"{_label(stratum)} is at its max of {bounds[stratum][1]}"})
+
+    # 2. Floors, worst deficit first
+    swaps = []
+    unmet = []
+    outgoing = [-i for i in selected]
+    heapq.heapify(outgoing)
+    floors = sorted((stratum for stratum, (low, _) in bounds.items() if counts[stratum] < low),
+                    key=lambda stratum: (counts[stratum] - bounds[stratum][0], stratum))
+    for stratum in floors:
+        low = bounds[stratum][0]
+        candidates = heaps[stratum]
+        while counts[stratum] < low:
+            # Lowest ranked selected applicant whose removal keeps every floor
+            out = None
+            kept = []
+            while outgoing:
+                i = -heapq.heappop(outgoing)
+                if i not in selected:
+                    continue
+                if stratum not in strata[i] and all(counts[s] > bounds[s][0] for s in strata[i]):
+                    out = i
+                    break
+                kept.append(i)
+            for i in kept:
+                heapq.heappush(outgoing, -i)
+
+            incoming = None
+            if out is not None or len(selected) < seats:
+                while candidates:
+                    i = heapq.heappop(candidates)
+                    if i not in selected and capped(i, out) is None:
+                        incoming = i
+                        break
+
+            if incoming is None:
+                if out is not None:
+                    heapq.heappush(outgoing, -out)
+                unmet.append({
+                    "stratum": _label(stratum),
+                    "min": low,
+                    "selected": counts[stratum],
+                    "reason": "no eligible applicant left in this stratum" if out is not None or len(selected) < seats
+                    else "every selected applicant is protected by a minimum"
+                })
+                break
+
+            if out is not None:
+                remove(out)
+            add(incoming)
+            heapq.heappush(outgoing, -incoming)
+            swaps.append({
+                "added": entry(incoming),
+                "removed": entry(out) if out is not None else None,
+                "reason": f"{_label(stratum)} below its min of {low}"
+            })
+
+    # 3. Reserve in plain rank order
+    reserve = []
+    for i in range(len(ranked)):
+        if len(reserve) == reserve_seats:
+            break
+        if i not in selected:
+            reserve.append(i)
+
+    qualified = sorted(selected)
+    return {
+        "qualified": [ranked[i] for i in qualified],
+        "reserve": [ranked[i] for i in reserve],
+        "swaps": swaps,
+        "cap_skips": cap_skips,
+        "unmet": unmet,
+        "strata": {
+            _label(stratum): {
+                "min": bounds[stratum][0],
+                "max": bounds[stratum][1],
+                "selected": counts[stratum],
+                "unconstrained": baseline[stratum]
+            }
+            for stratum in sorted(bounds)
+        },
+        "ranked_count": len(ranked)
+    }
+
+
+async def _load_ranked(competition_id: str) -> List[dict]:
+    """Every ranked application with its profile strata, in keyset pages of rank_key
+    (auto-excluded keys start with '1', so they are cut off in the index scan)"""
+    supabase = await get_async_supabase_client()
+    rows: List[dict] = []
+    cursor = None
+    while True:
+        query = supabase.table("cfo_applications")\
+            .select("id, user_id, total_score, rank_key, auto_excluded, user_profiles!cfo_applications_user_id_fkey(country, industry, years_of_experience)")\
+            .eq("competition_id", competition_id)\
+            .lt("rank_key", "1")
+        if cursor is not None:
+            query = query.gt("rank_key", cursor)
+        response = await query.order("rank_key").limit(QUOTA_PAGE_SIZE).execute()
+        page = response.data or []
+        rows.extend(page)
+        if len(page) < QUOTA_PAGE_SIZE:
+            return rows
+        cursor = page[-1]["rank_key"]
+
+
+async def quota_shortlist_competition(competition_id: str, quotas: Dict[str, Dict[str, dict]], dry_run: bool = False) -> dict:
+    """Select the quota-constrained bands and (unless dry_run) write every status in one RPC"""
+    rows = await _load_ranked(competition_id)
+    selection = select_with_quotas(rows, quotas)
+    qualified_ids = [row["id"] for row in selection["qualified"]]
+    reserve_ids = [row["id"] for row in selection["reserve"]]
+    result = {
+        "competition_id": competition_id,
+        "qualified": {"count": len(qualified_ids), "application_ids": qualified_ids},
+        "reserve": {"count": len(reserve_ids), "application_ids": reserve_ids},
+        "swaps": selection["swaps"],
+        "cap_skips": selection["cap_skips"],
+        "unmet": selection["unmet"],
+        "strata": selection["strata"],
+        "ranked_count": selection["ranked_count"],
+        "dry_run": dry_run,
+        "changed": None
+    }
+    if not dry_run:
+        result["changed"] = await write_shortlist(competition_id, qualified_ids, reserve_ids)
+    return result
@@ -0,0 +1,189 @@
+"""
+In-memory ranking index for CFO applications.
+
+One sorted list per competition of the stored composite rank_key (the
+column the ranked listing pages on: score, then the
+calculate_total_score() tie-breakers, then submission time and id), so an
+applicant's rank and determine_status() band are an O(log n) bisect instead
+of a table scan. Auto-excluded applications are tracked but never ranked.
+
+The index is rebuilt from the database on startup and kept current by the
+endpoints that write scores or statuses (submit, admin overrides, reviews).
+"""
+
+import asyncio
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sortedcontainers import SortedList
+
+from supabase_client import get_async_supabase_client
+from cfo_application_scoring import determine_status
+
+INDEX_FIELDS = ("id", "competition_id", "total_score", "submitted_at", "auto_excluded", "status", "admin_override", "rank_key")
+INDEX_COLUMNS = ", ".join(INDEX_FIELDS)
+REBUILD_PAGE_SIZE = 1000
+
+
+def rank_key(row: dict) -> str:
+    """The row's stored rank_key: ascending order is ranking order (the database
+    keeps it current on every score write, see the 20251227 migration)"""
+    return row["rank_key"]
+
+
+class RankingIndex:
+    def __init__(self):
+        self._ranked: Dict[str, SortedList] = {}
+        self._entries: Dict[str, dict] = {}
+        # Writes made while a rebuild is reading the table, replayed after the swap
+        self._journal: Optional[List[Tuple[str, tuple]]] = None
+        self.ready = False
+
+    def _record(self, op: str, *args) -> None:
+        if self._journal is not None:
+            self._journal.append((op, args))
+
+    def clear(self) -> None:
+        self._ranked.clear()
+        self._entries.clear()
+        self.ready = False
+
+    def upsert(self, row: dict) -> None:
+        """Insert or re-key one application (row needs INDEX_FIELDS)"""
+        self._record("upsert", row)
+        app_id = str(row["id"])
+        previous = self._entries.get(app_id)
+        entry = dict(previous or {})
+        entry.update({k: v for k, v in row.items() if k in INDEX_FIELDS})
+        entry["id"] = app_id
+        if "competition_id" not in entry:
+            return
+
+        if previous is not None and previous.get("key") is not None:
+            self._ranked[previous["competition_id"]].discard(previous["key"])
+
+        entry["key"] = None if entry.get("auto_excluded") else rank_key(entry)
+        if entry["key"] is not None:
+            self._ranked.setdefault(entry["competition_id"], SortedList()).add(entry["key"])
+        self._entries[app_id] = entry
+
+    def load(self, rows: Iterable[dict]) -> None:
+        for row in rows:
+            self.upsert(row)
+
+    def remove(self, app_id: str) -> None:
+        self._record("remove", app_id)
+        entry = self._entries.pop(str(app_id), None)
+        if entry is not None and entry.get("key") is not None:
+            self._ranked[entry["competition_id"]].discard(entry["key"])
+
+    def set_status(self, app_ids: Iterable[str], status: str, admin_override: Optional[bool] = None) -> None:
+        """Status changes never move an application, so no re-keying is needed"""
+        app_ids = list(app_ids)
+        self._record("set_status", app_ids, status, admin_override)
+        for app_id in app_ids:
+            entry = self._entries.get(str(app_id))
+            if entry is None:
+                continue
+            entry["status"] = status
+            if admin_override is not None:
+                entry["admin_override"] = admin_override
+
+    def apply_shortlist(self, competition_id: str, qualified: Iterable[str], reserve: Iterable[str],
+                        replaceable: Iterable[str]) -> None:
+        """Mirror apply_cfo_shortlist() for the competition's entries"""
+        qualified, reserve, replaceable = {str(i) for i in qualified}, {str(i) for i in reserve}, set(replaceable)
+        self._record("apply_shortlist", competition_id, qualified, reserve, replaceable)
+        for entry in self._entries.values():
+            if entry["competition_id"] != competition_id or entry.get("admin_override") or entry.get("status") not in replaceable:
+                continue
+            if entry["id"] in qualified:
+                entry["status"] = "qualified"
+            elif entry["id"] in reserve:
+                entry["status"] = "reserve"
+            else:
+                entry["status"] = "excluded" if entry.get("auto_excluded") else "not_selected"
+
+    def ranked_count(self, competition_id: str) -> int:
+        return len(self._ranked.get(competition_id, ()))
+
+    def rank_of(self, app_id: str) -> Optional[int]:
+        """1-based rank among non-excluded applications, None if excluded or unknown"""
+        entry = self._entries.get(str(app_id))
+        if entry is None or entry.get("key") is None:
+            return None
+        return self._ranked[entry["competition_id"]].index(entry["key"]) + 1
+
+    def lookup(self, app_id: str) -> Optional[dict]:
+        entry = self._entries.get(str(app_id))
+        if entry is None:
+            return None
+        rank = self.rank_of(app_id)
+        return {
+            "application_id": entry["id"],
+            "competition_id": entry["competition_id"],
+            "rank": rank,
+            "ranked_count": self.ranked_count(entry["competition_id"]),
+            "band": determine_status(rank or 0, entry["key"] is None),
+            "status": entry.get("status"),
+            "admin_override": bool(entry.get("admin_override"))
+        }
+
+
+ranking_index = RankingIndex()
+_rebuild_task: Optional[asyncio.Task] = None
+
+
+async def _rebuild() -> None:
+    import logging
+    logger = logging.getLogger(__name__)
+    supabase = await get_async_supabase_client()
+
+    fresh = RankingIndex()
+    ranking_index._journal = []
+    start = 0
+    try:
+        while True:
+            response = await supabase.table("cfo_applications")\
+                .select(INDEX_COLUMNS)\
+                .order("id")\
+                .range(start, start + REBUILD_PAGE_SIZE - 1)\
+                .execute()
+            rows = response.data or []
+            fresh.load(rows)
+            if len(rows) < REBUILD_PAGE_SIZE:
+                break
+            start += REBUILD_PAGE_SIZE
+
+        for op, args in ranking_index._journal:
+            getattr(fresh, op)(*args)
+    finally:
+        ranking_index._journal = None
+
+    # Swap in one step so lookups never see a half-built index
+    ranking_index._ranked = fresh._ranked
+    ranking_index._entries = fresh._entries
+    ranking_index.ready = True
+    logger.info(f"Ranking index rebuilt: {len(fresh._entries)} applications in {len(fresh._ranked)} competitions")
+
+
+def _log_rebuild_failure(task: asyncio.Task) -> None:
+    import logging
+    logger = logging.getLogger(__name__)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Ranking index rebuild failed: {task.exception()}")
+
+
+def start_ranking_index_rebuild() -> asyncio.Task:
+    """Rebuild in the background (startup); concurrent callers share one rebuild"""
+    global _rebuild_task
+    if _rebuild_task is None or _rebuild_task.done():
+        _rebuild_task = asyncio.create_task(_rebuild())
+        _rebuild_task.add_done_callback(_log_rebuild_failure)
+    return _rebuild_task
+
+
+async def ensure_ranking_index() -> RankingIndex:
+    """The index, waiting for (or starting) a rebuild if it is not loaded yet"""
+    if not ranking_index.ready:
+        await start_ranking_index_rebuild()
+    return ranking_index
@@ -0,0 +1,66 @@
+"""
+Request-scoped identity map over Supabase reads.
+
+FastAPI caches dependency results per request, so every dependency and
+handler that declares `reads: RequestReads = Depends(get_request_reads)`
+shares one instance. Identical table + columns + equality-filter reads are
+sent to PostgREST once; writes through other paths should call invalidate().
+"""
+
+from typing import Dict, List, Optional, Tuple
+from supabase_client import get_async_supabase_client
+
+ReadKey = Tuple[str, str, Tuple[Tuple[str, str], ...]]
+
+
+class RequestReads:
+    def __init__(self):
+        self._rows: Dict[ReadKey, List[dict]] = {}
+
+    @staticmethod
+    def _key(table: str, columns: str, filters: dict) -> ReadKey:
+        normalized = ",".join(c.strip() for c in columns.split(","))
+        return (table, normalized, tuple(sorted((k, str(v)) for k, v in filters.items())))
+
+    def _from_full_rows(self, table: str, columns: str, filters: dict) -> Optional[List[dict]]:
+        """Project a narrower read out of an already cached select('*') with the same filters"""
+        if columns == "*" or "(" in columns:
+            return None
+        full_rows = self._rows.get(self._key(table, "*", filters))
+        if full_rows is None:
+            return None
+        wanted = [c.strip() for c in columns.split(",")]
+        return [{c: row.get(c) for c in wanted} for row in full_rows]
+
+    async def select(self, table: str, columns: str = "*", **filters) -> List[dict]:
+        """Rows of `table` matching all equality filters, fetched at most once per request"""
+        key = self._key(table, columns, filters)
+        if key in self._rows:
+            return self._rows[key]
+
+        rows = self._from_full_rows(table, columns, filters)
+        if rows is None:
+            supabase = await get_async_supabase_client()
+            query = supabase.table(table).select(columns)
+            for column, value in filters.items():
+                query = query.eq(column, value)
+            rows = (await query.execute()).data or []
+
+        self._rows[key] = rows
+        return rows
+
+    async def first(self, table: str, columns: str = "*", **filters) -> Optional[dict]:
+        rows = await self.select(table, columns, **filters)
+        return rows[0] if rows else None
+
+    def prime(self, table: str, rows: List[dict], columns: str = "*", **filters) -> None:
+        """Record rows the caller already fetched so later identical reads reuse them"""
+        self._rows[self._key(table, columns, filters)] = rows
+
+    def invalidate(self, table: str) -> None:
+        for key in [k for k in self._rows if k[0] == table]:
+            del self._rows[key]
+
+
+def get_request_reads() -> RequestReads:
+    return RequestReads()
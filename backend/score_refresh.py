@@ -0,0 +1,131 @@
+"""
+Lazy re-scoring of applications scored with another rubric version.
+
+Every application stores the rubric version its scores came from
+(scoring_version; NULL for rows scored before versioning). Ranking reads
+call schedule_stale_rescore(): if the competition has rows from another
+version, one background task per competition re-scores them with the batch
+scorer in keyset pages of STALE_RESCORE_BATCH_SIZE, writes each page through
+apply_cfo_application_scores() (which also moves rank_key) and updates the
+ranking index. A rubric change therefore rolls out as competitions are
+viewed, without a stop-the-world rescoring job.
+
+Rows the scorer cannot accept (legacy answers) are left as they are, so a
+competition is re-checked at most every STALE_RECHECK_SECONDS per rubric
+version.
+"""
+
+import asyncio
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from supabase_client import get_async_supabase_client
+from cfo_batch_scoring import (
+    load_columns, is_scorable, score_batch, score_patches, verify_against_scalar, changed_patches, write_scores
+)
+from scoring_rubric import CompiledRubric, get_active_rubric, refresh_active_rubric
+from ranking_index import ranking_index
+
+STALE_RESCORE_BATCH_SIZE = int(os.getenv("STALE_RESCORE_BATCH_SIZE", "500"))
+STALE_RECHECK_SECONDS = int(os.getenv("STALE_RECHECK_SECONDS", "60"))
+STALE_VERIFY_SAMPLE = 5
+
+_tasks: Dict[str, asyncio.Task] = {}
+# competition_id -> (rubric version, monotonic time) of the last check
+_checked: Dict[str, Tuple[str, float]] = {}
+
+
+async def _stale_page(competition_id: str, rubric: CompiledRubric, cursor: Optional[str]) -> List[dict]:
+    supabase = await get_async_supabase_client()
+    query = supabase.table("cfo_applications")\
+        .select(", ".join(load_columns(rubric)))\
+        .eq("competition_id", competition_id)\
+        .or_(f'scoring_version.is.null,scoring_version.neq."{rubric.version}"')
+    if cursor is not None:
+        query = query.gt("id", cursor)
+    response = await query.order("id").limit(STALE_RESCORE_BATCH_SIZE).execute()
+    return response.data or []
+
+
+def _score_page(rows: List[dict], rubric: CompiledRubric) -> Tuple[List[dict], List[str]]:
+    patches = score_patches(rows, score_batch(rows, rubric), rubric)
+    return changed_patches(rows, patches), verify_against_scalar(rows, patches, STALE_VERIFY_SAMPLE)
+
+
+async def rescore_stale(competition_id: str) -> dict:
+    """Re-score one competition's stale rows, page by page, with the active rubric"""
+    import logging
+    logger = logging.getLogger(__name__)
+
+    rubric = await refresh_active_rubric()
+    cursor = None
+    batches = 0
+    stale = 0
+    skipped = 0
+    written = 0
+    mismatched: List[str] = []
+    while True:
+        rows = await _stale_page(competition_id, rubric, cursor)
+        stale += len(rows)
+        scorable = [row for row in rows if is_scorable(row, rubric)]
+        skipped += len(rows) - len(scorable)
+
+        if scorable:
+            # Text features make scoring CPU-bound; keep it off the event loop
+            changed, mismatched = await asyncio.to_thread(_score_page, scorable, rubric)
+            if mismatched:
+                logger.error(f"Lazy rescoring of competition {competition_id} disagreed with the scalar scorer for {mismatched}; stopping")
+                break
+            for row in await write_scores(changed):
+                ranking_index.upsert(row)
+                written += 1
+        batches += 1
+
+        if len(rows) < STALE_RESCORE_BATCH_SIZE:
+            break
+        cursor = rows[-1]["id"]
+
+    if stale:
+        logger.info(f"Rescored competition {competition_id} to rubric {rubric.version}: {written} written, {skipped} unscorable, {batches} batches")
+    return {
+        "competition_id": competition_id,
+        "rubric_version": rubric.version,
+        "stale": stale,
+        "written": written,
+        "skipped": skipped,
+        "batches": batches,
+        # Non-empty when a page disagreed with the scalar scorer and rescoring stopped there
+        "mismatched_ids": mismatched
+    }
+
+
+def _log_failure(task: asyncio.Task) -> None:
+    import logging
+    logger = logging.getLogger(__name__)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Lazy rescoring failed: {task.exception()}")
+
+
+def schedule_stale_rescore(competition_id: str) -> bool:
+    """Start a background rescore of the competition's stale rows unless one is running or the
+    competition was checked recently against this rubric version; True while a rescore runs"""
+    task = _tasks.get(competition_id)
+    if task is not None and not task.done():
+        return True
+
+    version = get_active_rubric().version
+    checked = _checked.get(competition_id)
+    if checked is not None and checked[0] == version and time.monotonic() - checked[1] < STALE_RECHECK_SECONDS:
+        return False
+
+    _checked[competition_id] = (version, time.monotonic())
+    task = asyncio.create_task(rescore_stale(competition_id))
+    task.add_done_callback(_log_failure)
+    _tasks[competition_id] = task
+    return True
+
+
+def is_rescoring(competition_id: str) -> bool:
+    task = _tasks.get(competition_id)
+    return task is not None and not task.done()
@@ -0,0 +1,390 @@
+"""
+Versioned, data-driven scoring rubric for CFO applications.
+
+A rubric is a JSON document (stored in the scoring_rubrics table) giving, for
+each application step, the points per option answer, text-length bands,
+optional text-feature bands (text_features.ANSWER_FEATURES), red flags and
+hard gates, plus the step weights and the red flag penalty.
+compile_rubric() validates a document against the application models once
+and flattens it into lookup tables, so scoring a submission is a handful of
+dict and bisect reads. Activating a version swaps the compiled rubric in
+place; other workers pick it up within RUBRIC_REFRESH_SECONDS.
+"""
+
+import os
+import time
+from bisect import bisect_right
+from enum import Enum
+from typing import Dict, List, Optional, Tuple, get_args
+
+from pydantic import BaseModel
+
+from supabase_client import get_async_supabase_client
+from text_features import ANSWER_FEATURES, answer_feature
+
+RUBRIC_REFRESH_SECONDS = int(os.getenv("RUBRIC_REFRESH_SECONDS", "60"))
+
+STEP_NAMES = ["step1", "step2", "step3", "step4"]
+
+# Board-approved rubric (December 2025); used until a version is activated in the database
+DEFAULT_RUBRIC = {
+    "version": "2025-12-board",
+    "weights": {
+        "leadership": 1.2,
+        "ethics": 1.3,
+        "capital_allocation": 1.2,
+        "technical_finance": 0.8,
+        "judgment": 1.0,
+        "commitment": 1.0
+    },
+    "penalty": {"free_flags": 2, "points_per_flag": 5},
+    "exclusion_reason": "ethics_or_commitment_failure",
+    "steps": {
+        # Leadership Profile
+        "step1": {
+            "weight": "leadership",
+            "rules": [
+                {"type": "gate", "when": {"cfo_readiness_commitment": ["not_ready"]}, "flag": "not_ready_for_cfo",
+                 "reason": "Applicant indicated they are not ready for CFO responsibilities"},
+                {"type": "points", "column": "experience_years",
+                 "points": {"less_than_2": 5, "2_to_5": 15, "5_to_10": 25, "more_than_10": 30}},
+                {"type": "points", "column": "leadership_exposure",
+                 "points": {"none": 0, "team_lead": 15, "department_head": 25, "c_suite": 35}},
+                {"type": "points", "column": "decision_ownership",
+                 "points": {"avoid": 0, "delegate": 10, "own_with_support": 20, "full_ownership": 30}},
+                {"type": "flag", "when": {"decision_ownership": ["avoid"]}, "flag": "avoids_decisions"},
+                {"type": "points", "column": "leadership_willingness",
+                 "points": {"not_interested": 0, "maybe_later": 5, "ready_with_guidance": 15, "fully_ready": 25}},
+                {"type": "points", "column": "commitment_level",
+                 "points": {"exploring": 5, "partially_committed": 10, "highly_committed": 20, "all_in": 25}},
+                {"type": "points", "column": "cfo_readiness_commitment",
+                 "points": {"not_ready": 0, "exploring": 10, "ready_with_conditions": 25, "fully_ready": 40}},
+                {"type": "flag", "when": {"leadership_willingness": ["not_interested"], "commitment_level": ["exploring"]},
+                 "flag": "low_willingness_commitment", "exclude": True}
+            ]
+        },
+        # Judgment & Capital Allocation
+        "step2": {
+            "weight": "capital_allocation",
+            "rules": [
+                {"type": "points", "column": "capital_allocation",
+                 "points": {"safe_investment": 10, "moderate_risk": 20, "growth_investment": 25, "aggressive_expansion": 15}},
+                {"type": "length", "column": "capital_justification", "bands": [[0, 5], [50, 15], [100, 20]],
+                 "flag_below": 50, "flag": "weak_justification"},
+                {"type": "length", "column": "cash_vs_profit", "bands": [[0, 5], [50, 15], [100, 20]],
+                 "flag_below": 50, "flag": "weak_cash_profit_answer"},
+                {"type": "length", "column": "kpi_prioritization", "bands": [[0, 5], [50, 15], [100, 20]]}
+            ]
+        },
+        # Financial Reality Under Pressure
+        "step3": {
+            "weight": "technical_finance",
+            "rules": [
+                {"type": "points", "column": "dscr_choice",
+                 "points": {"prioritize_debt": 15, "balance_both": 25, "prioritize_growth": 10, "renegotiate": 20}},
+                {"type": "points", "column": "cost_priority",
+                 "points": {"cut_people": 5, "cut_marketing": 10, "optimize_operations": 25, "renegotiate_vendors": 20}},
+                {"type": "flag", "when": {"cost_priority": ["cut_people"]}, "flag": "people_first_cut"},
+                {"type": "points", "column": "cfo_mindset",
+                 "points": {"number_cruncher": 10, "business_partner": 20, "strategic_advisor": 25, "chief_value_officer": 30}},
+                {"type": "length", "column": "dscr_impact", "bands": [[0, 0], [50, 10]]},
+                {"type": "length", "column": "mindset_explanation", "bands": [[0, 0], [50, 10]]}
+            ]
+        },
+        # Ethics & Final Ownership (hard disqualifier)
+        "step4": {
+            "weight": "ethics",
+            "rules": [
+                {"type": "points", "column": "ethics_choice",
+                 "points": {"report_immediately": 35, "investigate_first": 30, "consult_legal": 25,
+                            "adjust_quietly": 0, "do_nothing": 0}},
+                {"type": "flag", "when": {"ethics_choice": ["adjust_quietly", "do_nothing"]}, "flag": "ethics_failure",
+                 "exclude": True},
+                {"type": "points", "column": "culture_vs_results",
+                 "points": {"results_first": 10, "culture_first": 20, "balance_both": 30, "depends_on_situation": 15}},
+                {"type": "length", "column": "why_top_100", "bands": [[0, 10], [100, 25], [200, 35]],
+                 "flag_below": 100, "flag": "weak_motivation"}
+            ]
+        }
+    }
+}
+
+
+class RubricError(ValueError):
+    """The rubric document does not describe a valid scoring of the application form"""
+
+
+def _enum_of(annotation) -> Optional[type]:
+    for candidate in (annotation, *get_args(annotation)):
+        if isinstance(candidate, type) and issubclass(candidate, Enum):
+            return candidate
+    return None
+
+
+def application_fields() -> Dict[str, Dict[str, Optional[type]]]:
+    """step -> column -> answer Enum (None for free-text answers), read off the form models"""
+    from cfo_application_scoring import CFOFullApplication
+    fields = {}
+    for step in STEP_NAMES:
+        model = CFOFullApplication.model_fields[step].annotation
+        fields[step] = {name: _enum_of(field.annotation) for name, field in model.model_fields.items()}
+    return fields
+
+
+def optional_answers() -> frozenset:
+    """Questions the form lets applicants leave unanswered"""
+    from cfo_application_scoring import CFOFullApplication
+    return frozenset(
+        name
+        for step in STEP_NAMES
+        for name, field in CFOFullApplication.model_fields[step].annotation.model_fields.items()
+        if not field.is_required()
+    )
+
+
+Condition = Tuple[Tuple[str, frozenset], ...]
+
+
+class CompiledStep:
+    def __init__(self, name: str, weight: float):
+        self.name = name
+        self.weight = weight
+        self.columns: List[str] = []
+        self.gates: List[Tuple[Condition, str, Optional[str]]] = []
+        self.points: List[Tuple[str, Dict[str, int]]] = []
+        # ("length", column, thresholds, points, flag_below, flag) /
+        # ("feature", column, feature, thresholds, points, flag_below, flag) /
+        # ("flag", condition, flag, exclude), in rubric order
+        self.rules: List[tuple] = []
+
+    @staticmethod
+    def matches(condition: Condition, answers: dict) -> bool:
+        return all(answers.get(column) in values for column, values in condition)
+
+    def score(self, answers: dict) -> Dict:
+        """Step result in the shape score_stepN() has always returned"""
+        for condition, flag, reason in self.gates:
+            if self.matches(condition, answers):
+                result = {"raw_score": 0, "weighted_score": 0, "red_flags": [flag], "auto_exclude": True}
+                if reason:
+                    result["exclusion_reason"] = reason
+                return result
+
+        score = 0
+        for column, points in self.points:
+            score += points.get(answers.get(column), 0)
+
+        red_flags = []
+        auto_exclude = False
+        for rule in self.rules:
+            if rule[0] == "length":
+                _, column, thresholds, points, flag_below, flag = rule
+                length = len(answers[column].strip())
+                score += points[bisect_right(thresholds, length) - 1]
+                if flag and length < flag_below:
+                    red_flags.append(flag)
+            elif rule[0] == "feature":
+                _, column, feature, thresholds, points, flag_below, flag = rule
+                value = answer_feature(answers[column], feature)
+                score += points[bisect_right(thresholds, value) - 1]
+                if flag and value < flag_below:
+                    red_flags.append(flag)
+            else:
+                _, condition, flag, exclude = rule
+                if self.matches(condition, answers):
+                    red_flags.append(flag)
+                    auto_exclude = auto_exclude or exclude
+
+        return {
+            "raw_score": score,
+            "weighted_score": score * self.weight,
+            "red_flags": red_flags,
+            "auto_exclude": auto_exclude
+        }
+
+
+class CompiledRubric:
+    def __init__(self, document: dict, steps: Dict[str, CompiledStep], option_values: Dict[str, Tuple[str, ...]],
+                 optional_columns: frozenset, text_columns: List[str], free_flags: int, points_per_flag: int,
+                 exclusion_reason: str):
+        self.document = document
+        self.version = str(document["version"])
+        self.steps = steps
+        # (text column, feature) pairs the rules read, for batch scoring
+        self.feature_inputs = sorted({rule[1:3] for step in steps.values() for rule in step.rules if rule[0] == "feature"})
+        self.option_values = option_values
+        self.optional_columns = optional_columns
+        self.text_columns = text_columns
+        self.free_flags = free_flags
+        self.points_per_flag = points_per_flag
+        self.exclusion_reason = exclusion_reason
+
+    def score_step(self, step: str, model: BaseModel) -> Dict:
+        compiled = self.steps[step]
+        answers = {}
+        for column in compiled.columns:
+            value = getattr(model, column)
+            answers[column] = value.value if isinstance(value, Enum) else value
+        return compiled.score(answers)
+
+    def red_flag_penalty(self, red_flag_count: int) -> int:
+        return max(0, (red_flag_count - self.free_flags) * self.points_per_flag)
+
+
+def _condition(when, fields: Dict[str, Optional[type]], where: str) -> Condition:
+    if not isinstance(when, dict) or not when:
+        raise RubricError(f"{where}: 'when' must map option columns to lists of values")
+    condition = []
+    for column, values in when.items():
+        enum = fields.get(column)
+        if enum is None:
+            raise RubricError(f"{where}: '{column}' is not an option question of this step")
+        unknown = set(values) - set(enum._value2member_map_)
+        if unknown:
+            raise RubricError(f"{where}: unknown values for {column}: {sorted(unknown)}")
+        condition.append((column, frozenset(values)))
+    return tuple(condition)
+
+
+def compile_rubric(document: dict) -> CompiledRubric:
+    """Validate a rubric document against the application form and flatten it for scoring"""
+    fields = application_fields()
+    if not isinstance(document, dict) or not document.get("version"):
+        raise RubricError("Rubric needs a version")
+    weights = document.get("weights") or {}
+    steps_doc = document.get("steps") or {}
+    if sorted(steps_doc) != STEP_NAMES:
+        raise RubricError(f"Rubric must define exactly the steps {STEP_NAMES}")
+
+    steps = {}
+    for step_name in STEP_NAMES:
+        step_doc = steps_doc[step_name]
+        step_fields = fields[step_name]
+        if step_doc.get("weight") not in weights:
+            raise RubricError(f"{step_name}: weight '{step_doc.get('weight')}' is not in weights")
+        step = CompiledStep(step_name, float(weights[step_doc["weight"]]))
+
+        for i, rule in enumerate(step_doc.get("rules") or []):
+            where = f"{step_name} rule {i + 1}"
+            kind = rule.get("type")
+            if kind == "points":
+                enum = step_fields.get(rule.get("column"))
+                if enum is None:
+                    raise RubricError(f"{where}: '{rule.get('column')}' is not an option question of this step")
+                unknown = set(rule.get("points") or {}) - set(enum._value2member_map_)
+                if unknown:
+                    raise RubricError(f"{where}: unknown values for {rule['column']}: {sorted(unknown)}")
+                step.points.append((rule["column"], {value: int(points) for value, points in rule["points"].items()}))
+            elif kind == "length":
+                column = rule.get("column")
+                if column not in step_fields or step_fields[column] is not None:
+                    raise RubricError(f"{where}: '{column}' is not a text answer of this step")
+                bands = sorted((int(minimum), int(points)) for minimum, points in rule.get("bands") or [])
+                if not bands or bands[0][0] != 0:
+                    raise RubricError(f"{where}: length bands must start at 0")
+                step.rules.append((
+                    "length", column,
+                    tuple(minimum for minimum, _ in bands), tuple(points for _, points in bands),
+                    int(rule.get("flag_below") or 0), rule.get("flag")
+                ))
+            elif kind == "feature":
+                column = rule.get("column")
+                if column not in step_fields or step_fields[column] is not None:
+                    raise RubricError(f"{where}: '{column}' is not a text answer of this step")
+                if rule.get("feature") not in ANSWER_FEATURES:
+                    raise RubricError(f"{where}: feature must be one of {list(ANSWER_FEATURES)}")
+                bands = sorted((float(minimum), int(points)) for minimum, points in rule.get("bands") or [])
+                if not bands or bands[0][0] != 0:
+                    raise RubricError(f"{where}: feature bands must start at 0")
+                step.rules.append((
+                    "feature", column, rule["feature"],
+                    tuple(minimum for minimum, _ in bands), tuple(points for _, points in bands),
+                    float(rule.get("flag_below") or 0), rule.get("flag")
+                ))
+            elif kind == "flag":
+                if not rule.get("flag"):
+                    raise RubricError(f"{where}: flag rules need a flag name")
+                step.rules.append(("flag", _condition(rule.get("when"), step_fields, where), rule["flag"], bool(rule.get("exclude"))))
+            elif kind == "gate":
+                if not rule.get("flag"):
+                    raise RubricError(f"{where}: gate rules need a flag name")
+                step.gates.append((_condition(rule.get("when"), step_fields, where), rule["flag"], rule.get("reason")))
+            else:
+                raise RubricError(f"{where}: unknown rule type '{kind}'")
+
+        step.columns = list(step_fields)
+        steps[step_name] = step
+
+    penalty = document.get("penalty") or {}
+    return CompiledRubric(
+        document=document,
+        steps=steps,
+        option_values={
+            column: tuple(member.value for member in enum)
+            for step_fields in fields.values() for column, enum in step_fields.items() if enum is not None
+        },
+        optional_columns=optional_answers(),
+        text_columns=[column for step_fields in fields.values() for column, enum in step_fields.items() if enum is None],
+        free_flags=int(penalty.get("free_flags", 2)),
+        points_per_flag=int(penalty.get("points_per_flag", 5)),
+        exclusion_reason=document.get("exclusion_reason") or "ethics_or_commitment_failure"
+    )
+
+
+# =========================================================
+# Active rubric (process-wide, hot-swappable)
+# =========================================================
+
+_active: Optional[CompiledRubric] = None
+_active_source = "default"
+_checked_at = 0.0
+
+
+def get_active_rubric() -> CompiledRubric:
+    global _active
+    if _active is None:
+        _active = compile_rubric(DEFAULT_RUBRIC)
+    return _active
+
+
+def get_active_rubric_source() -> str:
+    return _active_source
+
+
+def activate_rubric(compiled: CompiledRubric, source: str = "database") -> None:
+    """Swap the rubric used by every subsequent score (compiled objects are never mutated)"""
+    global _active, _active_source, _checked_at
+    _active = compiled
+    _active_source = source
+    _checked_at = time.monotonic()
+
+
+async def load_active_rubric() -> CompiledRubric:
+    """Activate the database's active version, keeping the current rubric if there is none"""
+    import logging
+    logger = logging.getLogger(__name__)
+    global _checked_at
+    try:
+        supabase = await get_async_supabase_client()
+        response = await supabase.table("scoring_rubrics")\
+            .select("version, rubric")\
+            .eq("is_active", True)\
+            .limit(1)\
+            .execute()
+        if response.data:
+            row = response.data[0]
+            if row["version"] != get_active_rubric().version:
+                activate_rubric(compile_rubric(row["rubric"]))
+                logger.info(f"Scoring rubric {row['version']} activated")
+    except Exception as e:
+        logger.error(f"Could not load the active scoring rubric, keeping {get_active_rubric().version}: {e}")
+    _checked_at = time.monotonic()
+    return get_active_rubric()
+
+
+async def refresh_active_rubric() -> CompiledRubric:
+    """Cheap staleness check before scoring: reloads at most every RUBRIC_REFRESH_SECONDS"""
+    if time.monotonic() - _checked_at >= RUBRIC_REFRESH_SECONDS:
+        return await load_active_rubric()
+    return get_active_rubric()
+
@@ -0,0 +1,227 @@
+"""
+What-if simulator for scoring rubric changes.
+
+Each competition's cohort is loaded once into a columnar snapshot (option
+codes, text lengths and a precomputed tie-break order) and kept for
+SIMULATOR_SNAPSHOT_TTL_SECONDS. A simulation re-scores the snapshot twice
+with cfo_batch_scoring.score_columns(), once with the active rubric and once
+with the candidate, and compares ranks, bands and score distributions. No
+Supabase round trip is made while the snapshot is warm.
+"""
+
+import asyncio
+import copy
+import os
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from cfo_application_scoring import QUALIFIED_LIMIT, RESERVE_LIMIT
+from cfo_batch_scoring import answer_columns, is_scorable, load_applications, score_columns
+from scoring_rubric import CompiledRubric, RubricError, compile_rubric, get_active_rubric
+
+SIMULATOR_SNAPSHOT_TTL_SECONDS = int(os.getenv("SIMULATOR_SNAPSHOT_TTL_SECONDS", "300"))
+
+BANDS = ["qualified", "reserve", "not_selected", "excluded"]
+QUALIFIED, RESERVE, NOT_SELECTED, EXCLUDED = range(4)
+
+
+class CohortSnapshot:
+    def __init__(self, competition_id: str, rows: List[dict], rubric: CompiledRubric):
+        self.competition_id = competition_id
+        self.loaded_at = time.monotonic()
+        self.ids = [row["id"] for row in rows]
+        self.user_ids = [row.get("user_id") for row in rows]
+        self.columns = answer_columns(rows, rubric)
+        # Position of each row in (submitted_at, id) order - the last rank_key tie-breakers
+        order = sorted(range(len(rows)), key=lambda i: (
+            rows[i].get("submitted_at") is None, rows[i].get("submitted_at") or "", str(rows[i]["id"])
+        ))
+        self.tiebreak = np.empty(len(rows), dtype=np.int64)
+        self.tiebreak[order] = np.arange(len(rows))
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    @property
+    def age_seconds(self) -> float:
+        return time.monotonic() - self.loaded_at
+
+    def usable(self, rubric: CompiledRubric) -> bool:
+        """Fresh, and holding every text feature the rubric reads"""
+        return (
+            self.age_seconds < SIMULATOR_SNAPSHOT_TTL_SECONDS and
+            all(key in self.columns["features"] for key in rubric.feature_inputs)
+        )
+
+
+_snapshots: Dict[str, CohortSnapshot] = {}
+_snapshot_locks: Dict[str, asyncio.Lock] = {}
+
+
+async def get_cohort_snapshot(competition_id: str, refresh: bool = False) -> CohortSnapshot:
+    """Cached snapshot of a competition's scorable applications (loaded at most once per TTL)"""
+    rubric = get_active_rubric()
+    snapshot = _snapshots.get(competition_id)
+    if snapshot is not None and not refresh and snapshot.usable(rubric):
+        return snapshot
+
+    lock = _snapshot_locks.setdefault(competition_id, asyncio.Lock())
+    async with lock:
+        snapshot = _snapshots.get(competition_id)
+        if snapshot is not None and not refresh and snapshot.usable(rubric):
+            return snapshot
+        columns = ["id", "user_id", "submitted_at"] + list(rubric.option_values) + rubric.text_columns
+        rows = await load_applications(columns, competition_id)
+        snapshot = CohortSnapshot(competition_id, [row for row in rows if is_scorable(row, rubric)], rubric)
+        _snapshots[competition_id] = snapshot
+        return snapshot
+
+
+def invalidate_cohort_snapshot(competition_id: Optional[str] = None) -> None:
+    if competition_id is None:
+        _snapshots.clear()
+    else:
+        _snapshots.pop(competition_id, None)
+
+
+def candidate_rubric(base: CompiledRubric, weights: Dict[str, float], points: Dict[str, Dict[str, int]]) -> CompiledRubric:
+    """The base rubric with weight and per-option point overrides applied"""
+    document = copy.deepcopy(base.document)
+    document["version"] = f"{base.version}+what-if"
+
+    unknown = set(weights) - set(document["weights"])
+    if unknown:
+        raise RubricError(f"Unknown weights: {sorted(unknown)}")
+    document["weights"].update(weights)
+
+    for column, overrides in points.items():
+        rules = [
+            rule for step in document["steps"].values() for rule in step["rules"]
+            if rule.get("type") == "points" and rule.get("column") == column
+        ]
+        if not rules:
+            raise RubricError(f"'{column}' has no points rule to override")
+        for rule in rules:
+            rule["points"].update(overrides)
+
+    return compile_rubric(document)
+
+
+def _ranks(result: dict, motivation_length: np.ndarray, tiebreak: np.ndarray) -> np.ndarray:
+    """1-based rank among non-excluded rows in rank_key order (score, leadership, ethics,
+    capital, motivation length - all DESC, cents as stored - then submission order), 0 for excluded"""
+    def desc(values: np.ndarray) -> np.ndarray:
+        return -np.round(values * 100)
+
+    sections = result["sections"]
+    excluded = result["auto_exclude"]
+    order = np.lexsort((
+        tiebreak, -motivation_length,
+        desc(sections["step2"]), desc(sections["step4"]), desc(sections["step1"]),
+        desc(result["final_score"]), excluded
+    ))
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = np.arange(1, len(order) + 1)
+    ranks[excluded] = 0
+    return ranks
+
+
+def _bands(ranks: np.ndarray, excluded: np.ndarray) -> np.ndarray:
+    return np.select(
+        [excluded, ranks <= QUALIFIED_LIMIT, ranks <= RESERVE_LIMIT],
+        [EXCLUDED, QUALIFIED, RESERVE],
+        default=NOT_SELECTED
+    )
+
+
+def _cutoff(final_score: np.ndarray, ranks: np.ndarray, rank: int) -> Optional[float]:
+    at = np.flatnonzero(ranks == rank)
+    return round(float(final_score[at[0]]), 2) if at.size else None
+
+
+def simulate(snapshot: CohortSnapshot, baseline: CompiledRubric, candidate: CompiledRubric,
+             bins: int = 20, movers_limit: int = 25) -> dict:
+    """Compare the cohort's ranks, bands and score histogram under two rubrics"""
+    started = time.perf_counter()
+    base = score_columns(snapshot.columns, baseline)
+    cand = score_columns(snapshot.columns, candidate)
+
+    base_score, cand_score = base["final_score"], cand["final_score"]
+    motivation_length = snapshot.columns["lengths"]["why_top_100"]
+    base_ranks = _ranks(base, motivation_length, snapshot.tiebreak)
+    cand_ranks = _ranks(cand, motivation_length, snapshot.tiebreak)
+    base_bands = _bands(base_ranks, base["auto_exclude"])
+    cand_bands = _bands(cand_ranks, cand["auto_exclude"])
+
+    def describe(indices) -> List[dict]:
+        return [
+            {
+                "application_id": snapshot.ids[i],
+                "user_id": snapshot.user_ids[i],
+                "baseline_rank": int(base_ranks[i]) or None,
+                "candidate_rank": int(cand_ranks[i]) or None,
+                "baseline_score": round(float(base_score[i]), 2),
+                "candidate_score": round(float(cand_score[i]), 2),
+                "baseline_band": BANDS[base_bands[i]],
+                "candidate_band": BANDS[cand_bands[i]]
+            }
+            for i in indices
+        ]
+
+    transitions = np.bincount(base_bands * len(BANDS) + cand_bands, minlength=len(BANDS) ** 2).reshape(len(BANDS), len(BANDS))
+
+    band_changes = {}
+    for band in (QUALIFIED, RESERVE):
+        entrants = np.flatnonzero((cand_bands == band) & (base_bands != band))
+        dropouts = np.flatnonzero((base_bands == band) & (cand_bands != band))
+        band_changes[BANDS[band]] = {
+            "baseline_count": int((base_bands == band).sum()),
+            "candidate_count": int((cand_bands == band).sum()),
+            "entrants": describe(entrants[np.argsort(cand_ranks[entrants])]),
+            "dropouts": describe(dropouts[np.argsort(base_ranks[dropouts])])
+        }
+
+    # Positive delta = moved up the ranking
+    ranked_both = np.flatnonzero((base_ranks > 0) & (cand_ranks > 0))
+    deltas = base_ranks[ranked_both] - cand_ranks[ranked_both]
+    by_delta = ranked_both[np.argsort(-deltas, kind="stable")]
+    rank_deltas = {
+        "ranked_in_both": int(ranked_both.size),
+        "moved": int(np.count_nonzero(deltas)),
+        "mean_abs_delta": round(float(np.abs(deltas).mean()), 2) if deltas.size else 0.0,
+        "max_up": int(deltas.max()) if deltas.size else 0,
+        "max_down": int(-deltas.min()) if deltas.size else 0,
+        "top_risers": describe([i for i in by_delta[:movers_limit] if base_ranks[i] > cand_ranks[i]]),
+        "top_fallers": describe([i for i in by_delta[::-1][:movers_limit] if base_ranks[i] < cand_ranks[i]])
+    }
+
+    edges = np.histogram_bin_edges(np.concatenate([base_score, cand_score]), bins=bins) if snapshot.size else np.array([0.0, 1.0])
+    base_hist = np.histogram(base_score, bins=edges)[0]
+    cand_hist = np.histogram(cand_score, bins=edges)[0]
+
+    return {
+        "competition_id": snapshot.competition_id,
+        "cohort_size": snapshot.size,
+        "snapshot_age_seconds": round(snapshot.age_seconds, 1),
+        "baseline_version": baseline.version,
+        "candidate_version": candidate.version,
+        "bands": band_changes,
+        "band_transitions": {
+            BANDS[a]: {BANDS[b]: int(transitions[a, b]) for b in range(len(BANDS))} for a in range(len(BANDS))
+        },
+        "cutoffs": {
+            "qualified": {"baseline": _cutoff(base_score, base_ranks, QUALIFIED_LIMIT), "candidate": _cutoff(cand_score, cand_ranks, QUALIFIED_LIMIT)},
+            "reserve": {"baseline": _cutoff(base_score, base_ranks, RESERVE_LIMIT), "candidate": _cutoff(cand_score, cand_ranks, RESERVE_LIMIT)}
+        },
+        "rank_deltas": rank_deltas,
+        "histogram": {
+            "edges": [round(float(edge), 2) for edge in edges],
+            "baseline": base_hist.tolist(),
+            "candidate": cand_hist.tolist(),
+            "shift": (cand_hist - base_hist).tolist()
+        },
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
@@ -17,10 +17,13 @@ if not _SUPABASE_URL:
 if not _SUPABASE_SERVICE_KEY:
     raise RuntimeError("STARTUP FAILED: SUPABASE_SERVICE_ROLE_KEY environment variable is missing")
 
-from supabase_client import get_supabase_client
+from supabase_client import get_async_supabase_client, close_storage_client
+from ranking_index import start_ranking_index_rebuild
+from application_finalization import start_finalization_scheduler, stop_finalization_scheduler
+from scoring_rubric import load_active_rubric
 from cfo_competition import router as cfo_router
 from admin_router import router as admin_router
-from chat_service import router as chat_router
+from chat_service import router as chat_router, NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER
 from socketio_server import socket_app
 
 app = FastAPI(title="ModEX Platform")
@@ -31,6 +34,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Chat history page cursors
+    expose_headers=[NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER],
 )
 
 app.mount("/socket.io", socket_app)
@@ -40,8 +45,8 @@ api_router = APIRouter(prefix="/api")
 @api_router.get("/health")
 async def health_check():
     try:
-        supabase = get_supabase_client()
-        supabase.table('user_profiles').select('id').limit(1).execute()
+        supabase = await get_async_supabase_client()
+        await supabase.table('user_profiles').select('id').limit(1).execute()
         return {"status": "healthy", "database": "connected"}
     except Exception as e:
         return {"status": "unhealthy", "error": str(e)}
@@ -57,7 +62,14 @@ logger = logging.getLogger(__name__)
 @app.on_event("startup")
 async def startup_event():
     logger.info("ModEX Backend started on port 8000")
+    await load_active_rubric()
+    # Ranks are served from memory; load them without holding up startup
+    start_ranking_index_rebuild()
+    # Final statuses are written once a competition's applications close
+    start_finalization_scheduler()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Application shutting down")
+    stop_finalization_scheduler()
+    await close_storage_client()
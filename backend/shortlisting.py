@@ -0,0 +1,100 @@
+"""
+Competition shortlisting: write the final determine_status() bands.
+
+Applications are streamed from cfo_applications in keyset pages of the
+indexed rank_key, i.e. already in ranking order, so the top-K selection is a
+bounded take: each row's band is determine_status() of its rank, and reading
+stops at the first row outside qualified / reserve (auto-excluded keys sort
+after every ranked one).
+Memory and reads stay O(RESERVE_LIMIT) however many people applied. All
+statuses, including not_selected / excluded for everyone else, are then
+emitted in one apply_cfo_shortlist() call.
+"""
+
+from typing import Dict, List, Optional
+
+from supabase_client import get_async_supabase_client
+from cfo_application_scoring import determine_status
+
+SHORTLIST_PAGE_SIZE = 200
+
+# Statuses the shortlist may replace; reviewer decisions and admin overrides are kept
+SHORTLIST_STATUSES = ["submitted", "pending", "qualified", "reserve", "not_selected", "excluded"]
+
+
+async def select_shortlist(competition_id: str) -> dict:
+    """The qualified and reserve rows, in rank order, read page by page"""
+    supabase = await get_async_supabase_client()
+    bands: Dict[str, List[dict]] = {"qualified": [], "reserve": []}
+    ranked = 0
+    cursor: Optional[str] = None
+    pages = 0
+    rows_read = 0
+    while True:
+        query = supabase.table("cfo_applications")\
+            .select("id, user_id, total_score, rank_key, auto_excluded")\
+            .eq("competition_id", competition_id)
+        if cursor is not None:
+            query = query.gt("rank_key", cursor)
+        response = await query.order("rank_key").limit(SHORTLIST_PAGE_SIZE).execute()
+        page = response.data or []
+        pages += 1
+        rows_read += len(page)
+
+        exhausted = len(page) < SHORTLIST_PAGE_SIZE
+        for row in page:
+            ranked += 1
+            band = bands.get(determine_status(ranked, bool(row.get("auto_excluded"))))
+            if band is None:
+                exhausted = True
+                break
+            band.append(row)
+        if exhausted:
+            break
+        cursor = page[-1]["rank_key"]
+
+    return {
+        "qualified": bands["qualified"],
+        "reserve": bands["reserve"],
+        "pages_read": pages,
+        "rows_read": rows_read
+    }
+
+
+def _band_summary(rows: List[dict]) -> dict:
+    return {
+        "count": len(rows),
+        "application_ids": [row["id"] for row in rows],
+        "min_score": rows[-1].get("total_score") if rows else None
+    }
+
+
+async def write_shortlist(competition_id: str, qualified_ids: List[str], reserve_ids: List[str]) -> dict:
+    """Every application's status in one apply_cfo_shortlist() call; returns the changed counts"""
+    supabase = await get_async_supabase_client()
+    response = await supabase.rpc("apply_cfo_shortlist", {
+        "p_competition_id": competition_id,
+        "p_qualified": qualified_ids,
+        "p_reserve": reserve_ids,
+        "p_replaceable": SHORTLIST_STATUSES
+    }).execute()
+    return response.data
+
+
+async def shortlist_competition(competition_id: str, dry_run: bool = False) -> dict:
+    """Select the bands and (unless dry_run) write every application's status in one RPC"""
+    selection = await select_shortlist(competition_id)
+    result = {
+        "competition_id": competition_id,
+        "qualified": _band_summary(selection["qualified"]),
+        "reserve": _band_summary(selection["reserve"]),
+        "pages_read": selection["pages_read"],
+        "rows_read": selection["rows_read"],
+        "dry_run": dry_run,
+        "changed": None
+    }
+    if not dry_run:
+        result["changed"] = await write_shortlist(
+            competition_id, result["qualified"]["application_ids"], result["reserve"]["application_ids"]
+        )
+    return result
@@ -1,6 +1,6 @@
 import socketio
 from typing import Dict, Set
-from supabase_client import get_supabase_client
+from auth import decode_supabase_jwt
 
 sio = socketio.AsyncServer(
     async_mode='asgi',
@@ -12,12 +12,11 @@ sio = socketio.AsyncServer(
 active_users: Dict[str, Set[str]] = {}
 typing_users: Dict[str, Dict[str, str]] = {}
 
-def verify_token(token: str):
+async def verify_token(token: str):
     try:
-        supabase = get_supabase_client()
-        user_response = supabase.auth.get_user(token)
-        if user_response and user_response.user:
-            return user_response.user.email
+        identity = await decode_supabase_jwt(token)
+        if identity:
+            return identity["email"]
         return None
     except:
         return None
@@ -30,7 +29,7 @@ async def connect(sid, environ, auth):
         print(f"Rejected connection: No token provided")
         return False
 
-    email = verify_token(auth['token'])
+    email = await verify_token(auth['token'])
     if not email:
         print(f"Rejected connection: Invalid token")
         return False
@@ -1,16 +1,121 @@
 import os
+import asyncio
+import httpx
 from typing import Optional
-from supabase import create_client, Client
+from supabase import create_client, create_async_client, Client, AsyncClient
+from storage3 import AsyncStorageClient
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
+# Storage connection pool (CV uploads/downloads)
+STORAGE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_STORAGE_MAX_CONNECTIONS", "20"))
+STORAGE_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("SUPABASE_STORAGE_MAX_KEEPALIVE_CONNECTIONS", "10"))
+STORAGE_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("SUPABASE_STORAGE_KEEPALIVE_EXPIRY_SECONDS", "120"))
+STORAGE_TIMEOUT_SECONDS = int(os.getenv("SUPABASE_STORAGE_TIMEOUT_SECONDS", "30"))
+
 _supabase_client: Optional[Client] = None
+_async_supabase_client: Optional[AsyncClient] = None
+_async_client_lock = asyncio.Lock()
+_storage_client: Optional["PooledStorageClient"] = None
+_storage_client_lock = asyncio.Lock()
 
 def get_supabase_client() -> Client:
+    """Blocking client - for scripts and code that runs outside the event loop"""
     global _supabase_client
     if _supabase_client is None:
         if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
             raise RuntimeError("Supabase environment variables missing: SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY required")
         _supabase_client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
     return _supabase_client
+
+async def get_async_supabase_client() -> AsyncClient:
+    """
+    Shared async client (PostgREST, GoTrue, storage) for request handlers.
+    Every call must be awaited, so a slow round trip never blocks the event loop.
+    """
+    global _async_supabase_client
+    if _async_supabase_client is None:
+        async with _async_client_lock:
+            if _async_supabase_client is None:
+                if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
+                    raise RuntimeError("Supabase environment variables missing: SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY required")
+                _async_supabase_client = await create_async_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+    return _async_supabase_client
+
+
+class PooledStorageClient(AsyncStorageClient):
+    """Service-role storage client on one long-lived HTTP/2 keep-alive pool"""
+
+    def _create_session(self, base_url, headers, timeout, verify=True, proxy=None) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            proxy=proxy,
+            verify=bool(verify),
+            follow_redirects=True,
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=STORAGE_MAX_CONNECTIONS,
+                max_keepalive_connections=STORAGE_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=STORAGE_KEEPALIVE_EXPIRY_SECONDS
+            )
+        )
+
+async def get_storage_client() -> PooledStorageClient:
+    """
+    Shared service-role storage client. The service role key bypasses RLS on
+    private buckets; the pool is reused across requests instead of opening a
+    new TLS connection per upload/download.
+    """
+    global _storage_client
+    if _storage_client is None:
+        async with _storage_client_lock:
+            if _storage_client is None:
+                if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
+                    raise RuntimeError("Supabase environment variables missing: SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY required")
+                _storage_client = PooledStorageClient(
+                    f"{SUPABASE_URL.rstrip('/')}/storage/v1/",
+                    {
+                        "apiKey": SUPABASE_SERVICE_ROLE_KEY,
+                        "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}"
+                    },
+                    timeout=STORAGE_TIMEOUT_SECONDS
+                )
+    return _storage_client
+
+def get_storage_pool_stats() -> dict:
+    """Snapshot of the storage connection pool"""
+    stats = {
+        "initialized": _storage_client is not None,
+        "max_connections": STORAGE_MAX_CONNECTIONS,
+        "max_keepalive_connections": STORAGE_MAX_KEEPALIVE_CONNECTIONS,
+        "keepalive_expiry_seconds": STORAGE_KEEPALIVE_EXPIRY_SECONDS,
+        "connections": 0,
+        "http2_connections": 0,
+        "idle_connections": 0,
+        "active_connections": 0,
+        "queued_requests": 0
+    }
+    if _storage_client is None:
+        return stats
+
+    # httpx does not expose pool state publicly; read it from the httpcore pool
+    pool = getattr(_storage_client.session._transport, "_pool", None)
+    if pool is None:
+        return stats
+
+    connections = list(pool.connections)
+    stats["connections"] = len(connections)
+    stats["http2_connections"] = len([c for c in connections if c.info().startswith("HTTP/2")])
+    stats["idle_connections"] = len([c for c in connections if c.is_idle()])
+    stats["active_connections"] = stats["connections"] - stats["idle_connections"]
+    stats["queued_requests"] = len([r for r in getattr(pool, "_requests", []) if r.connection is None])
+    return stats
+
+async def close_storage_client() -> None:
+    global _storage_client
+    if _storage_client is not None:
+        await _storage_client.aclose()
+        _storage_client = None
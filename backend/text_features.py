@@ -0,0 +1,200 @@
+"""
+Text features for free-text CFO application answers.
+
+Per answer (cohort-independent, usable as rubric inputs):
+  vocabulary_richness  distinct words / words
+  keyword_coverage     share of FINANCE_KEYWORD_GROUPS the answer touches
+  repetition_ratio     share of word trigrams repeating an earlier trigram
+
+Per cohort (relative to the other answers passed in):
+  distinctiveness      mean IDF of the answer's words, scaled to [0, 1]
+
+Words are runs of Unicode letters and digits, so Arabic answers are scored
+like Latin ones (keyword_coverage only knows the English finance keywords).
+Answers without any word score 0 on every feature.
+
+Answers are tokenised once into hashed term ids; every feature is then
+computed over flat NumPy arrays for the whole batch. Results are cached by
+answer hash (TEXT_FEATURE_CACHE_SIZE entries), and large batches of uncached
+answers are split across a process pool.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from multiprocessing import get_context
+from typing import Dict, List, Optional, Tuple
+
+import mmh3
+import numpy as np
+from cachetools import LRUCache
+
+ANSWER_FEATURES = ("vocabulary_richness", "keyword_coverage", "repetition_ratio")
+COHORT_FEATURES = ("distinctiveness",)
+FEATURE_NAMES = ANSWER_FEATURES + COHORT_FEATURES
+
+FINANCE_KEYWORD_GROUPS = {
+    "liquidity": ["cash", "cashflow", "liquidity", "runway", "receivables", "payables", "inventory", "collections"],
+    "profitability": ["profit", "profits", "profitability", "margin", "margins", "ebitda", "ebit", "revenue", "revenues", "earnings"],
+    "leverage": ["debt", "dscr", "leverage", "covenant", "covenants", "interest", "loan", "loans", "refinance", "refinancing", "lenders"],
+    "investment": ["capex", "roi", "irr", "npv", "payback", "investment", "investments", "returns", "hurdle", "allocation"],
+    "risk": ["risk", "risks", "hedge", "hedging", "scenario", "scenarios", "sensitivity", "downside", "stress"],
+    "planning": ["budget", "budgets", "forecast", "forecasts", "forecasting", "kpi", "kpis", "metric", "metrics", "variance"],
+    "governance": ["audit", "auditor", "auditors", "compliance", "controls", "governance", "board", "disclosure", "ethics", "transparency"],
+    "stakeholders": ["shareholders", "investors", "stakeholders", "valuation", "equity", "dividend", "dividends"]
+}
+_KEYWORD_GROUP = {word: i for i, words in enumerate(FINANCE_KEYWORD_GROUPS.values()) for word in words}
+
+TEXT_FEATURE_CACHE_SIZE = int(os.getenv("TEXT_FEATURE_CACHE_SIZE", "100000"))
+TEXT_FEATURE_WORKERS = int(os.getenv("TEXT_FEATURE_WORKERS", str(os.cpu_count() or 1)))
+PARALLEL_MIN_ANSWERS = 20000
+CHUNK_SIZE = 10000  # answers per extraction batch (and per pool task)
+TERM_BITS = 20  # hashed vocabulary for IDF; collisions only blur rare-word weights
+_KEY_BITS = 40
+
+_WORD = re.compile(r"[^\W_]+")
+_TRIGRAM_MIX = (np.uint64(0x9E3779B97F4A7C15), np.uint64(0xC2B2AE3D27D4EB4F), np.uint64(0x165667B19E3779F9))
+
+# answer hash -> (distinct hashed terms, their counts, ANSWER_FEATURES values)
+_cache: LRUCache = LRUCache(maxsize=TEXT_FEATURE_CACHE_SIZE)
+_lock = threading.Lock()
+
+
+def answer_hash(text: Optional[str]) -> str:
+    return hashlib.blake2b((text or "").strip().encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _sorted_unique(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Distinct values and their counts (a plain sort: faster than np.unique for large int arrays)"""
+    if not values.size:
+        return values, np.zeros(0, dtype=np.int64)
+    values = np.sort(values)
+    starts = np.flatnonzero(np.concatenate([[True], values[1:] != values[:-1]]))
+    return values[starts], np.diff(np.append(starts, values.size))
+
+
+def _distinct_per_doc(doc: np.ndarray, key: np.ndarray, n: int) -> np.ndarray:
+    """Number of distinct keys (< 2^40) per document"""
+    distinct, _ = _sorted_unique((doc.astype(np.int64) << _KEY_BITS) | key.astype(np.int64))
+    return np.bincount(distinct >> _KEY_BITS, minlength=n)
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    return np.divide(numerator, denominator, out=np.zeros(len(numerator)), where=denominator > 0)
+
+
+def _extract_chunk(texts: List[Optional[str]]) -> List[tuple]:
+    """Cache entries for a list of answers (runs in pool workers for large batches)"""
+    n = len(texts)
+    words = [_WORD.findall((text or "").lower()) for text in texts]
+    lengths = np.fromiter(map(len, words), dtype=np.int64, count=n)
+    flat = list(chain.from_iterable(words))
+
+    # Chunk-local vocabulary: each distinct word is hashed and looked up once
+    vocab = {word: i for i, word in enumerate(dict.fromkeys(flat))}
+    ids = np.fromiter(map(vocab.__getitem__, flat), dtype=np.int64, count=len(flat))
+    vocab_terms = np.fromiter((mmh3.hash(word, signed=False) >> (32 - TERM_BITS) for word in vocab), dtype=np.int64, count=len(vocab))
+    vocab_groups = np.fromiter((_KEYWORD_GROUP.get(word, -1) for word in vocab), dtype=np.int64, count=len(vocab))
+    doc = np.repeat(np.arange(n), lengths)
+
+    richness = _ratio(_distinct_per_doc(doc, ids, n), lengths)
+
+    groups = vocab_groups[ids]
+    keyword = groups >= 0
+    coverage = _distinct_per_doc(doc[keyword], groups[keyword], n) / len(FINANCE_KEYWORD_GROUPS)
+
+    # Trigrams that do not cross answer boundaries, mixed into 40-bit keys
+    within = doc[:-2] == doc[2:]
+    a, b, c = (ids[i:len(ids) - 2 + i][within].astype(np.uint64) for i in range(3))
+    mixed = (a * _TRIGRAM_MIX[0]) ^ (b * _TRIGRAM_MIX[1]) ^ (c * _TRIGRAM_MIX[2])
+    trigram_doc = doc[:-2][within]
+    trigrams = np.bincount(trigram_doc, minlength=n)
+    distinct_trigrams = _distinct_per_doc(trigram_doc, mixed >> np.uint64(64 - _KEY_BITS), n)
+    repetition = _ratio(trigrams - distinct_trigrams, trigrams)
+
+    # Term counts per answer, for cohort IDF
+    term_keys, term_counts = _sorted_unique((doc << TERM_BITS) | vocab_terms[ids])
+    splits = np.searchsorted(term_keys >> TERM_BITS, np.arange(1, n))
+    terms = np.split((term_keys & ((1 << TERM_BITS) - 1)).astype(np.int32), splits)
+    counts = np.split(term_counts.astype(np.int32), splits)
+
+    features = np.column_stack([richness, coverage, repetition]).tolist()
+    return [(terms[i], counts[i], tuple(features[i])) for i in range(n)]
+
+
+def _entries(texts: List[Optional[str]], workers: Optional[int] = None) -> List[tuple]:
+    """Cached (terms, counts, features) per answer, extracting the misses"""
+    keys = [answer_hash(text) for text in texts]
+    with _lock:
+        found = {key: _cache[key] for key in set(keys) if key in _cache}
+
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in found:
+            missing.setdefault(key, text)
+    if missing:
+        missing_texts = list(missing.values())
+        chunks = [missing_texts[i:i + CHUNK_SIZE] for i in range(0, len(missing_texts), CHUNK_SIZE)]
+        workers = TEXT_FEATURE_WORKERS if workers is None else workers
+        if workers > 1 and len(missing_texts) >= PARALLEL_MIN_ANSWERS:
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=get_context("spawn")) as pool:
+                results = list(pool.map(_extract_chunk, chunks))
+        else:
+            results = [_extract_chunk(chunk) for chunk in chunks]
+
+        with _lock:
+            for key, entry in zip(missing, chain.from_iterable(results)):
+                found[key] = _cache[key] = entry
+
+    return [found[key] for key in keys]
+
+
+def answer_features(texts: List[Optional[str]], workers: Optional[int] = None) -> np.ndarray:
+    """(len(texts), len(ANSWER_FEATURES)) array of per-answer features"""
+    return np.array([entry[2] for entry in _entries(texts, workers)], dtype=np.float64).reshape(len(texts), len(ANSWER_FEATURES))
+
+
+def answer_feature(text: Optional[str], feature: str) -> float:
+    """One per-answer feature of one answer (the scalar scoring path)"""
+    return float(answer_features([text])[0, ANSWER_FEATURES.index(feature)])
+
+
+def cohort_features(texts: List[Optional[str]], workers: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Every feature in FEATURE_NAMES for a cohort of answers to the same question"""
+    n = len(texts)
+    entries = _entries(texts, workers)
+    features = np.array([entry[2] for entry in entries], dtype=np.float64).reshape(n, len(ANSWER_FEATURES))
+    result = {name: features[:, i] for i, name in enumerate(ANSWER_FEATURES)}
+
+    sizes = np.fromiter((entry[0].size for entry in entries), dtype=np.int64, count=n)
+    terms = np.concatenate([entry[0] for entry in entries] + [np.zeros(0, dtype=np.int32)])
+    counts = np.concatenate([entry[1] for entry in entries] + [np.zeros(0, dtype=np.int32)])
+    doc = np.repeat(np.arange(n), sizes)
+
+    # Each answer's distinct terms are stored once, so this is document frequency
+    df = np.bincount(terms, minlength=1 << TERM_BITS)
+    idf = np.log((1 + n) / (1 + df)) + 1
+    max_idf = np.log((1 + n) / 2) + 1
+    weighted = np.bincount(doc, weights=counts * idf[terms] / max_idf, minlength=n)
+    result["distinctiveness"] = _ratio(weighted, np.bincount(doc, weights=counts, minlength=n))
+    return result
+
+
+def feature_summary(values: np.ndarray) -> dict:
+    if not values.size:
+        return {"mean": None, "p10": None, "median": None, "p90": None}
+    p10, median, p90 = np.percentile(values, [10, 50, 90])
+    return {
+        "mean": round(float(values.mean()), 4),
+        "p10": round(float(p10), 4),
+        "median": round(float(median), 4),
+        "p90": round(float(p90), 4)
+    }
+
+
+def clear_text_feature_cache() -> None:
+    with _lock:
+        _cache.clear()
@@ -18,6 +18,7 @@ function CFOApplicationsList() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [filter, setFilter] = useState('all');
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     loadApplications();
@@ -41,6 +42,25 @@ function CFOApplicationsList() {
     }
   };
 
+  const loadMore = async () => {
+    if (!data?.next_cursor) return;
+    setLoadingMore(true);
+    try {
+      const response = await axios.get(
+        `${API_URL}/api/admin/competitions/${competitionId}/cfo-applications`,
+        { params: { cursor: data.next_cursor } }
+      );
+      setData((prev) => ({
+        ...response.data,
+        applications: [...prev.applications, ...response.data.applications],
+      }));
+    } catch (err) {
+      console.error('Failed to load more applications:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const getStatusBadge = (status) => {
     const styles = {
       qualified: 'bg-green-100 text-green-800',
@@ -212,6 +232,17 @@ function CFOApplicationsList() {
                 ))}
               </tbody>
             </table>
+            {data?.next_cursor && (
+              <div className="p-4 border-t border-gray-200 text-center">
+                <button
+                  onClick={loadMore}
+                  disabled={loadingMore}
+                  className="px-4 py-2 bg-modex-secondary/10 text-modex-secondary rounded-lg hover:bg-modex-secondary hover:text-white transition-colors text-sm font-semibold disabled:opacity-50"
+                >
+                  {loadingMore ? 'Loading...' : `Load more (${data.applications.length} of ${data.total_count})`}
+                </button>
+              </div>
+            )}
           </div>
         )}
       </div>
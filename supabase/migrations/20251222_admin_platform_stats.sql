@@ -0,0 +1,29 @@
+-- Admin dashboard statistics in a single round trip
+-- Run this in Supabase SQL Editor
+
+CREATE OR REPLACE FUNCTION admin_platform_stats()
+RETURNS JSON
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT json_build_object(
+    'total_users', (SELECT COUNT(*) FROM user_profiles),
+    'users_by_role', (
+      SELECT COALESCE(json_object_agg(role, n), '{}'::json)
+      FROM (SELECT role, COUNT(*) AS n FROM user_profiles GROUP BY role) r
+    ),
+    'total_competitions', (SELECT COUNT(*) FROM competitions),
+    'competitions_by_status', (
+      SELECT COALESCE(json_object_agg(status, n), '{}'::json)
+      FROM (SELECT status, COUNT(*) AS n FROM competitions GROUP BY status) c
+    ),
+    'total_teams', (SELECT COUNT(*) FROM teams),
+    'total_applications', (SELECT COUNT(*) FROM cfo_applications),
+    'applications_by_status', (
+      SELECT COALESCE(json_object_agg(status, n), '{}'::json)
+      FROM (SELECT status, COUNT(*) AS n FROM cfo_applications GROUP BY status) a
+    )
+  );
+$$;
+
+GRANT EXECUTE ON FUNCTION admin_platform_stats() TO service_role;
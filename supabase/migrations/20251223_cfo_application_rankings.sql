@@ -0,0 +1,71 @@
+-- Server-side ranking for CFO applications
+-- Run this in Supabase SQL Editor
+--
+-- rank:         1..n among non-excluded applications of a competition
+--               (total_score DESC, earliest submission first)
+-- position:     unique, gap-free keyset cursor per competition
+--               (ranked applications first, excluded ones last)
+-- final_status: determine_status() bands - qualified <= 100 < reserve <= 150
+
+CREATE OR REPLACE VIEW cfo_application_rankings AS
+SELECT
+  ranked.*,
+  CASE
+    WHEN ranked.auto_excluded THEN 'excluded'
+    WHEN ranked.rank <= 100 THEN 'qualified'
+    WHEN ranked.rank <= 150 THEN 'reserve'
+    ELSE 'not_selected'
+  END AS final_status
+FROM (
+  SELECT
+    a.*,
+    p.full_name,
+    p.email,
+    CASE WHEN COALESCE(a.auto_excluded, FALSE) THEN NULL
+         ELSE ROW_NUMBER() OVER (
+           PARTITION BY a.competition_id, COALESCE(a.auto_excluded, FALSE)
+           ORDER BY a.total_score DESC, a.submitted_at ASC, a.id ASC
+         )
+    END AS rank,
+    ROW_NUMBER() OVER (
+      PARTITION BY a.competition_id
+      ORDER BY COALESCE(a.auto_excluded, FALSE), a.total_score DESC, a.submitted_at ASC, a.id ASC
+    ) AS position
+  FROM cfo_applications a
+  LEFT JOIN user_profiles p ON p.id = a.user_id
+) ranked;
+
+GRANT SELECT ON cfo_application_rankings TO service_role;
+
+-- Band and status counts for one competition, returned separately from pages
+CREATE OR REPLACE FUNCTION cfo_application_counts(p_competition_id UUID)
+RETURNS JSON
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT json_build_object(
+    'total', COUNT(*),
+    'qualified', COUNT(*) FILTER (WHERE final_status = 'qualified'),
+    'reserve', COUNT(*) FILTER (WHERE final_status = 'reserve'),
+    'not_selected', COUNT(*) FILTER (WHERE final_status = 'not_selected'),
+    'excluded', COUNT(*) FILTER (WHERE final_status = 'excluded'),
+    'with_red_flags', COUNT(*) FILTER (WHERE red_flag_count > 0),
+    'by_status', (
+      SELECT COALESCE(json_object_agg(status, n), '{}'::json)
+      FROM (
+        SELECT status, COUNT(*) AS n
+        FROM cfo_applications
+        WHERE competition_id = p_competition_id
+        GROUP BY status
+      ) s
+    )
+  )
+  FROM cfo_application_rankings
+  WHERE competition_id = p_competition_id;
+$$;
+
+GRANT EXECUTE ON FUNCTION cfo_application_counts(UUID) TO service_role;
+
+-- Supports the ranking window and keyset scans
+CREATE INDEX IF NOT EXISTS idx_cfo_apps_competition_ranking
+  ON cfo_applications(competition_id, auto_excluded, total_score DESC, submitted_at, id);
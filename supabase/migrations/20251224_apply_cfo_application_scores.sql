@@ -0,0 +1,59 @@
+-- Bulk write-back for batch re-scoring (backend/cfo_batch_scoring.py)
+-- Run this in Supabase SQL Editor
+--
+-- p_scores: JSON array of {id, total_score, raw_score, leadership_score,
+-- ethics_score, capital_score, judgment_score, red_flag_count, red_flags,
+-- auto_excluded, exclusion_reason}. One set-based UPDATE per call.
+--
+-- Status only follows a change in auto_excluded, and never for rows an admin
+-- has overridden or that have already moved past review.
+
+CREATE OR REPLACE FUNCTION apply_cfo_application_scores(p_scores JSONB)
+RETURNS TABLE (
+  id UUID,
+  competition_id UUID,
+  total_score DECIMAL(10,2),
+  submitted_at TIMESTAMPTZ,
+  auto_excluded BOOLEAN,
+  status TEXT,
+  admin_override BOOLEAN
+)
+LANGUAGE sql
+AS $$
+  UPDATE cfo_applications a
+  SET
+    total_score = s.total_score,
+    raw_score = s.raw_score,
+    leadership_score = s.leadership_score,
+    ethics_score = s.ethics_score,
+    capital_score = s.capital_score,
+    judgment_score = s.judgment_score,
+    red_flag_count = s.red_flag_count,
+    red_flags = s.red_flags,
+    auto_excluded = s.auto_excluded,
+    exclusion_reason = s.exclusion_reason,
+    status = CASE
+      WHEN COALESCE(a.admin_override, FALSE) THEN a.status
+      WHEN s.auto_excluded AND a.status IN ('submitted', 'pending') THEN 'excluded'
+      WHEN NOT s.auto_excluded AND a.status = 'excluded' THEN 'submitted'
+      ELSE a.status
+    END,
+    updated_at = NOW()
+  FROM jsonb_to_recordset(p_scores) AS s(
+    id UUID,
+    total_score DECIMAL(10,2),
+    raw_score DECIMAL(10,2),
+    leadership_score DECIMAL(10,2),
+    ethics_score DECIMAL(10,2),
+    capital_score DECIMAL(10,2),
+    judgment_score DECIMAL(10,2),
+    red_flag_count INTEGER,
+    red_flags JSONB,
+    auto_excluded BOOLEAN,
+    exclusion_reason TEXT
+  )
+  WHERE a.id = s.id
+  RETURNING a.id, a.competition_id, a.total_score, a.submitted_at, a.auto_excluded, a.status, a.admin_override;
+$$;
+
+GRANT EXECUTE ON FUNCTION apply_cfo_application_scores(JSONB) TO service_role;
@@ -0,0 +1,18 @@
+-- Versioned CFO application scoring rubrics (backend/scoring_rubric.py)
+-- Run this in Supabase SQL Editor
+--
+-- rubric holds the whole document (version, weights, penalty, per-step rules).
+-- At most one version is active; with none active the backend scores with
+-- its built-in default rubric.
+
+CREATE TABLE IF NOT EXISTS scoring_rubrics (
+  version TEXT PRIMARY KEY,
+  rubric JSONB NOT NULL,
+  is_active BOOLEAN NOT NULL DEFAULT FALSE,
+  created_by UUID REFERENCES user_profiles(id),
+  created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  activated_at TIMESTAMP
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_scoring_rubrics_single_active
+  ON scoring_rubrics(is_active) WHERE is_active;
@@ -0,0 +1,42 @@
+-- Near-duplicate detection for free-text answers (backend/answer_similarity.py)
+-- Run this in Supabase SQL Editor
+--
+-- answer_minhash:    128 MinHash values over the six free-text answers
+-- near_duplicate_of: [{application_id, similarity}] earlier applications in the
+--                    same competition with near-identical answers
+
+ALTER TABLE cfo_applications
+ADD COLUMN IF NOT EXISTS answer_minhash INTEGER[],
+ADD COLUMN IF NOT EXISTS near_duplicate_of JSONB DEFAULT '[]';
+
+-- Incremental signature loads per competition (by submitted_at)
+CREATE INDEX IF NOT EXISTS idx_cfo_apps_competition_submitted
+  ON cfo_applications(competition_id, submitted_at);
+
+-- Bulk write-back for the back-fill: one set-based UPDATE per call
+CREATE OR REPLACE FUNCTION apply_answer_similarity(p_rows JSONB)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+  WITH updated AS (
+    UPDATE cfo_applications a
+    SET
+      answer_minhash = s.answer_minhash,
+      near_duplicate_of = COALESCE(s.near_duplicate_of, '[]'::jsonb),
+      red_flags = s.red_flags,
+      red_flag_count = s.red_flag_count,
+      updated_at = NOW()
+    FROM jsonb_to_recordset(p_rows) AS s(
+      id UUID,
+      answer_minhash INTEGER[],
+      near_duplicate_of JSONB,
+      red_flags JSONB,
+      red_flag_count INTEGER
+    )
+    WHERE a.id = s.id
+    RETURNING a.id
+  )
+  SELECT COUNT(*)::INTEGER FROM updated;
+$$;
+
+GRANT EXECUTE ON FUNCTION apply_answer_similarity(JSONB) TO service_role;
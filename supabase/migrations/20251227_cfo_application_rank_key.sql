@@ -0,0 +1,153 @@
+-- Composite rank key for CFO applications
+-- Run this in Supabase SQL Editor
+--
+-- rank_key packs the full ranking order into one fixed-width string that sorts
+-- ascending (COLLATE "C"):
+--
+--   excluded flag     '0' ranked / '1' auto-excluded
+--   total_score       DESC (NULL last)   \
+--   leadership_score  DESC                | calculate_total_score() tie_breakers,
+--   ethics_score      DESC                | in that order
+--   capital_score     DESC                |
+--   why_top_100 len   DESC              /
+--   submitted_at      ASC (NULL last)
+--   id                final tie-break, so every key is unique
+--
+-- Scores are encoded as 500000000000 - cents in 12 digits, the motivation
+-- length as 999999 - length in 6 digits, submitted_at as UTC
+-- YYYYMMDDHHMISSUS. A trigger keeps the key current on every insert and every
+-- score write, so submit, overrides and batch re-scoring all persist it.
+
+ALTER TABLE cfo_applications
+ADD COLUMN IF NOT EXISTS rank_key TEXT COLLATE "C";
+
+CREATE OR REPLACE FUNCTION cfo_application_rank_key(a cfo_applications)
+RETURNS TEXT
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT
+    CASE WHEN COALESCE(a.auto_excluded, FALSE) THEN '1' ELSE '0' END ||
+    COALESCE(lpad((500000000000 - ROUND(a.total_score * 100))::BIGINT::TEXT, 12, '0'), '999999999999') ||
+    lpad((500000000000 - ROUND(COALESCE(a.leadership_score, 0) * 100))::BIGINT::TEXT, 12, '0') ||
+    lpad((500000000000 - ROUND(COALESCE(a.ethics_score, 0) * 100))::BIGINT::TEXT, 12, '0') ||
+    lpad((500000000000 - ROUND(COALESCE(a.capital_score, 0) * 100))::BIGINT::TEXT, 12, '0') ||
+    lpad((999999 - LEAST(char_length(btrim(COALESCE(a.why_top_100, ''), E' \t\r\n')), 999999))::TEXT, 6, '0') ||
+    COALESCE(to_char(a.submitted_at AT TIME ZONE 'UTC', 'YYYYMMDDHH24MISSUS'), '99999999999999999999') ||
+    a.id::TEXT;
+$$;
+
+CREATE OR REPLACE FUNCTION set_cfo_application_rank_key()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.rank_key = cfo_application_rank_key(NEW);
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS set_cfo_applications_rank_key ON cfo_applications;
+CREATE TRIGGER set_cfo_applications_rank_key
+    BEFORE INSERT OR UPDATE OF total_score, leadership_score, ethics_score, capital_score,
+        why_top_100, submitted_at, auto_excluded
+    ON cfo_applications
+    FOR EACH ROW
+    EXECUTE FUNCTION set_cfo_application_rank_key();
+
+-- Back-fill existing rows
+UPDATE cfo_applications a
+SET rank_key = cfo_application_rank_key(a)
+WHERE rank_key IS DISTINCT FROM cfo_application_rank_key(a);
+
+-- Ranked listing, keyset pages and bulk approval read this index in order
+CREATE INDEX IF NOT EXISTS idx_cfo_apps_competition_rank_key
+  ON cfo_applications(competition_id, rank_key);
+
+DROP INDEX IF EXISTS idx_cfo_apps_competition_ranking;
+
+-- Rankings view ordered by the key: rank and position follow the index order
+-- (a.* gains rank_key, so the view is recreated rather than replaced)
+DROP VIEW IF EXISTS cfo_application_rankings;
+
+CREATE VIEW cfo_application_rankings AS
+SELECT
+  ranked.*,
+  CASE
+    WHEN ranked.auto_excluded THEN 'excluded'
+    WHEN ranked.rank <= 100 THEN 'qualified'
+    WHEN ranked.rank <= 150 THEN 'reserve'
+    ELSE 'not_selected'
+  END AS final_status
+FROM (
+  SELECT
+    a.*,
+    p.full_name,
+    p.email,
+    CASE WHEN COALESCE(a.auto_excluded, FALSE) THEN NULL
+         ELSE ROW_NUMBER() OVER (
+           PARTITION BY a.competition_id, COALESCE(a.auto_excluded, FALSE)
+           ORDER BY a.rank_key
+         )
+    END AS rank,
+    ROW_NUMBER() OVER (
+      PARTITION BY a.competition_id
+      ORDER BY a.rank_key
+    ) AS position
+  FROM cfo_applications a
+  LEFT JOIN user_profiles p ON p.id = a.user_id
+) ranked;
+
+GRANT SELECT ON cfo_application_rankings TO service_role;
+
+-- Batch re-scoring hands the new keys back to the in-memory ranking index
+DROP FUNCTION IF EXISTS apply_cfo_application_scores(JSONB);
+
+CREATE FUNCTION apply_cfo_application_scores(p_scores JSONB)
+RETURNS TABLE (
+  id UUID,
+  competition_id UUID,
+  total_score DECIMAL(10,2),
+  submitted_at TIMESTAMPTZ,
+  auto_excluded BOOLEAN,
+  status TEXT,
+  admin_override BOOLEAN,
+  rank_key TEXT
+)
+LANGUAGE sql
+AS $$
+  UPDATE cfo_applications a
+  SET
+    total_score = s.total_score,
+    raw_score = s.raw_score,
+    leadership_score = s.leadership_score,
+    ethics_score = s.ethics_score,
+    capital_score = s.capital_score,
+    judgment_score = s.judgment_score,
+    red_flag_count = s.red_flag_count,
+    red_flags = s.red_flags,
+    auto_excluded = s.auto_excluded,
+    exclusion_reason = s.exclusion_reason,
+    status = CASE
+      WHEN COALESCE(a.admin_override, FALSE) THEN a.status
+      WHEN s.auto_excluded AND a.status IN ('submitted', 'pending') THEN 'excluded'
+      WHEN NOT s.auto_excluded AND a.status = 'excluded' THEN 'submitted'
+      ELSE a.status
+    END,
+    updated_at = NOW()
+  FROM jsonb_to_recordset(p_scores) AS s(
+    id UUID,
+    total_score DECIMAL(10,2),
+    raw_score DECIMAL(10,2),
+    leadership_score DECIMAL(10,2),
+    ethics_score DECIMAL(10,2),
+    capital_score DECIMAL(10,2),
+    judgment_score DECIMAL(10,2),
+    red_flag_count INTEGER,
+    red_flags JSONB,
+    auto_excluded BOOLEAN,
+    exclusion_reason TEXT
+  )
+  WHERE a.id = s.id
+  RETURNING a.id, a.competition_id, a.total_score, a.submitted_at, a.auto_excluded, a.status, a.admin_override, a.rank_key;
+$$;
+
+GRANT EXECUTE ON FUNCTION apply_cfo_application_scores(JSONB) TO service_role;
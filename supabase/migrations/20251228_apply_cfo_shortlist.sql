@@ -0,0 +1,52 @@
+-- Bulk status write for competition shortlisting (backend/shortlisting.py)
+-- Run this in Supabase SQL Editor
+--
+-- p_qualified / p_reserve: the shortlisted application ids (at most 150).
+-- Every other application of the competition becomes 'excluded' if it was
+-- auto-excluded, otherwise 'not_selected'. Rows an admin has overridden, or
+-- whose status is not in p_replaceable (e.g. reviewer decisions), are kept.
+-- Only rows whose status actually changes are written.
+
+CREATE OR REPLACE FUNCTION apply_cfo_shortlist(
+  p_competition_id UUID,
+  p_qualified UUID[],
+  p_reserve UUID[],
+  p_replaceable TEXT[]
+)
+RETURNS JSON
+LANGUAGE sql
+AS $$
+  WITH target AS (
+    SELECT
+      a.id,
+      CASE
+        WHEN a.id = ANY(p_qualified) THEN 'qualified'
+        WHEN a.id = ANY(p_reserve) THEN 'reserve'
+        WHEN COALESCE(a.auto_excluded, FALSE) THEN 'excluded'
+        ELSE 'not_selected'
+      END AS status
+    FROM cfo_applications a
+    WHERE a.competition_id = p_competition_id
+      AND NOT COALESCE(a.admin_override, FALSE)
+      AND a.status = ANY(p_replaceable)
+  ),
+  updated AS (
+    UPDATE cfo_applications a
+    SET status = t.status,
+        updated_at = NOW()
+    FROM target t
+    WHERE a.id = t.id
+      AND a.status IS DISTINCT FROM t.status
+    RETURNING a.status
+  )
+  SELECT json_build_object(
+    'updated', COUNT(*),
+    'qualified', COUNT(*) FILTER (WHERE status = 'qualified'),
+    'reserve', COUNT(*) FILTER (WHERE status = 'reserve'),
+    'not_selected', COUNT(*) FILTER (WHERE status = 'not_selected'),
+    'excluded', COUNT(*) FILTER (WHERE status = 'excluded')
+  )
+  FROM updated;
+$$;
+
+GRANT EXECUTE ON FUNCTION apply_cfo_shortlist(UUID, UUID[], UUID[], TEXT[]) TO service_role;
@@ -0,0 +1,101 @@
+-- Rubric version per CFO application, for lazy re-scoring
+-- Run this in Supabase SQL Editor
+--
+-- scoring_version is the scoring_rubrics.version the stored scores were
+-- computed with (NULL for rows scored before versioning). Ranking reads
+-- re-score rows on another version in the background, in bounded batches
+-- (backend/score_refresh.py), through apply_cfo_application_scores().
+
+ALTER TABLE cfo_applications
+ADD COLUMN IF NOT EXISTS scoring_version TEXT;
+
+-- Stale-row scans: competition, version, then id order
+CREATE INDEX IF NOT EXISTS idx_cfo_apps_competition_scoring_version
+  ON cfo_applications(competition_id, scoring_version, id);
+
+-- a.* gains scoring_version, so the view is recreated rather than replaced
+DROP VIEW IF EXISTS cfo_application_rankings;
+
+CREATE VIEW cfo_application_rankings AS
+SELECT
+  ranked.*,
+  CASE
+    WHEN ranked.auto_excluded THEN 'excluded'
+    WHEN ranked.rank <= 100 THEN 'qualified'
+    WHEN ranked.rank <= 150 THEN 'reserve'
+    ELSE 'not_selected'
+  END AS final_status
+FROM (
+  SELECT
+    a.*,
+    p.full_name,
+    p.email,
+    CASE WHEN COALESCE(a.auto_excluded, FALSE) THEN NULL
+         ELSE ROW_NUMBER() OVER (
+           PARTITION BY a.competition_id, COALESCE(a.auto_excluded, FALSE)
+           ORDER BY a.rank_key
+         )
+    END AS rank,
+    ROW_NUMBER() OVER (
+      PARTITION BY a.competition_id
+      ORDER BY a.rank_key
+    ) AS position
+  FROM cfo_applications a
+  LEFT JOIN user_profiles p ON p.id = a.user_id
+) ranked;
+
+GRANT SELECT ON cfo_application_rankings TO service_role;
+
+-- Score writes stamp the version they were computed with
+CREATE OR REPLACE FUNCTION apply_cfo_application_scores(p_scores JSONB)
+RETURNS TABLE (
+  id UUID,
+  competition_id UUID,
+  total_score DECIMAL(10,2),
+  submitted_at TIMESTAMPTZ,
+  auto_excluded BOOLEAN,
+  status TEXT,
+  admin_override BOOLEAN,
+  rank_key TEXT
+)
+LANGUAGE sql
+AS $$
+  UPDATE cfo_applications a
+  SET
+    total_score = s.total_score,
+    raw_score = s.raw_score,
+    leadership_score = s.leadership_score,
+    ethics_score = s.ethics_score,
+    capital_score = s.capital_score,
+    judgment_score = s.judgment_score,
+    red_flag_count = s.red_flag_count,
+    red_flags = s.red_flags,
+    auto_excluded = s.auto_excluded,
+    exclusion_reason = s.exclusion_reason,
+    scoring_version = COALESCE(s.scoring_version, a.scoring_version),
+    status = CASE
+      WHEN COALESCE(a.admin_override, FALSE) THEN a.status
+      WHEN s.auto_excluded AND a.status IN ('submitted', 'pending') THEN 'excluded'
+      WHEN NOT s.auto_excluded AND a.status = 'excluded' THEN 'submitted'
+      ELSE a.status
+    END,
+    updated_at = NOW()
+  FROM jsonb_to_recordset(p_scores) AS s(
+    id UUID,
+    total_score DECIMAL(10,2),
+    raw_score DECIMAL(10,2),
+    leadership_score DECIMAL(10,2),
+    ethics_score DECIMAL(10,2),
+    capital_score DECIMAL(10,2),
+    judgment_score DECIMAL(10,2),
+    red_flag_count INTEGER,
+    red_flags JSONB,
+    auto_excluded BOOLEAN,
+    exclusion_reason TEXT,
+    scoring_version TEXT
+  )
+  WHERE a.id = s.id
+  RETURNING a.id, a.competition_id, a.total_score, a.submitted_at, a.auto_excluded, a.status, a.admin_override, a.rank_key;
+$$;
+
+GRANT EXECUTE ON FUNCTION apply_cfo_application_scores(JSONB) TO service_role;
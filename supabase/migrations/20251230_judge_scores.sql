@@ -0,0 +1,34 @@
+-- Raw judge scores for calibrated judging (backend/judging.py)
+-- Run this in Supabase SQL Editor
+--
+-- One row per judge and scored entity: a CFO application or a task
+-- submission. Scores are stored raw (0-100); per-judge normalisation and the
+-- weighted, trimmed aggregate are computed by the backend.
+
+CREATE TABLE IF NOT EXISTS judge_scores (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  competition_id UUID NOT NULL REFERENCES competitions(id) ON DELETE CASCADE,
+  judge_id UUID NOT NULL REFERENCES user_profiles(id) ON DELETE CASCADE,
+  entity_type TEXT NOT NULL CHECK (entity_type IN ('application', 'submission')),
+  entity_id UUID NOT NULL,
+  score DECIMAL(5,2) NOT NULL CHECK (score >= 0 AND score <= 100),
+  criteria_scores JSONB DEFAULT '{}',
+  feedback TEXT,
+  created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+
+  UNIQUE(judge_id, entity_type, entity_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_judge_scores_competition
+  ON judge_scores(competition_id, entity_type, id);
+
+DROP TRIGGER IF EXISTS update_judge_scores_updated_at ON judge_scores;
+CREATE TRIGGER update_judge_scores_updated_at
+    BEFORE UPDATE ON judge_scores
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+-- Per-judge weight in the aggregate
+ALTER TABLE judge_assignments
+ADD COLUMN IF NOT EXISTS weight DECIMAL(4,2) NOT NULL DEFAULT 1.0;
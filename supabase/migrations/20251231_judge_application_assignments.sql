@@ -0,0 +1,21 @@
+-- Per-application judge assignments (backend/judge_workload.py)
+-- Run this in Supabase SQL Editor
+--
+-- Each application is reviewed by several judges of its competition
+-- (judge_assignments). One row per (judge, application): a judge is never
+-- given the same application twice.
+
+CREATE TABLE IF NOT EXISTS judge_application_assignments (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  competition_id UUID NOT NULL REFERENCES competitions(id) ON DELETE CASCADE,
+  judge_id UUID NOT NULL REFERENCES user_profiles(id) ON DELETE CASCADE,
+  application_id UUID NOT NULL REFERENCES cfo_applications(id) ON DELETE CASCADE,
+  created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+
+  UNIQUE(judge_id, application_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_judge_app_assignments_competition
+  ON judge_application_assignments(competition_id, judge_id);
+CREATE INDEX IF NOT EXISTS idx_judge_app_assignments_application
+  ON judge_application_assignments(application_id);
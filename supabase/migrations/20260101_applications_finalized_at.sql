@@ -0,0 +1,27 @@
+-- Marker for automatic application finalisation (backend/application_finalization.py)
+-- Run this in Supabase SQL Editor
+--
+-- Set once a closed competition's final statuses (qualified / reserve /
+-- not_selected / excluded) have been written; cleared when it is reopened.
+
+-- Competitions already past the application phase when the column is added
+-- are marked as finalised, so the scheduler only acts on competitions that
+-- close from now on and never rewrites historic statuses. The backfill runs
+-- only when the column is created, so re-running this file is safe.
+
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM information_schema.columns
+    WHERE table_schema = 'public' AND table_name = 'competitions' AND column_name = 'applications_finalized_at'
+  ) THEN
+    ALTER TABLE competitions ADD COLUMN applications_finalized_at TIMESTAMPTZ;
+
+    UPDATE competitions
+    SET applications_finalized_at = NOW()
+    WHERE COALESCE(status, 'draft') NOT IN ('applications_open', 'open', 'draft', 'upcoming');
+  END IF;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_competitions_unfinalized
+  ON competitions(status) WHERE applications_finalized_at IS NULL;
@@ -0,0 +1,51 @@
+-- Per-team sequence numbers for chat messages
+-- Run this in Supabase SQL Editor
+--
+-- Every message gets seq = 1, 2, 3, ... within its team, assigned at insert
+-- time from a per-team counter row (the row lock serialises concurrent
+-- inserts of one team only). History is paged by keyset on (team_id, seq).
+
+ALTER TABLE chat_messages ADD COLUMN IF NOT EXISTS seq BIGINT;
+
+CREATE TABLE IF NOT EXISTS chat_team_sequences (
+  team_id UUID PRIMARY KEY REFERENCES teams(id) ON DELETE CASCADE,
+  last_seq BIGINT NOT NULL DEFAULT 0
+);
+
+GRANT ALL ON chat_team_sequences TO service_role;
+
+-- Backfill existing messages in send order
+UPDATE chat_messages m
+SET seq = numbered.seq
+FROM (
+  SELECT id, ROW_NUMBER() OVER (PARTITION BY team_id ORDER BY created_at, id) AS seq
+  FROM chat_messages
+) numbered
+WHERE m.id = numbered.id AND m.seq IS NULL;
+
+INSERT INTO chat_team_sequences (team_id, last_seq)
+SELECT team_id, MAX(seq) FROM chat_messages GROUP BY team_id
+ON CONFLICT (team_id) DO UPDATE SET last_seq = GREATEST(chat_team_sequences.last_seq, EXCLUDED.last_seq);
+
+CREATE OR REPLACE FUNCTION assign_chat_message_seq()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  INSERT INTO chat_team_sequences (team_id, last_seq)
+  VALUES (NEW.team_id, 1)
+  ON CONFLICT (team_id) DO UPDATE SET last_seq = chat_team_sequences.last_seq + 1
+  RETURNING last_seq INTO NEW.seq;
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS chat_messages_assign_seq ON chat_messages;
+CREATE TRIGGER chat_messages_assign_seq
+  BEFORE INSERT ON chat_messages
+  FOR EACH ROW EXECUTE FUNCTION assign_chat_message_seq();
+
+ALTER TABLE chat_messages ALTER COLUMN seq SET NOT NULL;
+
+-- Serves every history page: team_id = ? AND seq < ? ORDER BY seq DESC LIMIT ?
+CREATE UNIQUE INDEX IF NOT EXISTS idx_chat_messages_team_seq ON chat_messages(team_id, seq);
@@ -0,0 +1,42 @@
+-- Ranking positions for one page of CFO applications
+-- Run this in Supabase SQL Editor
+--
+-- The ranked listing (backend/cfo_rankings.py) reads its pages straight from
+-- cfo_applications through idx_cfo_apps_competition_rank_key. Filtering a
+-- keyset cursor through the cfo_application_rankings view cannot use that
+-- index, because the view's window has to be computed over the whole
+-- competition first. This function numbers only the page: one index-only count
+-- of the rows ahead of the page's first key, plus the index range between its
+-- first and last key. Ranked keys ('0...') sort before auto-excluded ones
+-- ('1...'), so for ranked rows the position is also the rank.
+
+CREATE OR REPLACE FUNCTION cfo_application_page_positions(p_competition_id UUID, p_keys TEXT[])
+RETURNS TABLE (rank_key TEXT, "position" BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+  WITH keys AS (
+    SELECT k COLLATE "C" AS k FROM unnest(p_keys) AS k
+  ),
+  bounds AS (
+    SELECT MIN(k) AS lo, MAX(k) AS hi FROM keys
+  ),
+  ahead AS (
+    SELECT COUNT(*) AS n
+    FROM cfo_applications a, bounds
+    WHERE a.competition_id = p_competition_id
+      AND a.rank_key < bounds.lo
+  ),
+  span AS (
+    SELECT a.rank_key, ROW_NUMBER() OVER (ORDER BY a.rank_key) AS n
+    FROM cfo_applications a, bounds
+    WHERE a.competition_id = p_competition_id
+      AND a.rank_key >= bounds.lo
+      AND a.rank_key <= bounds.hi
+  )
+  SELECT span.rank_key, ahead.n + span.n
+  FROM span, ahead
+  WHERE span.rank_key IN (SELECT k FROM keys);
+$$;
+
+GRANT EXECUTE ON FUNCTION cfo_application_page_positions(UUID, TEXT[]) TO service_role;
@@ -0,0 +1,9 @@
+-- Judge seats per application (backend/judge_workload.py)
+-- Run this in Supabase SQL Editor
+--
+-- Written each time the judge workload is distributed; removing a judge
+-- refills the released applications to this count. NULL until the workload
+-- has been distributed once.
+
+ALTER TABLE competitions
+ADD COLUMN IF NOT EXISTS judges_per_application INTEGER;
@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+from cfo_application_scoring import calculate_total_score
+from cfo_batch_scoring import (
+    CFOFullApplication, application_from_row, is_scorable, score_batch, score_patches, verify_against_scalar
+)
+from scoring_rubric import STEP_NAMES, get_active_rubric
+
+
+def text_limits():
+    limits = {}
+    for step in STEP_NAMES:
+        for name, field in CFOFullApplication.model_fields[step].annotation.model_fields.items():
+            max_lengths = [getattr(meta, "max_length", None) for meta in field.metadata]
+            limits[name] = next((length for length in max_lengths if length is not None), 500)
+    return limits
+
+
+def make_rows(count, seed):
+    rng = random.Random(seed)
+    rubric = get_active_rubric()
+    limits = text_limits()
+    rows = []
+    for i in range(count):
+        row = {"id": f"a{i:05d}", "competition_id": "c1", "submitted_at": None, "status": "submitted"}
+        for column, values in rubric.option_values.items():
+            row[column] = rng.choice(values)
+        for column in rubric.optional_columns:
+            if rng.random() < 0.3:
+                row[column] = None
+        for column in rubric.text_columns:
+            # Surrounding whitespace must not count towards the length thresholds
+            row[column] = rng.choice([" ", "\t", ""]) + "x" * rng.randint(0, limits[column] - 2) + rng.choice([" ", "\n", ""])
+        rows.append(row)
+    return rows
+
+
+def expected_patch(row):
+    expected = calculate_total_score(application_from_row(row))
+    return {
+        "total_score": expected["final_score"],
+        "raw_score": expected["total_raw_score"],
+        "leadership_score": expected["section_scores"]["leadership"],
+        "capital_score": expected["section_scores"]["capital_allocation"],
+        "judgment_score": expected["section_scores"]["financial_judgment"],
+        "ethics_score": expected["section_scores"]["ethics"],
+        "red_flags": expected["red_flags"],
+        "red_flag_count": expected["red_flag_count"],
+        "auto_excluded": expected["auto_exclude"]
+    }
+
+
+def test_batch_scores_match_the_scalar_scorer():
+    rows = make_rows(2000, seed=5)
+    assert all(is_scorable(row, get_active_rubric()) for row in rows)
+
+    patches = score_patches(rows, score_batch(rows))
+
+    for row, patch in zip(rows, patches):
+        expected = expected_patch(row)
+        assert {key: patch[key] for key in expected} == expected, row["id"]
+        assert patch["scoring_version"] == get_active_rubric().version
+
+
+def test_verify_against_scalar_flags_a_wrong_patch():
+    rows = make_rows(50, seed=9)
+    patches = score_patches(rows, score_batch(rows))
+    assert verify_against_scalar(rows, patches, sample=50) == []
+
+    patches[10] = {**patches[10], "total_score": patches[10]["total_score"] + 1}
+    assert verify_against_scalar(rows, patches, sample=50) == [rows[10]["id"]]
+
+
+@pytest.mark.parametrize("column", ["option", "text"])
+def test_rows_the_submit_model_would_reject_are_not_scorable(column):
+    rubric = get_active_rubric()
+    row = make_rows(1, seed=1)[0]
+    if column == "option":
+        row[next(c for c in rubric.option_values if c not in rubric.optional_columns)] = "not-an-option"
+    else:
+        row[rubric.text_columns[0]] = None
+
+    assert not is_scorable(row, rubric)
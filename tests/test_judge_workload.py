@@ -0,0 +1,87 @@
+from collections import Counter
+
+from judge_workload import company_keys, plan_assignments
+
+
+def make_judges(count, companies=None):
+    companies = companies or {}
+    return [{"judge_id": f"j{i}", "companies": companies.get(f"j{i}", set())} for i in range(count)]
+
+
+def make_applications(count, companies=None):
+    companies = companies or {}
+    return [{"id": f"a{i:03d}", "companies": companies.get(f"a{i:03d}", set())} for i in range(count)]
+
+
+def test_company_keys_ignore_case_and_whitespace():
+    assert company_keys({"company_name": "  Acme   Holdings ", "company": "ACME holdings"}) == {"acme holdings"}
+    assert company_keys({"company_name": "", "company": None}) == set()
+    assert company_keys(None) == set()
+
+
+def test_every_application_gets_k_distinct_judges_with_balanced_loads():
+    applications = make_applications(100)
+    judges = make_judges(10)
+
+    plan = plan_assignments(applications, judges, 3, seed="c1")
+
+    seats = Counter(application_id for _, application_id in plan["pairs"])
+    assert len(plan["pairs"]) == len(set(plan["pairs"])) == 300
+    assert set(seats.values()) == {3}
+    assert set(plan["loads"].values()) == {30}
+    assert plan["shortfalls"] == [] and plan["conflicts_skipped"] == 0
+
+
+def test_conflicted_judges_are_skipped():
+    conflicted = {f"a{i:03d}" for i in range(0, 40, 4)}
+    applications = make_applications(40, {application_id: {"acme"} for application_id in conflicted})
+    judges = make_judges(5, {"j0": {"acme"}})
+
+    plan = plan_assignments(applications, judges, 2, seed="c1")
+
+    assert not [pair for pair in plan["pairs"] if pair[0] == "j0" and pair[1] in conflicted]
+    assert plan["conflicts_skipped"] > 0
+    assert max(plan["loads"].values()) - min(plan["loads"].values()) <= 1
+    assert plan["shortfalls"] == []
+
+
+def test_existing_pairs_fill_only_missing_seats():
+    applications = make_applications(4)
+    judges = make_judges(4)
+    existing = [("j0", "a000"), ("j1", "a000"), ("j0", "a001")]
+
+    plan = plan_assignments(applications, judges, 2, existing=existing, seed="c1")
+
+    assert not set(plan["pairs"]) & set(existing)
+    seats = Counter(application_id for _, application_id in list(plan["pairs"]) + existing)
+    assert seats == {"a000": 2, "a001": 2, "a002": 2, "a003": 2}
+    assert ("j0", "a001") not in plan["pairs"]
+    # Existing rows count towards the loads
+    assert sum(plan["loads"].values()) == 8
+
+
+def test_existing_pairs_of_removed_judges_do_not_count():
+    plan = plan_assignments(make_applications(1), make_judges(3), 2, existing=[("gone", "a000")], seed="c1")
+
+    assert len(plan["pairs"]) == 2
+    assert "gone" not in plan["loads"]
+
+
+def test_shortfall_when_too_few_eligible_judges():
+    applications = make_applications(2, {"a001": {"acme"}})
+    judges = make_judges(3, {"j0": {"acme"}, "j1": {"acme"}})
+
+    plan = plan_assignments(applications, judges, 2, seed="c1")
+
+    assert plan["shortfalls"] == [{"application_id": "a001", "missing": 1}]
+    assert [pair for pair in plan["pairs"] if pair[1] == "a001"] == [("j2", "a001")]
+
+
+def test_same_seed_plans_the_same_way():
+    applications = make_applications(50)
+    judges = make_judges(7)
+
+    first = plan_assignments(applications, judges, 3, seed="c1")
+    second = plan_assignments(applications, judges, 3, seed="c1")
+
+    assert first["pairs"] == second["pairs"]
@@ -0,0 +1,125 @@
+import math
+import random
+
+import pytest
+
+from judging import JUDGE_TRIM_COUNT, JUDGE_TRIM_MIN_SCORES, NORMALIZATION_METHODS, JudgingBoard
+
+
+def brute_force_board(scores, weights, method):
+    """scores: {(judge_id, entity_id): score} in recording order"""
+    by_judge = {}
+    for (judge_id, _), score in scores.items():
+        by_judge.setdefault(judge_id, []).append(score)
+
+    normalized = {}
+    for (judge_id, entity_id), score in scores.items():
+        judge_scores = by_judge[judge_id]
+        if method == "zscore":
+            mean = sum(judge_scores) / len(judge_scores)
+            std = math.sqrt(max(sum(s * s for s in judge_scores) / len(judge_scores) - mean * mean, 0.0))
+            normalized[(judge_id, entity_id)] = (score - mean) / std if std > 1e-9 else 0.0
+        else:
+            below = sum(1 for s in judge_scores if s < score)
+            not_above = sum(1 for s in judge_scores if s <= score)
+            normalized[(judge_id, entity_id)] = (below + not_above) / (2.0 * len(judge_scores))
+
+    by_entity = {}
+    for (judge_id, entity_id), score in scores.items():
+        by_entity.setdefault(entity_id, []).append((normalized[(judge_id, entity_id)], weights.get(judge_id, 1.0), score))
+
+    rows = []
+    for entity_id, entries in by_entity.items():
+        trim = JUDGE_TRIM_COUNT if len(entries) >= JUDGE_TRIM_MIN_SCORES else 0
+        kept = sorted(entries, key=lambda entry: entry[0])[trim:len(entries) - trim]
+        total_weight = sum(weight for _, weight, _ in kept)
+        aggregate = sum(value * weight for value, weight, _ in kept) / total_weight if total_weight > 0 else 0.0
+        rows.append({
+            "entity_id": entity_id,
+            "aggregate": aggregate,
+            "raw_mean": sum(score for _, _, score in entries) / len(entries),
+            "judge_count": len(entries),
+            "scores_used": len(kept)
+        })
+    rows.sort(key=lambda row: (-row["aggregate"], -row["raw_mean"], row["entity_id"]))
+    return rows
+
+
+def assert_matches(board, scores, weights):
+    for method in NORMALIZATION_METHODS:
+        expected = brute_force_board(scores, weights, method)
+        actual = board.board(method)
+        assert [row["entity_id"] for row in actual] == [row["entity_id"] for row in expected]
+        for got, want in zip(actual, expected):
+            assert got["normalized_score"] == pytest.approx(round(want["aggregate"], 4), abs=1e-4)
+            assert got["raw_mean"] == pytest.approx(round(want["raw_mean"], 2), abs=1e-2)
+            assert got["judge_count"] == want["judge_count"]
+            assert got["scores_used"] == want["scores_used"]
+
+
+def random_scores(rng, judges, entities, count):
+    scores = {}
+    for _ in range(count):
+        judge_id = rng.choice(judges)
+        # Each judge has a personal scale, which normalisation must remove
+        offset = (judges.index(judge_id) - len(judges) / 2) * 5
+        scores[(judge_id, rng.choice(entities))] = round(rng.uniform(40, 90) + offset, 1)
+    return scores
+
+
+def test_board_matches_brute_force():
+    rng = random.Random(3)
+    judges = [f"j{i}" for i in range(8)]
+    entities = [f"e{i:03d}" for i in range(60)]
+    scores = random_scores(rng, judges, entities, 400)
+    weights = {judge_id: rng.choice([0.5, 1.0, 2.0]) for judge_id in judges}
+
+    board = JudgingBoard("c1", "application")
+    board.set_weights(weights)
+    for (judge_id, entity_id), score in scores.items():
+        board.record(judge_id, entity_id, score)
+
+    assert board.score_count == len(scores)
+    assert_matches(board, scores, weights)
+
+
+def test_incremental_updates_match_a_full_recomputation():
+    rng = random.Random(11)
+    judges = [f"j{i}" for i in range(6)]
+    entities = [f"e{i:03d}" for i in range(40)]
+    scores = random_scores(rng, judges, entities, 200)
+    weights = {}
+
+    board = JudgingBoard("c1", "application")
+    board.load({"judge_id": j, "entity_id": e, "score": s} for (j, e), s in scores.items())
+    assert_matches(board, scores, weights)
+
+    for _ in range(5):
+        # New scores, re-scores of existing pairs and a weight change between reads
+        for key, score in random_scores(rng, judges, entities, 30).items():
+            scores[key] = score
+            board.record(key[0], key[1], score)
+        changed_judge = rng.choice(judges)
+        weights[changed_judge] = rng.choice([0.5, 1.5, 3.0])
+        board.set_weights({changed_judge: weights[changed_judge]})
+        assert_matches(board, scores, weights)
+
+    assert board.refresh() == 0
+
+
+def test_constant_judge_scores_normalise_to_zero():
+    board = JudgingBoard("c1", "application")
+    for entity_id in ("a", "b", "c"):
+        board.record("j1", entity_id, 70)
+
+    assert [row["normalized_score"] for row in board.board("zscore")] == [0.0, 0.0, 0.0]
+    assert [row["normalized_score"] for row in board.board("rank")] == [0.5, 0.5, 0.5]
+
+
+def test_board_limit():
+    board = JudgingBoard("c1", "application")
+    for i, entity_id in enumerate(("a", "b", "c", "d")):
+        board.record("j1", entity_id, 50 + i)
+
+    assert [row["entity_id"] for row in board.board("zscore", limit=2)] == ["d", "c"]
+    assert board.board("zscore", limit=2)[1]["rank"] == 2
@@ -0,0 +1,128 @@
+import random
+
+import pytest
+
+from quota_shortlist import QuotaError, select_with_quotas
+
+
+def make_row(i, country="EG", industry="banking", years="5-10", excluded=False):
+    return {
+        "id": f"a{i:04d}",
+        "rank_key": f"{int(excluded)}{i:06d}",
+        "total_score": 100 - i * 0.1,
+        "auto_excluded": excluded,
+        "user_profiles": {"country": country, "industry": industry, "years_of_experience": years}
+    }
+
+
+def ids(rows):
+    return [row["id"] for row in rows]
+
+
+def test_without_quotas_takes_rank_order():
+    rows = [make_row(i) for i in range(10)]
+    rows.append(make_row(99, excluded=True))
+
+    result = select_with_quotas(list(reversed(rows)), {}, seats=4, reserve_seats=3)
+
+    assert ids(result["qualified"]) == ["a0000", "a0001", "a0002", "a0003"]
+    assert ids(result["reserve"]) == ["a0004", "a0005", "a0006"]
+    assert result["swaps"] == [] and result["cap_skips"] == [] and result["unmet"] == []
+    assert result["ranked_count"] == 10
+
+
+def test_cap_skips_rows_over_the_max():
+    rows = [make_row(i, country="EG" if i < 5 else "SA") for i in range(10)]
+
+    result = select_with_quotas(rows, {"country": {"EG": {"max": 2}}}, seats=4, reserve_seats=2)
+
+    assert ids(result["qualified"]) == ["a0000", "a0001", "a0005", "a0006"]
+    assert [skip["application_id"] for skip in result["cap_skips"]] == ["a0002", "a0003", "a0004"]
+    assert result["cap_skips"][0]["reason"] == "country=EG is at its max of 2"
+    # The reserve is plain rank order over what was not selected
+    assert ids(result["reserve"]) == ["a0002", "a0003"]
+    assert result["strata"]["country=EG"] == {"min": 0, "max": 2, "selected": 2, "unconstrained": 4}
+
+
+def test_floor_swaps_out_the_lowest_ranked_selection():
+    rows = [make_row(i, country="SA" if i in (6, 8, 9) else "EG") for i in range(10)]
+
+    result = select_with_quotas(rows, {"country": {"SA": {"min": 2}}}, seats=4, reserve_seats=2)
+
+    assert ids(result["qualified"]) == ["a0000", "a0001", "a0006", "a0008"]
+    assert [(swap["added"]["application_id"], swap["removed"]["application_id"]) for swap in result["swaps"]] == [
+        ("a0006", "a0003"),
+        ("a0008", "a0002"),
+    ]
+    assert result["swaps"][0]["reason"] == "country=SA below its min of 2"
+    assert result["strata"]["country=SA"]["selected"] == 2
+    assert result["unmet"] == []
+
+
+def test_floor_does_not_remove_rows_protected_by_another_floor():
+    rows = [
+        make_row(0, country="EG", industry="banking"),
+        make_row(1, country="EG", industry="energy"),
+        make_row(2, country="SA", industry="banking"),
+    ]
+    quotas = {"country": {"SA": {"min": 1}}, "industry": {"energy": {"min": 1}}}
+
+    result = select_with_quotas(rows, quotas, seats=2, reserve_seats=0)
+
+    assert ids(result["qualified"]) == ["a0001", "a0002"]
+    assert result["swaps"][0]["removed"]["application_id"] == "a0000"
+
+
+def test_unmet_floor_is_reported():
+    rows = [make_row(i, country="SA" if i == 7 else "EG") for i in range(10)]
+
+    result = select_with_quotas(rows, {"country": {"SA": {"min": 3}}}, seats=4, reserve_seats=0)
+
+    assert "a0007" in ids(result["qualified"])
+    assert result["unmet"] == [{
+        "stratum": "country=SA",
+        "min": 3,
+        "selected": 1,
+        "reason": "no eligible applicant left in this stratum"
+    }]
+
+
+@pytest.mark.parametrize("quotas", [
+    {"gender": {"f": {"min": 1}}},
+    {"country": {"EG": {"min": 5, "max": 2}}},
+])
+def test_invalid_quotas_raise(quotas):
+    with pytest.raises(QuotaError):
+        select_with_quotas([make_row(0)], quotas)
+
+
+def test_random_quotas_never_break_a_cap_or_double_book():
+    rng = random.Random(7)
+    countries = ["EG", "SA", "AE", "JO"]
+    industries = ["banking", "energy", "retail"]
+    for _ in range(200):
+        rows = [
+            make_row(i, country=rng.choice(countries), industry=rng.choice(industries), excluded=rng.random() < 0.1)
+            for i in range(rng.randint(0, 60))
+        ]
+        quotas = {"country": {}, "industry": {}}
+        for country in rng.sample(countries, 2):
+            low = rng.randint(0, 6)
+            quotas["country"][country] = {"min": low, "max": rng.choice([None, low + rng.randint(0, 6)])}
+        quotas["industry"][rng.choice(industries)] = {"max": rng.randint(0, 10)}
+
+        result = select_with_quotas(rows, quotas, seats=12, reserve_seats=6)
+
+        qualified, reserve = ids(result["qualified"]), ids(result["reserve"])
+        assert len(set(qualified)) == len(qualified) <= 12
+        assert len(set(reserve)) == len(reserve) <= 6
+        assert not set(qualified) & set(reserve)
+        assert all(not row["auto_excluded"] for row in result["qualified"] + result["reserve"])
+        for dimension, values in quotas.items():
+            for value, bound in values.items():
+                held = sum(1 for row in result["qualified"] if row["user_profiles"][dimension] == value)
+                assert result["strata"][f"{dimension}={value}"]["selected"] == held
+                if bound.get("max") is not None:
+                    assert held <= bound["max"]
+                if held < (bound.get("min") or 0):
+                    assert f"{dimension}={value}" in [entry["stratum"] for entry in result["unmet"]]
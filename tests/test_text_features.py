@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from text_features import (
+    ANSWER_FEATURES, FEATURE_NAMES, answer_feature, answer_features, clear_text_feature_cache, cohort_features
+)
+
+ARABIC = "مرحبا بكم في المسابقة"
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    clear_text_feature_cache()
+    yield
+    clear_text_feature_cache()
+
+
+@pytest.mark.parametrize("text", [None, "", "   ", "!!!", "-- ... ?!"])
+@pytest.mark.parametrize("feature", ANSWER_FEATURES)
+def test_answer_without_words_scores_zero(text, feature):
+    assert answer_feature(text, feature) == 0.0
+
+
+def test_chunk_without_words_scores_zero():
+    result = cohort_features([None, "", "!!"])
+
+    for name in FEATURE_NAMES:
+        assert result[name].tolist() == [0.0, 0.0, 0.0]
+
+
+def test_empty_cohort():
+    assert answer_features([]).shape == (0, len(ANSWER_FEATURES))
+    assert all(cohort_features([])[name].size == 0 for name in FEATURE_NAMES)
+
+
+def test_arabic_answer_is_tokenised():
+    assert answer_feature(ARABIC, "vocabulary_richness") == 1.0
+    assert answer_feature(ARABIC + " " + ARABIC, "vocabulary_richness") == 0.5
+    assert answer_feature(ARABIC + " " + ARABIC, "repetition_ratio") > 0
+    assert answer_feature(ARABIC, "keyword_coverage") == 0.0
+
+
+def test_cohort_mixing_word_less_arabic_and_english_answers():
+    texts = ["!!", ARABIC, "Cash flow and debt covenants drive the budget", ""]
+
+    result = cohort_features(texts)
+
+    for name in FEATURE_NAMES:
+        assert np.isfinite(result[name]).all()
+    assert result["vocabulary_richness"].tolist() == [0.0, 1.0, 1.0, 0.0]
+    assert result["distinctiveness"][0] == 0.0 and result["distinctiveness"][3] == 0.0
+    assert result["distinctiveness"][1] > 0
+    assert result["keyword_coverage"][2] == pytest.approx(3 / 8)
+    # Word-less answers do not disturb the others' per-answer features
+    assert answer_feature(texts[2], "keyword_coverage") == result["keyword_coverage"][2]
+
+
+def test_repetition_ratio_counts_repeated_trigrams():
+    assert answer_feature("cash is king cash is king", "repetition_ratio") == pytest.approx(1 / 4)
+    assert answer_feature("one two", "repetition_ratio") == 0.0